@@ -0,0 +1,128 @@
+"""app_pages - Các trang của dashboard, mỗi trang một module chỉ được import khi mở
+
+HighLandsCoffee.py chỉ import module của trang đang chọn, nên trang HOME không
+tải matplotlib / seaborn / statsmodels / altair. Thời gian import lần đầu của
+mỗi trang được ghi vào telemetry (bước import.<module>, nguồn dashboard).
+
+Đo thời gian import của khung dashboard (các import đầu HighLandsCoffee.py) và
+của từng trang trong tiến trình mới: python -m app_pages
+"""
+import os
+import ast
+import sys
+import json
+import time
+import importlib
+import subprocess
+
+import telemetry
+
+# Tên trên menu -> module trong package
+PAGES = {
+    "HOME": "home",
+    "Nhập & quản lý dữ liệu": "data_management",
+    "Phân tích kết quả kinh doanh": "analysis",
+    "Trực quan hóa dữ liệu": "visualization",
+    "Dự báo doanh thu tương lai": "forecast",
+    "Power BI Dashboard": "power_bi",
+}
+# Trang ẩn, mở bằng ?page=performance
+HIDDEN_PAGES = {
+    "Performance": "performance",
+}
+
+# Thư viện nặng cần theo dõi khi đo import
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'statsmodels', 'altair', 'scipy', 'pandas', 'numpy', 'PIL']
+
+_import_seconds = {}
+
+
+def module_name(label):
+    return f"{__name__}.{PAGES.get(label) or HIDDEN_PAGES[label]}"
+
+
+def load_page(label):
+    """Import module của trang (lần đầu trong tiến trình thì đo thời gian)"""
+    name = module_name(label)
+    if name in sys.modules:
+        return sys.modules[name]
+
+    span = telemetry.Span(f"import.{name}", source="dashboard").start()
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    _import_seconds[label] = time.perf_counter() - started
+    span.stop()
+    return module
+
+
+def render(label):
+    load_page(label).render()
+
+
+def import_seconds():
+    """Thời gian import lần đầu của các trang đã mở trong tiến trình này"""
+    return dict(_import_seconds)
+
+
+SHELL_LABEL = "Khung dashboard"
+SHELL_SCRIPT = 'HighLandsCoffee.py'
+
+# Chạy trong tiến trình mới: import sẵn `preload`, rồi đo thời gian import `modules`
+_PROBE = """
+import sys, time, json
+{preload}
+before = set(sys.modules)
+started = time.perf_counter()
+{modules}
+seconds = time.perf_counter() - started
+print(json.dumps({{'seconds': seconds, 'modules': len(sys.modules) - len(before),
+                  'heavy': [m for m in {heavy!r} if m in sys.modules and m not in before]}}))
+"""
+
+
+def shell_imports(root):
+    """Các lệnh import ở cấp module của HighLandsCoffee.py (đọc bằng ast, không chạy file)"""
+    with open(os.path.join(root, SHELL_SCRIPT), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    return '\n'.join(ast.unparse(node) for node in tree.body
+                     if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def _probe(root, label, preload, modules):
+    code = _PROBE.format(preload=preload, modules=modules, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {'Trang': label, 'Import (s)': None, 'Module mới': None,
+                'Thư viện nặng': result.stderr.strip().splitlines()[-1]}
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    return {'Trang': label, 'Import (s)': round(probe['seconds'], 3),
+            'Module mới': probe['modules'], 'Thư viện nặng': ', '.join(probe['heavy']) or '-'}
+
+
+def measure_import_times(labels=None):
+    """Thời gian import và thư viện nặng bị kéo theo, mỗi lần đo một tiến trình mới
+
+    Dòng đầu là khung dashboard: toàn bộ import của HighLandsCoffee.py từ một
+    trình thông dịch trống (chi phí mọi trang đều trả). Mỗi trang được đo sau
+    khi đã import khung, tức phần chi phí thêm khi mở trang đó lần đầu.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    shell = shell_imports(root)
+    rows = [_probe(root, SHELL_LABEL, '', shell)]
+    for label in labels or list(PAGES) + list(HIDDEN_PAGES):
+        rows.append(_probe(root, label, shell, f'import {module_name(label)}'))
+    return rows
+
+
+# Hàm chính cho module này
+def main_app_pages():
+    """In thời gian import của từng trang dashboard"""
+    print("=" * 60)
+    print("THỜI GIAN IMPORT CÁC TRANG DASHBOARD")
+    print("=" * 60)
+
+    rows = measure_import_times()
+    for row in rows:
+        seconds = '-' if row['Import (s)'] is None else f"{row['Import (s)']:.3f}s"
+        print(f"{row['Trang']:<32} {seconds:>8}  {str(row['Module mới']):>5} module  {row['Thư viện nặng']}")
+    return rows
@@ -0,0 +1,5 @@
+"""__main__.py - Chạy `python -m app_pages` để đo thời gian import từng trang"""
+from app_pages import main_app_pages
+
+if __name__ == "__main__":
+    main_app_pages()
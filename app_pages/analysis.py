@@ -0,0 +1,74 @@
+"""analysis.py - Trang thống kê và phân tích kết quả kinh doanh"""
+import os
+import pandas as pd
+import numpy as np
+import streamlit as st
+
+import data_access
+
+
+def render():
+    st.header("📊 Thống kê và Phân tích kết quả")
+
+    # Bộ lọc ở sidebar: mọi con số bên dưới được trả lời từ mảng cộng dồn
+    # của query engine, không quét lại toàn bộ dữ liệu mỗi lần đổi bộ lọc
+    if os.path.exists(data_access.CLEANED_DATA_PATH):
+        engine = data_access.get_query_engine()
+        min_date, max_date = engine.date_range
+        with st.sidebar:
+            st.subheader("Bộ lọc")
+            date_range = st.date_input("Khoảng ngày", (min_date.date(), max_date.date()),
+                                       min_value=min_date.date(), max_value=max_date.date())
+            channels = st.multiselect("Kênh bán", engine.channels)
+            products = st.multiselect("Sản phẩm", engine.products)
+            bitmap_index = data_access.get_bitmap_index()
+            sizes = st.multiselect("Kích cỡ", bitmap_index.values('Size'))
+            staff = st.multiselect("Nhân viên", bitmap_index.values('Staff_id'))
+
+        # Khi mới chọn ngày bắt đầu, date_input chỉ trả về 1 giá trị
+        date_from, date_to = (date_range[0], date_range[-1]) if date_range else (min_date, max_date)
+
+        if sizes or staff:
+            # Lọc thêm kích cỡ / nhân viên: ghép bitmap các cột với khoảng dòng theo ngày
+            bitmap = bitmap_index.select(Order_Channel=channels, Product_Name=products,
+                                         Size=sizes, Staff_id=staff)
+            np.bitwise_and(bitmap, bitmap_index.range_bitmap(*engine.row_bounds(date_from, date_to)),
+                           out=bitmap)
+            totals = bitmap_index.aggregate(bitmap)
+            daily_revenue = (bitmap_index.rows(bitmap).groupby('Date')['Revenue'].sum()
+                             .reindex(pd.date_range(date_from, date_to, name='Date'), fill_value=0))
+            channel_table = bitmap_index.aggregate(bitmap, by='Order_Channel')
+            product_table = bitmap_index.aggregate(bitmap, by='Product_Name')
+        else:
+            totals = engine.totals(date_from, date_to, channels, products)
+            daily_revenue = engine.daily_series(date_from, date_to, channels, products)
+            channel_table = engine.breakdown('Order_Channel', date_from, date_to, channels, products)
+            product_table = engine.breakdown('Product_Name', date_from, date_to, channels, products)
+
+        st.subheader("Tổng quan theo bộ lọc")
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Doanh thu", f"{totals['Revenue']:,.0f} VNĐ")
+        m2.metric("Số lượng bán", f"{totals['Quantity']:,.0f}")
+        m3.metric("Số đơn", f"{totals['Orders']:,.0f}")
+
+        st.line_chart(daily_revenue)
+        b1, b2 = st.columns(2)
+        with b1:
+            st.dataframe(channel_table, hide_index=True, use_container_width=True)
+        with b2:
+            st.dataframe(product_table, hide_index=True, use_container_width=True)
+
+    try:
+        st.subheader("Phân tích Sản phẩm theo Kênh")
+        df_kênh = data_access.load_pivot_sheet(0)
+        st.dataframe(df_kênh, use_container_width=True)
+
+        st.subheader("Hiệu suất Nhân viên")
+        # Sửa lỗi: Lấy đúng sheet nhân viên từ file của bạn
+        df_nv = data_access.load_pivot_sheet('staff_performance')
+        st.dataframe(df_nv, use_container_width=True)
+        # Sửa lỗi bar_chart: Set index là Staff_id để hiện đúng
+        st.bar_chart(df_nv.set_index('Staff_id')['Revenue'])
+
+    except Exception as e:
+        st.warning(f"Lỗi: {e}. Vui lòng chạy file pivot_analysis.py trước.")
@@ -0,0 +1,160 @@
+"""data_management.py - Trang nhập dữ liệu, làm sạch và quản lý giao dịch"""
+import os
+import pandas as pd
+import streamlit as st
+
+import data_access
+
+
+def render():
+    st.header("📦 Nhập dữ liệu và Làm sạch")
+    try:
+        raw_index = data_access.get_raw_index()
+        st.subheader("Dữ liệu gốc (Chưa xử lý)")
+
+        # Phân trang: chỉ đọc các dòng của trang hiện tại từ file gốc
+        c1, c2 = st.columns([1, 3])
+        with c1:
+            page_size = st.selectbox("Số dòng mỗi trang", [50, 100, 500, 1000], index=1)
+        with c2:
+            total_pages = raw_index.page_count(page_size)
+            page = st.number_input(f"Trang (1 - {total_pages:,})", min_value=1,
+                                   max_value=total_pages, value=1, step=1)
+
+        df_page = raw_index.read_page(int(page), page_size)
+        st.dataframe(df_page, use_container_width=True)
+        if len(df_page):
+            st.caption(f"Dòng {df_page.index[0]:,} - {df_page.index[-1]:,} / "
+                       f"{raw_index.row_count:,} bản ghi")
+
+        periods = {"3 tháng gần nhất": 3, "6 tháng gần nhất": 6, "12 tháng gần nhất": 12, "Toàn bộ": None}
+        period = st.selectbox("Khoảng thời gian hiển thị", list(periods))
+        if st.button("Tiến hành làm sạch và chuẩn hóa dữ liệu"):
+            # Kiểm tra file
+            if os.path.exists(data_access.CLEANED_DATA_PATH):
+                # Vài tháng gần nhất: chỉ đọc các phân vùng tháng tương ứng
+                if periods[period] and data_access.has_partitions():
+                    df_cleaned = data_access.load_last_months(periods[period])
+                else:
+                    df_cleaned = data_access.load_cleaned_data()
+                st.success("Đã làm sạch dữ liệu thành công!")
+                st.subheader("Dữ liệu sau khi chuẩn hóa")
+                st.dataframe(df_cleaned, use_container_width=True)
+                st.write(f"Tổng số bản ghi: {len(df_cleaned)}")
+                if 'partitions' in df_cleaned.attrs:
+                    st.caption(f"Đã đọc {len(df_cleaned.attrs['partitions'])} phân vùng: "
+                               f"{', '.join(df_cleaned.attrs['partitions'])}")
+            else:
+                st.error("Lỗi: Không tìm thấy file cleaned_data.csv")
+    except FileNotFoundError:
+        st.error("Vui lòng kiểm tra file data_1.csv trong thư mục dự án.")
+
+    # Thêm / sửa / xóa giao dịch trên kho SQLite
+    st.subheader("🗂️ Quản lý giao dịch")
+    try:
+        store = data_access.get_sales_store()
+        products = store.distinct_values('Product_Name')
+        staff_ids = store.distinct_values('Staff_id')
+        channels = store.distinct_values('Order_Channel')
+        sizes = ['S', 'M', 'L']
+
+        def sale_form(key, record=None):
+            """Form nhập giao dịch, trả về dict khi bấm lưu"""
+            record = record or {}
+            with st.form(key):
+                c1, c2, c3 = st.columns(3)
+                with c1:
+                    sale_id = st.text_input("Mã giao dịch", record.get('Sale_id', store.next_sale_id()),
+                                            disabled='Sale_id' in record)
+                    date = st.date_input("Ngày", pd.to_datetime(record.get('Date', pd.Timestamp.today())))
+                    product = st.selectbox("Sản phẩm", products,
+                                           index=products.index(record['Product_Name'])
+                                           if record.get('Product_Name') in products else 0)
+                with c2:
+                    size = st.selectbox("Kích cỡ", sizes,
+                                        index=sizes.index(record['Size']) if record.get('Size') in sizes else 0)
+                    quantity = st.number_input("Số lượng", min_value=1, step=1,
+                                               value=int(record.get('Quantity') or 1))
+                    price = st.number_input("Giá bán thực tế (VND)", min_value=0, step=1000,
+                                            value=int(record.get('Actual_Selling_Price') or 0))
+                with c3:
+                    channel = st.selectbox("Kênh bán", channels,
+                                           index=channels.index(record['Order_Channel'])
+                                           if record.get('Order_Channel') in channels else 0)
+                    staff = st.selectbox("Nhân viên", staff_ids,
+                                         index=staff_ids.index(record['Staff_id'])
+                                         if record.get('Staff_id') in staff_ids else 0)
+                if st.form_submit_button("Lưu"):
+                    return {'Sale_id': sale_id, 'Date': date, 'Product_Name': product, 'Size': size,
+                            'Quantity': quantity, 'Actual_Selling_Price': price,
+                            'Applied_Price': price, 'Order_Channel': channel, 'Staff_id': staff}
+            return None
+
+        tab_find, tab_add, tab_edit, tab_delete, tab_agg = st.tabs(
+            ["🔍 Tra cứu", "➕ Thêm", "✏️ Sửa", "🗑️ Xóa", "📈 Tổng hợp"])
+
+        with tab_find:
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                date_range = st.date_input("Khoảng ngày", value=())
+            with c2:
+                find_staff = st.selectbox("Nhân viên ", ["(Tất cả)"] + staff_ids)
+            with c3:
+                find_product = st.selectbox("Sản phẩm ", ["(Tất cả)"] + products)
+            date_from, date_to = (date_range + (None, None))[:2] if date_range else (None, None)
+            results = store.find(date_from=date_from, date_to=date_to or date_from,
+                                 staff_id=None if find_staff == "(Tất cả)" else find_staff,
+                                 product_name=None if find_product == "(Tất cả)" else find_product)
+            st.dataframe(results, use_container_width=True, hide_index=True)
+            st.caption(f"{len(results)} giao dịch (tối đa 500)")
+
+        with tab_add:
+            new_record = sale_form("add_sale")
+            if new_record:
+                try:
+                    row = store.insert(new_record)
+                    st.success(f"Đã thêm giao dịch {row['Sale_id']} "
+                               f"(doanh thu {row['Revenue']:,.0f} VNĐ)")
+                except ValueError as e:
+                    st.error(f"Lỗi: {e}")
+
+        with tab_edit:
+            edit_id = st.text_input("Mã giao dịch cần sửa")
+            if edit_id:
+                current = store.get(edit_id)
+                if current is None:
+                    st.warning(f"Không tìm thấy giao dịch {edit_id}")
+                else:
+                    changes = sale_form("edit_sale", current)
+                    if changes:
+                        try:
+                            row = store.update(edit_id, changes)
+                            st.success(f"Đã cập nhật giao dịch {row['Sale_id']}")
+                        except ValueError as e:
+                            st.error(f"Lỗi: {e}")
+
+        with tab_delete:
+            delete_id = st.text_input("Mã giao dịch cần xóa")
+            if delete_id:
+                current = store.get(delete_id)
+                if current is None:
+                    st.warning(f"Không tìm thấy giao dịch {delete_id}")
+                else:
+                    st.dataframe(pd.DataFrame([current]), use_container_width=True, hide_index=True)
+                    if st.button("Xác nhận xóa", type="primary"):
+                        store.delete(delete_id)
+                        st.success(f"Đã xóa giao dịch {delete_id}")
+
+        with tab_agg:
+            st.caption("Cập nhật ngay sau mỗi lần thêm/sửa/xóa (chỉ tính lại nhóm bị ảnh hưởng). "
+                       "Pivot, biểu đồ và dự báo nhận thay đổi ở lần làm mới dữ liệu kế tiếp "
+                       "(refresh_worker.py hoặc pipeline.py).")
+            st.write("Doanh thu theo tháng")
+            st.dataframe(store.monthly_trend(), use_container_width=True, hide_index=True)
+            st.write("Hiệu suất nhân viên")
+            st.dataframe(store.staff_performance(), use_container_width=True, hide_index=True)
+            st.write("Sản phẩm theo kênh")
+            st.dataframe(store.product_channel(), use_container_width=True, hide_index=True)
+
+    except FileNotFoundError:
+        st.error("Lỗi: Không tìm thấy file cleaned_data.csv để tạo kho dữ liệu.")
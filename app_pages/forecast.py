@@ -0,0 +1,121 @@
+"""forecast.py - Trang dự báo doanh thu tương lai"""
+import os
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+import streamlit as st
+
+import data_access
+import forecasting
+import hierarchical_forecast
+import backtesting
+
+
+def render():
+    st.header("🔮 Dự báo Doanh thu tương lai")
+
+    try:
+        # 1. Đọc dữ liệu (Sử dụng đúng sheet chứa dữ liệu trong ảnh của bạn)
+        df_monthly = data_access.load_pivot_sheet('monthly_trend')
+
+        # 2. HIỂN THỊ LẠI BẢNG (Đưa lệnh này lên trước để luôn thấy bảng kể cả khi dự báo lỗi)
+        st.subheader("Dữ liệu xu hướng hàng tháng")
+        st.dataframe(df_monthly, use_container_width=True)
+
+        # 3. Kiểm tra và xử lý dữ liệu để dự báo
+        # Sửa lỗi: Dùng 'Year_Month' thay vì 'Month'
+        if 'Year_Month' in df_monthly.columns and 'Revenue' in df_monthly.columns:
+            y = df_monthly['Revenue'].values
+            X = np.arange(len(y))
+
+            # Chọn mô hình: mô hình đã fit được cache theo chuỗi dữ liệu,
+            # đổi số tháng dự báo không phải fit lại
+            # Mặc định dùng mô hình được chọn qua backtest (nếu đã chạy backtesting.py)
+            model_options = list(forecasting.MODEL_LABELS)
+            best_model = backtesting.selected_model('monthly', config=data_access.CONFIG)
+            c1, c2 = st.columns(2)
+            with c1:
+                model_name = st.selectbox("Mô hình dự báo", model_options,
+                                          index=model_options.index(best_model) if best_model in model_options else 0,
+                                          format_func=forecasting.MODEL_LABELS.get)
+            with c2:
+                confidence = st.select_slider("Độ tin cậy", [0.8, 0.9, 0.95], value=0.95,
+                                              format_func=lambda v: f"{v:.0%}")
+
+            # Thanh slider tương tác
+            num_periods = st.slider("Dự báo thêm bao nhiêu tháng:", 1, 12, 3)
+
+            model = forecasting.fit_model(model_name, y)
+            forecast_df = model.forecast(num_periods, alpha=1 - confidence)
+            forecast_df.index = forecasting.future_periods(df_monthly['Year_Month'].iloc[-1], num_periods)
+            future_X = np.arange(len(y), len(y) + num_periods)
+            future_y = forecast_df['Forecast'].values
+
+            # 4. HIỂN THỊ CHỈ SỐ
+            c1, c2 = st.columns(2)
+            with c1:
+                st.metric(f"Dự báo tháng thứ +{num_periods}", f"{future_y[-1]:,.0f} VNĐ")
+            with c2:
+                st.metric(f"Khoảng dự báo {confidence:.0%}",
+                          f"{forecast_df['Lower'].iloc[-1]:,.0f} - {forecast_df['Upper'].iloc[-1]:,.0f}")
+
+            # 5. VẼ BIỂU ĐỒ
+            fig, ax = plt.subplots(figsize=(10, 5))
+            ax.plot(X, y, color='#8A2432', marker='o', label='Thực tế')
+            ax.plot(np.append(X[-1], future_X), np.append(y[-1], future_y),
+                    color='gray', linestyle='--', label=forecasting.MODEL_LABELS[model_name])
+            ax.fill_between(future_X, forecast_df['Lower'], forecast_df['Upper'],
+                            color='gold', alpha=0.25, label=f'Khoảng dự báo {confidence:.0%}')
+            ax.scatter(future_X, future_y, color='gold', s=100, label='Dự báo')
+
+            labels = list(df_monthly['Year_Month'].astype(str)) + list(forecast_df.index)
+            step = max(1, len(labels) // 16)
+            ax.set_xticks(np.arange(len(labels))[::step], labels[::step], rotation=45)
+            ax.legend()
+            st.pyplot(fig)
+            plt.close(fig)
+
+            st.dataframe(forecast_df.style.format('{:,.0f}'), use_container_width=True)
+
+            if os.path.exists(data_access.CONFIG.leaderboard_path):
+                with st.expander("Kết quả backtest các mô hình"):
+                    st.dataframe(pd.read_csv(data_access.CONFIG.leaderboard_path), hide_index=True,
+                                 use_container_width=True)
+                    st.caption("Mô hình được chọn: rẻ nhất trong các mô hình có MASE "
+                               f"không quá {backtesting.MASE_TOLERANCE:.0%} so với mô hình tốt nhất.")
+
+            # 6. DỰ BÁO THEO CẤP (tính sẵn bằng hierarchical_forecast.py)
+            st.subheader("Dự báo theo sản phẩm, kênh và nhân viên")
+            df_levels = data_access.load_hierarchical_forecast()
+            if df_levels is None:
+                st.info("Chưa có dự báo theo cấp. Chạy `python hierarchical_forecast.py` để tạo.")
+            else:
+                level = st.radio("Cấp dự báo", list(hierarchical_forecast.LEVELS), horizontal=True)
+                df_level = df_levels[df_levels['Level'] == level]
+                horizon_months = sorted(df_level['Year_Month'].unique())[:num_periods]
+                df_level = df_level[df_level['Year_Month'].isin(horizon_months)]
+
+                table = df_level.pivot(index='Member', columns='Year_Month', values='Forecast')
+                table['Tổng'] = table.sum(axis=1)
+                table = table.sort_values('Tổng', ascending=False)
+
+                top_members = table.index[:10]
+                st.line_chart(df_level[df_level['Member'].isin(top_members)],
+                              x='Year_Month', y='Forecast', color='Member')
+                st.dataframe(table.style.format('{:,.0f}'), use_container_width=True)
+                # Dự báo theo cấp được tính theo lô với một mô hình cố định, không theo
+                # mô hình đang chọn ở biểu đồ tổng phía trên
+                batch_model = df_levels.loc[df_levels['Level'] == hierarchical_forecast.TOTAL_LEVEL,
+                                            'Model'].iloc[0]
+                batch_label = forecasting.MODEL_LABELS.get(batch_model, batch_model)
+                caption = (f"Dự báo từng cấp được tính sẵn bằng mô hình {batch_label} và đã điều chỉnh "
+                           f"để cộng lại bằng dự báo tổng của chính mô hình này.")
+                if batch_model != model_name:
+                    caption += (f" Biểu đồ tổng phía trên dùng {forecasting.MODEL_LABELS[model_name]}, "
+                                f"nên tổng các cấp có thể khác đường dự báo đó.")
+                st.caption(caption)
+        else:
+            st.warning("Không tìm thấy cột 'Year_Month' hoặc 'Revenue' để tính toán dự báo.")
+
+    except Exception as e:
+        st.error(f"Lỗi: {e}")
@@ -0,0 +1,35 @@
+"""home.py - Trang HOME: logo và ảnh sản phẩm (không tải matplotlib/seaborn)"""
+import streamlit as st
+
+import asset_cache
+
+
+def render():
+    st.markdown("<h1 style='text-align: center; color: #3E2723;'>PHÂN TÍCH KẾT QUẢ KINH DOANH HIGHLANDS COFFEE</h1>", unsafe_allow_html=True)
+
+    # Hàng 1:
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.image(asset_cache.product_asset("HLC_New_logo_5.1_Products__CAPPUCINO.jpg"), caption="CAPPUCCINO")
+    with col2:
+        st.image(asset_cache.product_asset("HLC_New_logo_5.1_Products__LATTE_1.jpg"), caption="LATTE")
+    with col3:
+        st.image(asset_cache.product_asset("HLC_New_logo_5.1_Products__AMERICANO_NONG.jpg"), caption="AMERICANO")
+    with col4:
+        st.image(asset_cache.product_asset("HLC_New_logo_5.1_Products__MOCHA.jpg"), caption="MOCHA")
+    with col5:
+        st.image(asset_cache.product_asset("HLC_New_logo_5.1_Products__PHIN_DEN_DA.jpg"), caption="ICED BLACK COFFEE")
+
+
+    # Hàng 2:
+    col6, col7, col8, col9, col10 = st.columns(5)
+    with col6:
+        st.image(asset_cache.product_asset("HLC_New_logo_5.1_Products__FREEZE_TRA_XANH.jpg"), caption="GREEN TEA FREEZE")
+    with col7:
+        st.image(asset_cache.product_asset("HLC_New_logo_5.1_Products__CLASSIC_FREEZE_PHINDI.jpg"), caption="CLASSIC PHIN FREEZE")
+    with col8:
+        st.image(asset_cache.product_asset("HLC_New_logo_5.1_Products__FREEZE_CHOCO.jpg"), caption="CHOCOLATE FREEZE")
+    with col9:
+        st.image(asset_cache.product_asset("HLC_New_logo_5.1_Products__COOKIES_FREEZE.jpg"), caption="COOKIES AND CREAM")
+    with col10:
+        st.image(asset_cache.product_asset("HLC_New_logo_5.1_Products__CARAMEL_FREEZE_PHINDI.jpg"), caption="CARAMEL PHIN FREEZE")
@@ -0,0 +1,20 @@
+"""performance.py - Trang ẩn: hiệu năng pipeline và dashboard (?page=performance)"""
+import streamlit as st
+
+import telemetry
+
+
+def render():
+    st.header("⏱ Hiệu năng pipeline và dashboard")
+    metrics = telemetry.load_metrics()
+    if metrics.empty:
+        st.info("Chưa có số liệu đo. Chạy pipeline hoặc mở các trang dashboard để ghi số liệu.")
+    else:
+        source = st.radio("Nguồn", sorted(metrics['source'].unique()), horizontal=True)
+        data = metrics[metrics['source'] == source]
+        summary = telemetry.summarize(data)
+        st.dataframe(summary, hide_index=True, use_container_width=True)
+
+        stage = st.selectbox("Xu hướng p50 / p95 theo ngày của bước", summary['stage'])
+        st.line_chart(telemetry.daily_percentiles(data, stage))
+        st.caption(f"{len(metrics):,} bản ghi, RSS đỉnh cao nhất {metrics['peak_rss_mb'].max():,.0f} MB")
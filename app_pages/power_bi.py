@@ -0,0 +1,10 @@
+"""power_bi.py - Trang liên kết báo cáo Power BI"""
+import streamlit as st
+
+
+def render():
+    st.header("📊 Hệ thống báo cáo Power BI")
+
+    pbi_url = "https://app.powerbi.com/reportEmbed?reportId=5447e2ef-f67e-4dba-b056-f1975b969541&autoAuth=true&ctid=fc0bdaaf-292e-45cc-b51f-872867f9c981"
+
+    st.link_button("🚀 TRUY CẬP POWER BI DASHBOARD", pbi_url, type="primary", use_container_width=True)
@@ -0,0 +1,83 @@
+"""visualization.py - Trang biểu đồ tương tác và ảnh biểu đồ đã xuất"""
+import os
+import streamlit as st
+
+import data_access
+import interactive_charts
+import chart_images
+
+
+def render():
+    st.header("📊 Hệ thống Trực quan hóa (Biểu đồ đã trích xuất)")
+
+    chart_mode = st.radio("Chế độ hiển thị:", ["Biểu đồ tương tác", "Ảnh tĩnh (PNG)"],
+                          horizontal=True)
+
+    if chart_mode == "Biểu đồ tương tác":
+        # Chỉ gửi bảng tổng hợp nhỏ, trình duyệt tự vẽ (tooltip, zoom, lọc)
+        cleaned_path = data_access.CLEANED_DATA_PATH
+        if not os.path.exists(cleaned_path):
+            st.error("Lỗi: Không tìm thấy file cleaned_data.csv. Vui lòng chạy data_preprocess_1.py trước.")
+        else:
+            aggregates = data_access.load_chart_aggregates(cleaned_path)
+
+            # Chỉ hiện tab của các bảng tổng hợp dựng được từ dữ liệu hiện có
+            tabs = [
+                ("📅 Theo tháng", 'monthly', interactive_charts.monthly_chart,
+                 "Kéo ngang để zoom trục thời gian, nhấp đúp để đặt lại."),
+                ("🛒 Theo kênh", 'channel', interactive_charts.channel_chart, None),
+                ("☕ Theo sản phẩm", 'product', interactive_charts.product_chart,
+                 "Chọn kênh để lọc, nhấp vào chú thích kích cỡ để làm nổi bật."),
+                ("👥 Theo nhân viên", 'staff', interactive_charts.staff_chart,
+                 "Cuộn để zoom, kéo để di chuyển biểu đồ phân tán."),
+            ]
+            tabs = [tab for tab in tabs if tab[1] in aggregates]
+            if not tabs:
+                st.info("Dữ liệu đã làm sạch thiếu các cột cần cho biểu đồ tương tác.")
+            else:
+                for container, (_, key, make_chart, caption) in zip(st.tabs([tab[0] for tab in tabs]), tabs):
+                    with container:
+                        st.altair_chart(make_chart(aggregates[key]), use_container_width=True)
+                        if caption:
+                            st.caption(caption)
+
+    else:
+        # Chỉ nội dung của biểu đồ đang chọn được chạy (st.tabs chạy tất cả các tab)
+        chart_path = data_access.CONFIG.chart_dir + "/"
+        chart_tabs = [
+            ("🛒 Channel Analysis", "Phân phối doanh thu theo kênh", "channel_analysis.png",
+             ("info", "So sánh tổng quan tỷ trọng doanh thu giữa các kênh Online và Offline.")),
+            ("Channel by Product", "Phân phối kênh cho top 5 sản phẩm", "channel_by_product.png", None),
+            ("Channel trend", "Xu hướng doanh thu", "channel_trend.png", None),
+            ("Daily Revenue", "Biến động Doanh thu hàng ngày", "daily_revenue.png", None),
+            ("Monthly Trend", "Doanh thu theo Tháng", "monthly_trend.png", None),
+            ("Product Size Distribution", "Phân bổ Kích cỡ Sản phẩm (S, M, L)",
+             "product_size_distribution.png", None),
+            ("Quarterly Comparison", "So sánh Hiệu suất theo Quý", "quarterly_comparison.png", None),
+            ("Staff by channel", "Phân bổ Nhân viên theo Kênh bán", "staff_by_channel.png", None),
+            ("Staff trend", "Xu hướng làm việc của Đội ngũ Nhân viên", "staff_trend.png", None),
+            ("Top Products Quantity", "Top Sản phẩm bán chạy nhất (Số lượng)",
+             "top_products_quantity.png", None),
+            ("Top Products Revenue", "Top Sản phẩm mang lại Doanh thu cao nhất",
+             "top_products_revenue.png", None),
+            ("Top Staff Performance", "Bảng Hiệu suất Nhân viên (Top 10)", "top_staff_performance.png",
+             ("success", "Cá nhân dẫn đầu đang đóng góp đáng kể vào doanh thu tổng của cửa hàng.")),
+        ]
+
+        chart_label = st.radio("Chọn biểu đồ:", [tab[0] for tab in chart_tabs],
+                               horizontal=True, label_visibility="collapsed")
+        _, subheader, file_name, note = next(tab for tab in chart_tabs if tab[0] == chart_label)
+
+        st.subheader(subheader)
+        image_path = f"{chart_path}{file_name}"
+        if not os.path.exists(image_path):
+            st.error(f"Lỗi: Không tìm thấy {image_path}. Vui lòng chạy các file visualize trước.")
+        else:
+            # Hiển thị thumbnail trước, ảnh gốc 300 dpi chỉ tải khi được yêu cầu
+            if st.toggle("🔍 Xem ảnh độ phân giải đầy đủ", key=f"full_{file_name}"):
+                st.image(chart_images.get_image_bytes(image_path), use_container_width=True)
+            else:
+                st.image(chart_images.get_thumbnail_bytes(image_path), use_container_width=True)
+
+        if note:
+            getattr(st, note[0])(note[1])
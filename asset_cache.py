@@ -0,0 +1,138 @@
+"""asset_cache.py - Ảnh sản phẩm và logo đã thu nhỏ sẵn cho trang HOME
+
+Ảnh gốc (2000 px, 180-560 KB) được thu nhỏ về đúng kích thước hiển thị trong
+HighLandsCoffee.py (gấp đôi cho màn hình HiDPI), lưu dạng WebP trong
+<output_root>/assets/ với tên chứa hash nội dung file gốc. Hash được ghi nhớ theo
+mtime/kích thước trong manifest nên không phải đọc lại ảnh gốc mỗi lần chạy.
+"""
+import os
+import json
+import hashlib
+import threading
+
+from run_config import resolve
+
+# Kích thước hiển thị trên trang HOME (px CSS) và hệ số cho màn hình HiDPI
+LOGO_WIDTH = 190
+PRODUCT_WIDTH = 140
+PIXEL_RATIO = 2
+
+LOGO_PATH = 'highland.png'
+PRODUCT_IMAGES = [
+    ("HLC_New_logo_5.1_Products__CAPPUCINO.jpg", "CAPPUCCINO"),
+    ("HLC_New_logo_5.1_Products__LATTE_1.jpg", "LATTE"),
+    ("HLC_New_logo_5.1_Products__AMERICANO_NONG.jpg", "AMERICANO"),
+    ("HLC_New_logo_5.1_Products__MOCHA.jpg", "MOCHA"),
+    ("HLC_New_logo_5.1_Products__PHIN_DEN_DA.jpg", "ICED BLACK COFFEE"),
+    ("HLC_New_logo_5.1_Products__FREEZE_TRA_XANH.jpg", "GREEN TEA FREEZE"),
+    ("HLC_New_logo_5.1_Products__CLASSIC_FREEZE_PHINDI.jpg", "CLASSIC PHIN FREEZE"),
+    ("HLC_New_logo_5.1_Products__FREEZE_CHOCO.jpg", "CHOCOLATE FREEZE"),
+    ("HLC_New_logo_5.1_Products__COOKIES_FREEZE.jpg", "COOKIES AND CREAM"),
+    ("HLC_New_logo_5.1_Products__CARAMEL_FREEZE_PHINDI.jpg", "CARAMEL PHIN FREEZE"),
+]
+
+_lock = threading.Lock()
+# Manifest hash ảnh gốc theo thư mục ảnh (mỗi output_root một manifest)
+_manifests = {}
+# Đường dẫn ảnh đã thu nhỏ theo (thư mục ảnh, nguồn, mtime, kích thước, chiều rộng)
+_resolved = {}
+
+
+def _manifest_path(asset_dir):
+    return os.path.join(asset_dir, 'manifest.json')
+
+
+def _load_manifest(asset_dir):
+    if asset_dir not in _manifests:
+        try:
+            with open(_manifest_path(asset_dir), encoding='utf-8') as f:
+                _manifests[asset_dir] = json.load(f)
+        except (FileNotFoundError, ValueError):
+            _manifests[asset_dir] = {}
+    return _manifests[asset_dir]
+
+
+def _save_manifest(asset_dir):
+    os.makedirs(asset_dir, exist_ok=True)
+    tmp_path = _manifest_path(asset_dir) + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(_manifests[asset_dir], f, indent=2)
+    os.replace(tmp_path, _manifest_path(asset_dir))
+
+
+def source_hash(path, config=None):
+    """Hash SHA-256 (12 ký tự) của file gốc, chỉ tính lại khi file thay đổi"""
+    asset_dir = resolve(config).asset_dir
+    stat = os.stat(path)
+    manifest = _load_manifest(asset_dir)
+    entry = manifest.get(path)
+    if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+        return entry['sha256']
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+
+    manifest[path] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+                      'sha256': digest.hexdigest()[:12]}
+    _save_manifest(asset_dir)
+    return manifest[path]['sha256']
+
+
+def resized_asset(path, width, quality=82, config=None):
+    """Đường dẫn ảnh WebP đã thu nhỏ về `width` px (tạo nếu chưa có)"""
+    asset_dir = resolve(config).asset_dir
+    stat = os.stat(path)
+    key = (asset_dir, path, stat.st_mtime_ns, stat.st_size, width)
+    cached = _resolved.get(key)
+    if cached and os.path.exists(cached):
+        return cached
+
+    with _lock:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        target = os.path.join(asset_dir, f'{stem}-w{width}-{source_hash(path, config)}.webp')
+
+        if not os.path.exists(target):
+            # PIL chỉ cần khi tạo ảnh mới, không tải khi ảnh đã có sẵn
+            from PIL import Image
+
+            os.makedirs(asset_dir, exist_ok=True)
+            with Image.open(path) as img:
+                # Giữ kênh alpha cho logo PNG
+                img = img.convert('RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB')
+                if img.width > width:
+                    img.thumbnail((width, round(img.height * width / img.width)), Image.LANCZOS)
+                tmp_path = target + '.tmp'
+                img.save(tmp_path, format='WEBP', quality=quality, method=6)
+            os.replace(tmp_path, target)
+
+        _resolved[key] = target
+    return target
+
+
+def logo_asset(config=None):
+    return resized_asset(LOGO_PATH, LOGO_WIDTH * PIXEL_RATIO, config=config)
+
+
+def product_asset(path, config=None):
+    return resized_asset(path, PRODUCT_WIDTH * PIXEL_RATIO, config=config)
+
+
+def main_build_assets(config=None):
+    """Tạo sẵn toàn bộ ảnh cho trang HOME"""
+    print("=" * 60)
+    print("TẠO ẢNH THU NHỎ CHO TRANG HOME")
+    print("=" * 60)
+
+    config = resolve(config)
+    built = [logo_asset(config)] + [product_asset(path, config) for path, _ in PRODUCT_IMAGES]
+    original = sum(os.path.getsize(p) for p in [LOGO_PATH] + [p for p, _ in PRODUCT_IMAGES])
+    resized = sum(os.path.getsize(p) for p in built)
+    print(f"Đã tạo {len(built)} ảnh trong {config.asset_dir}: "
+          f"{original / 1024:,.0f} KB -> {resized / 1024:,.0f} KB")
+    return built
+
+
+if __name__ == "__main__":
+    main_build_assets()
@@ -0,0 +1,213 @@
+"""backtesting.py - Đánh giá mô hình dự báo bằng backtest rolling-origin
+
+Với mỗi chuỗi (doanh thu theo tháng và theo ngày, tính thẳng từ dữ liệu đã
+làm sạch), mốc cắt huấn luyện được dời dần về cuối chuỗi; ở mỗi mốc mọi
+mô hình được fit trên phần trước mốc và dự báo h kỳ sau mốc. Các fold chạy song
+song trên nhiều tiến trình. Bảng xếp hạng ghi MAPE/sMAPE/MASE cùng thời gian fit
+và dự báo; mô hình được chọn là mô hình rẻ nhất có MASE gần bằng mô hình tốt nhất.
+"""
+import pandas as pd
+import numpy as np
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import forecasting
+from run_config import RunConfig, resolve
+
+
+# Cấu hình backtest cho từng chuỗi
+SERIES_CONFIG = {
+    'monthly': {'seasonal_periods': 12, 'horizon': 3, 'folds': 8, 'step': 1},
+    'daily': {'seasonal_periods': 7, 'horizon': 14, 'folds': 6, 'step': 28},
+}
+
+# Mô hình được coi là "đủ tốt" nếu MASE không tệ hơn mô hình tốt nhất quá mức này
+MASE_TOLERANCE = 0.05
+
+
+def mape(actual, predicted):
+    """Sai số phần trăm tuyệt đối trung bình (bỏ các kỳ thực tế bằng 0)"""
+    mask = actual != 0
+    if not mask.any():
+        return np.nan
+    return float(np.mean(np.abs((actual[mask] - predicted[mask]) / actual[mask])) * 100)
+
+
+def smape(actual, predicted):
+    """MAPE đối xứng (kỳ mà cả thực tế và dự báo bằng 0 tính là 0)"""
+    denominator = np.abs(actual) + np.abs(predicted)
+    ratio = np.divide(2 * np.abs(actual - predicted), denominator,
+                      out=np.zeros_like(denominator, dtype=float), where=denominator > 0)
+    return float(np.mean(ratio) * 100)
+
+
+def mase(actual, predicted, train, seasonal_periods):
+    """MAE chia cho MAE trong mẫu của seasonal naive trên tập huấn luyện"""
+    m = seasonal_periods if len(train) > seasonal_periods else 1
+    scale = np.mean(np.abs(train[m:] - train[:-m]))
+    if not scale:
+        return np.nan
+    return float(np.mean(np.abs(actual - predicted)) / scale)
+
+
+def rolling_origins(n, horizon, folds, step, min_train):
+    """Các mốc cắt (độ dài tập huấn luyện), mốc cuối sát cuối chuỗi"""
+    last = n - horizon
+    origins = [last - i * step for i in range(folds)]
+    return sorted(origin for origin in origins if origin >= min_train)
+
+
+def _run_fold(task):
+    """Fit một mô hình trên một fold và tính sai số (chạy trong worker)"""
+    series_name, model_name, y, origin, horizon, seasonal_periods = task
+    train, actual = y[:origin], y[origin:origin + horizon]
+    result = {'Series': series_name, 'Model': model_name, 'Origin': origin}
+
+    try:
+        model = forecasting.make_model(model_name, seasonal_periods)
+        started = time.perf_counter()
+        model.fit(train)
+        fitted = time.perf_counter()
+        predicted = model.forecast(horizon)['Forecast'].to_numpy()
+        predicted_at = time.perf_counter()
+    except Exception as e:
+        result['Error'] = str(e)
+        return result
+
+    result.update({
+        'MAPE': mape(actual, predicted),
+        'sMAPE': smape(actual, predicted),
+        'MASE': mase(actual, predicted, train, seasonal_periods),
+        'Fit_s': fitted - started,
+        'Predict_s': predicted_at - fitted,
+    })
+    return result
+
+
+def load_series(df):
+    """Chuỗi doanh thu theo tháng và theo ngày (ngày không bán được = 0)
+
+    Cùng giá trị với pivot monthly_trend và DailyVisualizer.daily_series nhưng
+    chỉ cần hai lần groupby, không dựng mọi pivot hay visualizer.
+    """
+    monthly = df.groupby('Year_Month')['Revenue'].sum().sort_index()
+    daily = df.set_index(pd.to_datetime(df['Date']))['Revenue'].resample('D').sum()
+    return {
+        'monthly': monthly.to_numpy(float),
+        'daily': daily.to_numpy(float),
+    }
+
+
+class Backtester:
+    def __init__(self, models=None, series_config=None, workers=None):
+        self.models = models or list(forecasting.MODELS)
+        self.series_config = series_config or SERIES_CONFIG
+        self.workers = workers or os.cpu_count() or 1
+
+    def plan(self, series):
+        tasks = []
+        for name, y in series.items():
+            config = self.series_config[name]
+            # Cần ít nhất 2 mùa để fit thành phần mùa vụ
+            origins = rolling_origins(len(y), config['horizon'], config['folds'], config['step'],
+                                      min_train=2 * config['seasonal_periods'])
+            for model_name in self.models:
+                for origin in origins:
+                    tasks.append((name, model_name, y, origin, config['horizon'],
+                                  config['seasonal_periods']))
+        return tasks
+
+    def run(self, series):
+        """Chạy mọi fold, trả về DataFrame kết quả từng fold"""
+        tasks = self.plan(series)
+        print(f"Backtest {len(tasks)} fold ({len(self.models)} mô hình, "
+              f"{len(series)} chuỗi) với {self.workers} worker")
+
+        if self.workers <= 1:
+            results = [_run_fold(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                results = list(executor.map(_run_fold, tasks))
+        return pd.DataFrame(results)
+
+
+def leaderboard(folds, tolerance=MASE_TOLERANCE):
+    """Bảng xếp hạng theo chuỗi: sai số trung bình, thời gian và mô hình được chọn"""
+    if 'Error' not in folds.columns:
+        folds = folds.assign(Error=np.nan)
+    ok = folds[folds['Error'].isna()]
+
+    board = ok.groupby(['Series', 'Model']).agg(
+        MAPE=('MAPE', 'mean'),
+        sMAPE=('sMAPE', 'mean'),
+        MASE=('MASE', 'mean'),
+        Fit_s=('Fit_s', 'mean'),
+        Predict_s=('Predict_s', 'mean'),
+        Folds=('Origin', 'count'),
+    ).reset_index()
+    failed = folds[folds['Error'].notna()].groupby(['Series', 'Model']).size().rename('Failed')
+    board = board.merge(failed, on=['Series', 'Model'], how='left').fillna({'Failed': 0})
+    board['Failed'] = board['Failed'].astype(int)
+    board['Cost_s'] = board['Fit_s'] + board['Predict_s']
+
+    # Chọn mô hình rẻ nhất trong nhóm có MASE gần mô hình tốt nhất
+    board['Selected'] = False
+    for _, group in board[board['Failed'] == 0].groupby('Series'):
+        if group['MASE'].notna().any():
+            best = group['MASE'].min()
+            candidates = group[group['MASE'] <= best * (1 + tolerance)]
+        else:
+            # Chuỗi huấn luyện không đổi (MASE không xác định): chọn mô hình rẻ nhất
+            candidates = group
+        board.loc[candidates['Cost_s'].idxmin(), 'Selected'] = True
+
+    return board.sort_values(['Series', 'MASE']).reset_index(drop=True)
+
+
+def selected_model(series_name='monthly', path=None, config=None):
+    """Mô hình được chọn cho một chuỗi theo bảng xếp hạng đã lưu (None nếu chưa có)"""
+    path = path or resolve(config).leaderboard_path
+    if not os.path.exists(path):
+        return None
+    board = pd.read_csv(path)
+    chosen = board[(board['Series'] == series_name) & board['Selected']]
+    return None if chosen.empty else chosen['Model'].iloc[0]
+
+
+# Hàm chính cho module này
+def main_backtesting(df_path=None, workers=None, config=None):
+    """Hàm chính cho backtest mô hình dự báo"""
+    print("=" * 60)
+    print("BACKTEST MÔ HÌNH DỰ BÁO")
+    print("=" * 60)
+
+    config = resolve(config)
+    df_path = df_path or config.cleaned_path
+
+    if not os.path.exists(df_path):
+        print(f"File {df_path} không tồn tại!")
+        return None
+
+    df = pd.read_csv(df_path)
+    series = load_series(df)
+    for name, y in series.items():
+        print(f"Chuỗi {name}: {len(y)} kỳ")
+
+    started = time.perf_counter()
+    folds = Backtester(workers=workers or config.forecast_workers).run(series)
+    board = leaderboard(folds)
+    print(f"Hoàn tất trong {time.perf_counter() - started:.1f}s")
+
+    os.makedirs(os.path.dirname(config.leaderboard_path), exist_ok=True)
+    folds.to_csv(config.folds_path, index=False)
+    board.to_csv(config.leaderboard_path, index=False)
+    print(f"Đã lưu bảng xếp hạng: {config.leaderboard_path}")
+
+    with pd.option_context('display.width', 120, 'display.float_format', '{:,.3f}'.format):
+        print(board.to_string(index=False))
+    return board
+
+
+if __name__ == "__main__":
+    main_backtesting()
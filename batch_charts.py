@@ -0,0 +1,269 @@
+"""batch_charts.py - Xuất bộ biểu đồ cho từng phân đoạn (kênh, tháng, nhân viên...)
+
+Dữ liệu được chia phân đoạn một lần bằng groupby cho mỗi chiều, mỗi phân đoạn
+được vẽ đủ 12 biểu đồ vào thư mục riêng, song song trên nhiều tiến trình.
+Mỗi phân đoạn vẽ xong có file _SUCCESS ghi hash dữ liệu của phân đoạn và
+render profile: lần chạy sau chỉ bỏ qua phân đoạn khi cả hai còn khớp, nên lô
+bị ngắt giữa chừng chạy tiếp từ chỗ dừng còn dữ liệu mới thì được vẽ lại.
+Phân đoạn lỗi cũng được ghi lại và không vẽ lại cho tới khi dữ liệu thay đổi.
+"""
+import pandas as pd
+import os
+import re
+import io
+import json
+import time
+import hashlib
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from chart_renderer import BatchRenderer
+from visualize_daily1 import DailyVisualizer
+from visualize_product1 import ProductVisualizer
+from visualize_channel1 import ChannelVisualizer
+from visualize_staff1 import StaffVisualizer
+from run_config import RunConfig, resolve
+import cleaned_store
+
+# Các biểu đồ xuất cho mỗi phân đoạn (giống create_all_charts của từng visualizer)
+CHART_GROUPS = [
+    (DailyVisualizer, ['plot_daily_revenue', 'plot_monthly_trend', 'plot_quarterly_comparison']),
+    (ProductVisualizer, ['plot_product_quantity', 'plot_product_revenue', 'plot_size_distribution']),
+    (ChannelVisualizer, ['plot_channel_revenue', 'plot_channel_trend', 'plot_channel_by_product']),
+    (StaffVisualizer, ['plot_top_staff', 'plot_staff_by_channel', 'plot_staff_trend']),
+]
+
+SUCCESS_MARKER = '_SUCCESS'
+MANIFEST_NAME = '_manifest.jsonl'
+
+# Trạng thái riêng của mỗi tiến trình worker
+_worker_state = {}
+
+
+def _safe_name(value):
+    """Chuẩn hóa giá trị thành tên thư mục hợp lệ"""
+    return re.sub(r'[^\w.\-]+', '_', str(value)).strip('_') or 'NA'
+
+
+def segment_dir_name(columns, key):
+    """Tên thư mục kiểu Order_Channel=Online/Size=L cho một phân đoạn"""
+    if not isinstance(key, tuple):
+        key = (key,)
+    return os.path.join(*[f'{col}={_safe_name(val)}' for col, val in zip(columns, key)])
+
+
+def plan_segments(df, segments, filters=None):
+    """Chia dữ liệu thành các phân đoạn, mỗi chiều chỉ một lần groupby
+
+    segments: danh sách tên cột hoặc tuple tên cột, ví dụ
+        ['Order_Channel', 'Year_Month', ('Order_Channel', 'Size')]
+    filters: dict giới hạn giá trị cho từng cột, ví dụ {'Year_Month': ['2023-01']}
+    Trả về list (tên thư mục, mảng vị trí dòng).
+    """
+    filters = filters or {}
+    plan = []
+
+    for spec in segments:
+        columns = [spec] if isinstance(spec, str) else list(spec)
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            print(f"Bỏ qua phân đoạn {columns}: thiếu cột {missing}")
+            continue
+
+        # groupby.indices trả về vị trí dòng của mọi nhóm sau một lần duyệt
+        indices = df.groupby(columns if len(columns) > 1 else columns[0], sort=True).indices
+
+        for key, rows in indices.items():
+            values = key if isinstance(key, tuple) else (key,)
+            if any(col in filters and val not in filters[col] for col, val in zip(columns, values)):
+                continue
+            plan.append((segment_dir_name(columns, key), rows))
+
+    return plan
+
+
+def row_hashes(df):
+    """Hash từng dòng dữ liệu (tính một lần cho cả bảng)"""
+    return pd.util.hash_pandas_object(df, index=False).values
+
+
+def segment_hash(hashes, rows):
+    """Hash nội dung một phân đoạn từ hash các dòng của nó"""
+    return hashlib.sha256(hashes[rows].tobytes()).hexdigest()[:16]
+
+
+def read_marker(segment_dir):
+    """Đọc marker của phân đoạn, None nếu chưa có hoặc hỏng"""
+    try:
+        with open(os.path.join(segment_dir, SUCCESS_MARKER), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_marker(segment_dir, marker):
+    # Ghi ra file tạm rồi đổi tên để marker không bao giờ bị ghi dở
+    path = os.path.join(segment_dir, SUCCESS_MARKER)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(marker, f, ensure_ascii=False)
+    os.replace(path + '.tmp', path)
+
+
+def _load_cleaned(df_path):
+    # Với file .arrow mọi worker map cùng một file, dùng chung page cache
+    return cleaned_store.read_table(df_path, parse_dates=['Date'])
+
+
+def _init_worker(df_path, dpi):
+    """Mỗi worker tải dữ liệu và tạo renderer một lần"""
+    _worker_state['df'] = _load_cleaned(df_path)
+    _worker_state['renderer'] = BatchRenderer(dpi=dpi)
+
+
+def _render_segment(segment_dir, rows, stamp):
+    """Vẽ toàn bộ biểu đồ cho một phân đoạn và ghi marker kèm `stamp`
+
+    stamp: dict {'input_hash', 'profile'} dùng để quyết định lần chạy sau
+    có cần vẽ lại phân đoạn hay không.
+    """
+    df = _worker_state['df'].take(rows)
+    renderer = _worker_state['renderer']
+    started = time.perf_counter()
+
+    created, failed = [], []
+    # Ẩn thông báo của visualizer, chỉ báo cáo tổng hợp theo phân đoạn
+    with contextlib.redirect_stdout(io.StringIO()):
+        for visualizer_cls, methods in CHART_GROUPS:
+            visualizer = visualizer_cls(df, renderer=renderer, output_dir=segment_dir)
+            for method in methods:
+                try:
+                    if getattr(visualizer, method)():
+                        created.append(method)
+                    else:
+                        failed.append(method)
+                except Exception as e:
+                    failed.append(f'{method}: {e}')
+
+    result = {
+        'segment': segment_dir,
+        'rows': len(df),
+        'charts': len(created),
+        'failed': failed,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+    # Ghi marker sau cùng: thư mục chỉ được coi là xong khi đủ bước. Phân đoạn
+    # lỗi cũng có marker (status=failed) để lỗi cố định không bị vẽ lại mãi
+    os.makedirs(segment_dir, exist_ok=True)
+    _write_marker(segment_dir, {**result, **stamp, 'status': 'failed' if failed else 'ok'})
+
+    return result
+
+
+class BatchChartEngine:
+    def __init__(self, df_path=None, output_root=None, workers=None, dpi=None, config=None,
+                 retry_failed=False):
+        config = resolve(config)
+        self.df_path = df_path or cleaned_store.preferred_path(config.cleaned_path)
+        self.output_root = output_root or config.segments_dir
+        self.workers = workers or config.chart_workers
+        self.dpi = dpi or config.dpi
+        self.retry_failed = retry_failed
+        # Đổi profile, dpi hay danh sách biểu đồ đều phải vẽ lại mọi phân đoạn
+        self.profile = {
+            'render_profile': config.render_profile,
+            'dpi': self.dpi,
+            'charts': [method for _, methods in CHART_GROUPS for method in methods],
+        }
+
+    def pending_segments(self, plan, hashes):
+        """Chọn các phân đoạn cần vẽ: chưa có marker, hoặc marker khác hash / profile
+
+        Trả về (pending, skipped_failed) với pending là list
+        (thư mục, mảng vị trí dòng, stamp).
+        """
+        pending, skipped_failed = [], 0
+        for name, rows in plan:
+            segment_dir = os.path.join(self.output_root, name)
+            stamp = {'input_hash': segment_hash(hashes, rows), 'profile': self.profile}
+            marker = read_marker(segment_dir)
+
+            if (marker is not None and marker.get('input_hash') == stamp['input_hash']
+                    and marker.get('profile') == stamp['profile']):
+                if marker.get('status') != 'failed':
+                    continue
+                if not self.retry_failed:
+                    skipped_failed += 1
+                    continue
+            pending.append((segment_dir, rows, stamp))
+        return pending, skipped_failed
+
+    def run(self, segments, filters=None):
+        """Xuất biểu đồ cho tất cả phân đoạn, trả về danh sách kết quả"""
+        df = _load_cleaned(self.df_path)
+        plan = plan_segments(df, segments, filters)
+        pending, skipped_failed = self.pending_segments(plan, row_hashes(df))
+        del df
+
+        print(f"Tổng {len(plan)} phân đoạn, đã xong {len(plan) - len(pending) - skipped_failed}, "
+              f"lỗi chưa đổi dữ liệu {skipped_failed}, còn lại {len(pending)}")
+        if not pending:
+            return []
+
+        os.makedirs(self.output_root, exist_ok=True)
+        manifest_path = os.path.join(self.output_root, MANIFEST_NAME)
+        started = time.perf_counter()
+        results = []
+
+        with open(manifest_path, 'a', encoding='utf-8') as manifest:
+            def record(result):
+                results.append(result)
+                manifest.write(json.dumps(result, ensure_ascii=False) + '\n')
+                manifest.flush()
+                if len(results) % 50 == 0 or len(results) == len(pending):
+                    elapsed = time.perf_counter() - started
+                    charts = sum(r['charts'] for r in results)
+                    print(f"  {len(results)}/{len(pending)} phân đoạn, "
+                          f"{charts / elapsed:.1f} biểu đồ/giây")
+
+            if self.workers <= 1:
+                _init_worker(self.df_path, self.dpi)
+                for segment_dir, rows, stamp in pending:
+                    record(_render_segment(segment_dir, rows, stamp))
+            else:
+                with ProcessPoolExecutor(max_workers=self.workers,
+                                         initializer=_init_worker,
+                                         initargs=(self.df_path, self.dpi)) as executor:
+                    futures = [executor.submit(_render_segment, segment_dir, rows, stamp)
+                               for segment_dir, rows, stamp in pending]
+                    for future in as_completed(futures):
+                        record(future.result())
+
+        failed = [r for r in results if r['failed']]
+        print(f"Đã xuất {sum(r['charts'] for r in results)} biểu đồ cho {len(results)} phân đoạn "
+              f"trong {time.perf_counter() - started:.1f}s ({len(failed)} phân đoạn có biểu đồ lỗi, "
+              f"chỉ vẽ lại khi dữ liệu thay đổi)")
+        return results
+
+
+# Hàm chính cho module này
+def main_batch_charts(df_path=None, segments=('Order_Channel', 'Year_Month', 'Staff_id'),
+                      output_root=None, workers=None, config=None):
+    """Hàm chính cho xuất biểu đồ theo phân đoạn"""
+    print("=" * 60)
+    print("XUẤT BIỂU ĐỒ THEO PHÂN ĐOẠN")
+    print("=" * 60)
+
+    config = resolve(config)
+    df_path = df_path or cleaned_store.preferred_path(config.cleaned_path)
+
+    if not os.path.exists(df_path):
+        print(f"File {df_path} không tồn tại!")
+        return None
+
+    engine = BatchChartEngine(df_path, output_root=output_root, workers=workers, config=config)
+    return engine.run(list(segments))
+
+
+if __name__ == "__main__":
+    main_batch_charts(config=RunConfig.from_args())
@@ -0,0 +1,244 @@
+"""benchmark_suite.py - Benchmark các bước tiền xử lý, pivot, biểu đồ và tải dữ liệu dashboard
+
+Sinh dữ liệu giả lập cùng định dạng data_1.csv (lấy mẫu có hoàn lại từ dữ liệu
+thật, ngày ngẫu nhiên) ở các cỡ 10k / 1M / 10M / 50M dòng, đo thời gian, thông
+lượng (dòng/giây) và bộ nhớ đỉnh của từng bước, rồi so với baseline đã lưu để
+đánh dấu các bước chậm đi quá ngưỡng.
+
+Chạy: python benchmark_suite.py 10k 1m                 (so với baseline)
+      python benchmark_suite.py 10k 1m --save-baseline (lưu làm baseline mới)
+"""
+import pandas as pd
+import numpy as np
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import threading
+import warnings
+import contextlib
+import psutil
+
+from run_config import resolve
+
+SIZES = {
+    '10k': 10_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+    '50m': 50_000_000,
+}
+
+BASELINE_NAME = 'baseline.json'
+RESULTS_NAME = 'latest.csv'
+REGRESSION_THRESHOLD = 0.20
+MIN_REGRESSION_SECONDS = 0.05
+CHUNK_ROWS = 1_000_000
+
+
+def generate_raw_data(n_rows, output_path, source_path='data_1.csv', seed=42):
+    """Sinh file CSV giả lập cùng cấu trúc file gốc, ghi theo khối để tiết kiệm bộ nhớ"""
+    sample = pd.read_csv(source_path, sep=';', encoding='utf-8-sig', dtype=str)
+    dates = pd.date_range('2021-01-01', '2024-01-31', freq='D').strftime('%d/%m/%Y').to_numpy()
+    rng = np.random.default_rng(seed)
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        for start in range(0, n_rows, CHUNK_ROWS):
+            size = min(CHUNK_ROWS, n_rows - start)
+            chunk = sample.iloc[rng.integers(0, len(sample), size)].reset_index(drop=True)
+            chunk['Sale_id'] = 'S' + pd.Series(np.arange(start, start + size)).astype(str).str.zfill(9)
+            chunk['Date'] = dates[rng.integers(0, len(dates), size)]
+            chunk.to_csv(f, sep=';', index=False, header=start == 0)
+    return output_path
+
+
+class PeakMemory:
+    """Theo dõi RSS đỉnh trong một khối lệnh bằng luồng lấy mẫu"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.process.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.start_rss = self.process.memory_info().rss
+        self.peak = self.start_rss
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+        return False
+
+
+class BenchmarkSuite:
+    def __init__(self, work_dir=None, config=None):
+        self.work_dir = work_dir or os.path.join(resolve(config).benchmark_dir, 'work')
+        self.results = []
+
+    def measure(self, size_name, rows, stage, func, *args, **kwargs):
+        """Chạy một bước, ghi thời gian, thông lượng và bộ nhớ đỉnh"""
+        with PeakMemory() as memory, contextlib.redirect_stdout(io.StringIO()), \
+                warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            seconds = time.perf_counter() - started
+
+        self.results.append({
+            'size': size_name,
+            'rows': rows,
+            'stage': stage,
+            'seconds': round(seconds, 4),
+            'rows_per_s': round(rows / seconds) if seconds > 0 else None,
+            'peak_rss_mb': round(memory.peak / 1e6, 1),
+            'peak_delta_mb': round((memory.peak - memory.start_rss) / 1e6, 1),
+        })
+        print(f"  {stage:<45} {seconds:>9.3f}s  {memory.peak / 1e6:>8.0f} MB")
+        return result
+
+    def run_size(self, size_name):
+        from data_preprocess_1 import DataPreprocessor
+        from pivot_analysis import PivotAnalyzer
+        from visualize_daily1 import DailyVisualizer
+        from visualize_product1 import ProductVisualizer
+        from visualize_channel1 import ChannelVisualizer
+        from visualize_staff1 import StaffVisualizer
+
+        n_rows = SIZES[size_name]
+        size_dir = os.path.join(self.work_dir, size_name)
+        raw_path = os.path.join(size_dir, 'raw.csv')
+        cleaned_path = os.path.join(size_dir, 'cleaned_data.csv')
+        pivot_path = os.path.join(size_dir, 'pivot_tables.xlsx')
+
+        print(f"\n[{size_name}] {n_rows:,} dòng")
+        self.measure(size_name, n_rows, 'generate_data', generate_raw_data, n_rows, raw_path)
+
+        # 1. Tiền xử lý
+        preprocessor = DataPreprocessor(raw_path)
+        self.measure(size_name, n_rows, 'DataPreprocessor.load_data', preprocessor.load_data)
+        self.measure(size_name, n_rows, 'DataPreprocessor.clean_data', preprocessor.clean_data)
+        self.measure(size_name, n_rows, 'DataPreprocessor.save_cleaned_data',
+                     preprocessor.save_cleaned_data, cleaned_path)
+        df = preprocessor.df
+        preprocessor.df = None
+
+        # 2. Pivot
+        analyzer = PivotAnalyzer(df)
+        self.measure(size_name, n_rows, 'PivotAnalyzer.create_all_pivots', analyzer.create_all_pivots)
+        self.measure(size_name, n_rows, 'PivotAnalyzer.save_to_excel', analyzer.save_to_excel, pivot_path)
+        self.measure(size_name, n_rows, 'PivotAnalyzer.save_to_csv', analyzer.save_to_csv,
+                     os.path.join(size_dir, 'pivot_csv'))
+
+        # 3. Từng biểu đồ
+        chart_dir = os.path.join(size_dir, 'charts')
+        for visualizer_cls in (DailyVisualizer, ProductVisualizer, ChannelVisualizer, StaffVisualizer):
+            visualizer = visualizer_cls(df, output_dir=chart_dir)
+            for method in sorted(m for m in dir(visualizer_cls) if m.startswith('plot_')):
+                self.measure(size_name, n_rows, f'{visualizer_cls.__name__}.{method}',
+                             getattr(visualizer, method))
+        del df, analyzer
+
+        # 4. Tải dữ liệu dashboard (lần đầu đọc đĩa, lần sau lấy từ cache)
+        import data_access
+        data_access.clear_cache()
+        self.measure(size_name, n_rows, 'dashboard.load_cleaned_data (cold)',
+                     data_access.load_cleaned_data, cleaned_path)
+        self.measure(size_name, n_rows, 'dashboard.load_cleaned_data (warm)',
+                     data_access.load_cleaned_data, cleaned_path)
+        self.measure(size_name, n_rows, 'dashboard.get_query_engine',
+                     data_access.get_query_engine, cleaned_path)
+        self.measure(size_name, n_rows, 'dashboard.load_chart_aggregates',
+                     data_access.load_chart_aggregates, cleaned_path)
+        self.measure(size_name, n_rows, 'dashboard.load_pivot_tables',
+                     data_access.load_pivot_tables, pivot_path)
+        data_access.clear_cache()
+
+        shutil.rmtree(size_dir, ignore_errors=True)
+
+    def run(self, sizes):
+        for size_name in sizes:
+            self.run_size(size_name)
+        return pd.DataFrame(self.results)
+
+
+def load_baseline(path=None, config=None):
+    path = path or os.path.join(resolve(config).benchmark_dir, BASELINE_NAME)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_baseline(results, path=None, config=None):
+    """Lưu kết quả làm baseline (gộp với các cỡ dữ liệu đã có)"""
+    path = path or os.path.join(resolve(config).benchmark_dir, BASELINE_NAME)
+    baseline = load_baseline(path)
+    for row in results.itertuples():
+        baseline.setdefault(row.size, {})[row.stage] = row.seconds
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+    print(f"Đã lưu baseline: {path}")
+
+
+def compare_with_baseline(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Thêm cột baseline, % thay đổi và cờ chậm đi quá ngưỡng"""
+    results = results.copy()
+    results['baseline_s'] = pd.to_numeric(pd.Series(
+        [baseline.get(size, {}).get(stage) for size, stage in zip(results['size'], results['stage'])],
+        index=results.index, dtype=object))
+    results['change_pct'] = ((results['seconds'] / results['baseline_s'] - 1) * 100).round(1)
+    # Bỏ qua dao động nhỏ hơn MIN_REGRESSION_SECONDS ở các bước rất nhanh (đọc từ cache...)
+    results['regression'] = ((results['change_pct'] > threshold * 100)
+                             & (results['seconds'] - results['baseline_s'] > MIN_REGRESSION_SECONDS))
+    return results
+
+
+# Hàm chính cho module này
+def main_benchmark_suite(sizes=('10k',), update_baseline=False, config=None):
+    """Hàm chính cho benchmark"""
+    print("=" * 60)
+    print("BENCHMARK PIPELINE VÀ DASHBOARD")
+    print("=" * 60)
+
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        print(f"Cỡ dữ liệu không hợp lệ: {unknown} (chọn trong {list(SIZES)})")
+        return None
+
+    config = resolve(config)
+    results = BenchmarkSuite(config=config).run(sizes)
+    results = compare_with_baseline(results, load_baseline(config=config))
+    os.makedirs(config.benchmark_dir, exist_ok=True)
+    results_path = os.path.join(config.benchmark_dir, RESULTS_NAME)
+    results.to_csv(results_path, index=False)
+    print(f"\nĐã lưu kết quả: {results_path}")
+
+    regressions = results[results['regression']]
+    if len(regressions):
+        print(f"\nCẢNH BÁO: {len(regressions)} bước chậm hơn baseline trên {REGRESSION_THRESHOLD:.0%}:")
+        print(regressions[['size', 'stage', 'baseline_s', 'seconds', 'change_pct']].to_string(index=False))
+    elif results['baseline_s'].notna().any():
+        print("Không có bước nào chậm hơn baseline quá ngưỡng")
+
+    if update_baseline:
+        save_baseline(results, config=config)
+    return results
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    main_benchmark_suite(sizes=tuple(args) or ('10k',), update_baseline='--save-baseline' in sys.argv)
@@ -0,0 +1,169 @@
+"""bitmap_index.py - Chỉ mục bitmap cho các cột phân loại
+
+Mỗi giá trị của Product_Name, Size, Order_Channel, Staff_id, Year_Month có một
+bitmap (numpy packbits, 1 bit/dòng). Bộ lọc nhiều điều kiện được ghép bằng OR
+trong cùng một cột và AND giữa các cột trên mảng byte, thay vì so sánh chuỗi
+trên cả cột object cho từng điều kiện; bitmap kết quả được đưa thẳng vào bước
+tổng hợp.
+"""
+import pandas as pd
+import numpy as np
+import os
+import time
+from run_config import resolve
+
+INDEX_COLUMNS = ['Product_Name', 'Size', 'Order_Channel', 'Staff_id', 'Year_Month']
+
+# Số bit 1 của mỗi giá trị byte (đếm số dòng khớp mà không cần giải nén)
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+class BitmapIndex:
+    def __init__(self, df, columns=None):
+        self.df = df
+        self.n_rows = len(df)
+        self.n_bytes = (self.n_rows + 7) // 8
+        self.bitmaps = {}
+
+        for col in columns or INDEX_COLUMNS:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col], sort=True)
+            # Sắp xếp theo mã một lần, mỗi giá trị là một đoạn liên tục các vị trí dòng
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self.bitmaps[col] = {}
+            for i, value in enumerate(uniques):
+                bits = np.zeros(self.n_rows, dtype=bool)
+                bits[order[bounds[i]:bounds[i + 1]]] = True
+                self.bitmaps[col][value] = np.packbits(bits)
+
+    def values(self, column):
+        return list(self.bitmaps[column])
+
+    def all_rows(self):
+        return np.packbits(np.ones(self.n_rows, dtype=bool))
+
+    def none(self):
+        return np.zeros(self.n_bytes, dtype=np.uint8)
+
+    def range_bitmap(self, start, stop):
+        """Bitmap các dòng [start, stop) (dùng khi dữ liệu đã sắp theo ngày)"""
+        bits = np.zeros(self.n_rows, dtype=bool)
+        bits[start:stop] = True
+        return np.packbits(bits)
+
+    def column_bitmap(self, column, values):
+        """OR các bitmap của những giá trị được chọn trong một cột"""
+        if isinstance(values, str) or not hasattr(values, '__iter__'):
+            values = [values]
+        result = self.none()
+        for value in values:
+            bitmap = self.bitmaps[column].get(value)
+            if bitmap is not None:
+                np.bitwise_or(result, bitmap, out=result)
+        return result
+
+    def select(self, **filters):
+        """AND các điều kiện giữa các cột; cột có danh sách rỗng/None không lọc
+
+        Ví dụ: select(Size='L', Order_Channel='Online', Product_Name=['Mocha', 'Latte'])
+        """
+        result = self.all_rows()
+        for column, values in filters.items():
+            if values is None or (not isinstance(values, str) and len(values) == 0):
+                continue
+            if column not in self.bitmaps:
+                raise KeyError(f"Cột {column} chưa được lập chỉ mục bitmap")
+            np.bitwise_and(result, self.column_bitmap(column, values), out=result)
+        return result
+
+    def count(self, bitmap):
+        return int(_POPCOUNT[bitmap].sum(dtype=np.int64))
+
+    def positions(self, bitmap):
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.n_rows))
+
+    def rows(self, bitmap):
+        """Các dòng của DataFrame gốc ứng với bitmap"""
+        return self.df.take(self.positions(bitmap))
+
+    def aggregate(self, bitmap, measures=('Revenue', 'Quantity'), by=None):
+        """Tổng các cột đo trên những dòng khớp bitmap, có thể nhóm theo cột"""
+        positions = self.positions(bitmap)
+        if by is None:
+            totals = {col: float(self.df[col].to_numpy()[positions].sum()) for col in measures}
+            totals['Orders'] = len(positions)
+            return totals
+
+        rows = self.df.take(positions)
+        return rows.groupby(by).agg(
+            **{col: (col, 'sum') for col in measures},
+            Orders=(measures[0], 'size'),
+        ).sort_values(measures[0], ascending=False).reset_index()
+
+
+def _pandas_select(df, filters):
+    """Cách lọc cũ: một mặt nạ boolean cho mỗi điều kiện trên cột object"""
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in filters.items():
+        values = [values] if isinstance(values, str) else values
+        mask &= df[column].isin(values).to_numpy()
+    return mask
+
+
+# Hàm chính cho module này
+def main_bitmap_index(df_path=None, scale=1000, repeat=20, config=None):
+    """Benchmark bitmap index so với mặt nạ pandas trên dữ liệu nhân bản"""
+    print("=" * 60)
+    print("BITMAP INDEX - BENCHMARK")
+    print("=" * 60)
+
+    df_path = df_path or resolve(config).cleaned_path
+    if not os.path.exists(df_path):
+        print(f"File {df_path} không tồn tại!")
+        return None
+
+    df = pd.read_csv(df_path)
+    df = pd.concat([df] * scale, ignore_index=True)
+    print(f"Dữ liệu benchmark: {len(df):,} dòng (nhân {scale} lần)")
+
+    started = time.perf_counter()
+    index = BitmapIndex(df)
+    build_seconds = time.perf_counter() - started
+    size_mb = sum(b.nbytes for col in index.bitmaps.values() for b in col.values()) / 1e6
+    print(f"Dựng chỉ mục: {build_seconds:.2f}s, {size_mb:.1f} MB bitmap")
+
+    products = index.values('Product_Name')
+    cases = {
+        'Size=L & Online': {'Size': 'L', 'Order_Channel': 'Online'},
+        'Size=L & Online & 2 sản phẩm': {'Size': 'L', 'Order_Channel': 'Online',
+                                         'Product_Name': products[:2]},
+        '5 nhân viên & 6 tháng': {'Staff_id': index.values('Staff_id')[:5],
+                                  'Year_Month': index.values('Year_Month')[:6]},
+    }
+
+    results = []
+    for name, filters in cases.items():
+        started = time.perf_counter()
+        for _ in range(repeat):
+            totals = index.aggregate(index.select(**filters))
+        bitmap_ms = (time.perf_counter() - started) / repeat * 1000
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            expected = df.loc[_pandas_select(df, filters), 'Revenue'].sum()
+        pandas_ms = (time.perf_counter() - started) / repeat * 1000
+
+        results.append({'Bộ lọc': name, 'Số dòng': totals['Orders'],
+                        'Khớp pandas': bool(np.isclose(totals['Revenue'], expected)),
+                        'Bitmap (ms)': round(bitmap_ms, 2), 'Pandas (ms)': round(pandas_ms, 2),
+                        'Nhanh hơn': f"{pandas_ms / bitmap_ms:.1f}x"})
+
+    results = pd.DataFrame(results)
+    print(results.to_string(index=False))
+    return results
+
+
+if __name__ == "__main__":
+    main_bitmap_index()
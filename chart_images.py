@@ -0,0 +1,76 @@
+"""chart_images.py - Cache LRU (trong bộ nhớ) cho ảnh biểu đồ và thumbnail
+
+Ảnh được đọc từ đĩa một lần rồi giữ trong bộ nhớ tiến trình (dùng chung cho mọi
+phiên Streamlit), khóa theo đường dẫn + mtime + kích thước file nên ảnh vẽ lại
+sẽ tự được đọc lại. Tổng dung lượng cache bị giới hạn theo byte.
+"""
+import io
+import os
+import threading
+from cachetools import LRUCache
+from PIL import Image
+
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+THUMBNAIL_WIDTH = 900
+
+_cache = LRUCache(maxsize=CACHE_MAX_BYTES, getsizeof=len)
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def _cache_key(path, variant):
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size, variant
+
+
+def _cached(key, loader):
+    with _lock:
+        data = _cache.get(key)
+        if data is not None:
+            _stats['hits'] += 1
+            return data
+        _stats['misses'] += 1
+
+    data = loader()
+    with _lock:
+        # Ảnh lớn hơn cả cache thì không lưu
+        if len(data) <= CACHE_MAX_BYTES:
+            _cache[key] = data
+    return data
+
+
+def get_image_bytes(path):
+    """Nội dung file ảnh gốc (độ phân giải đầy đủ)"""
+    def load():
+        with open(path, 'rb') as f:
+            return f.read()
+    return _cached(_cache_key(path, 'full'), load)
+
+
+def get_thumbnail_bytes(path, width=THUMBNAIL_WIDTH):
+    """Ảnh thu nhỏ theo chiều rộng `width` (WebP), tạo từ ảnh gốc một lần"""
+    def load():
+        with Image.open(path) as img:
+            img = img.convert('RGB')
+            if img.width > width:
+                img.thumbnail((width, round(img.height * width / img.width)), Image.LANCZOS)
+            buffer = io.BytesIO()
+            img.save(buffer, format='WEBP', quality=85, method=4)
+            return buffer.getvalue()
+    return _cached(_cache_key(path, f'thumb-{width}'), load)
+
+
+def cache_stats():
+    with _lock:
+        return {
+            'entries': len(_cache),
+            'bytes': int(_cache.currsize),
+            'hits': _stats['hits'],
+            'misses': _stats['misses'],
+        }
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+        _stats['hits'] = _stats['misses'] = 0
@@ -0,0 +1,132 @@
+"""chart_labels.py - Ghi nhãn giá trị cho cột, điểm và heatmap
+
+Dùng Axes.bar_label thay cho vòng lặp ax.text trên từng cột. Khi số cột (hoặc
+số hàng/cột của heatmap) vượt quá số nhãn đọc được trên khung hình, nhãn được
+thưa bớt tự động (luôn giữ giá trị lớn nhất) để không tạo hàng trăm artist
+chồng lên nhau.
+"""
+import numpy as np
+from matplotlib.container import BarContainer
+
+# Ước lượng kích thước chữ (theo point) để tính mật độ nhãn
+CHAR_WIDTH_RATIO = 0.6
+LINE_HEIGHT_RATIO = 1.4
+
+
+def _axes_size_points(ax):
+    """Kích thước vùng vẽ của axes (point), không cần renderer"""
+    fig_w, fig_h = ax.figure.get_size_inches()
+    pos = ax.get_position()
+    return pos.width * fig_w * 72, pos.height * fig_h * 72
+
+
+def max_readable_labels(ax, labels, orientation='vertical', fontsize=10):
+    """Số nhãn tối đa đặt được dọc theo trục mà không chồng lên nhau"""
+    width, height = _axes_size_points(ax)
+    if orientation == 'horizontal':
+        # Cột ngang: nhãn xếp theo chiều cao
+        slot = fontsize * LINE_HEIGHT_RATIO
+        available = height
+    else:
+        longest = max((len(label) for label in labels), default=1)
+        slot = longest * fontsize * CHAR_WIDTH_RATIO * 1.2
+        available = width
+    return max(1, int(available // slot))
+
+
+def _decimate(count, max_labels, values):
+    """Chọn chỉ số nhãn được giữ lại: cách đều và luôn có giá trị lớn nhất"""
+    if count <= max_labels:
+        return np.arange(count)
+    step = int(np.ceil(count / max_labels))
+    keep = np.arange(0, count, step)
+    peak = int(np.nanargmax(np.abs(values)))
+    if peak not in keep:
+        keep = np.sort(np.append(keep, peak))
+    return keep
+
+
+def label_bars(ax, bars, fmt='{:,.1f}', fontsize=10, padding=2, max_labels=None,
+               skip_zero=False, **kwargs):
+    """Ghi giá trị lên các cột của một BarContainer bằng Axes.bar_label
+
+    fmt: chuỗi định dạng cho mỗi giá trị (giá trị lấy từ chiều cao/rộng cột)
+    max_labels: số nhãn tối đa; mặc định tính theo kích thước khung hình
+    skip_zero: bỏ nhãn của cột bằng 0
+    """
+    values = np.asarray(bars.datavalues, dtype=float)
+    if len(values) == 0:
+        return []
+
+    candidates = np.flatnonzero(values != 0) if skip_zero else np.arange(len(values))
+    if len(candidates) == 0:
+        return []
+
+    labels = [fmt.format(v) for v in values[candidates]]
+    if max_labels is None:
+        max_labels = max_readable_labels(ax, labels, bars.orientation, fontsize)
+
+    keep = _decimate(len(candidates), max_labels, values[candidates])
+    selected = candidates[keep]
+
+    if len(selected) == len(values):
+        container = bars
+    else:
+        container = BarContainer([bars.patches[i] for i in selected],
+                                 datavalues=values[selected],
+                                 orientation=bars.orientation)
+
+    return ax.bar_label(container, labels=[labels[i] for i in keep],
+                        padding=padding, fontsize=fontsize, **kwargs)
+
+
+def label_points(ax, x, y, labels, offset=(5, 5), fontsize=9, max_labels=None, **kwargs):
+    """Ghi nhãn cho các điểm (scatter) từ mảng, không duyệt DataFrame theo dòng"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    labels = [str(label) for label in labels]
+
+    if max_labels is not None and len(labels) > max_labels:
+        keep = np.argsort(-y, kind='stable')[:max_labels]
+    else:
+        keep = np.arange(len(labels))
+
+    return [ax.annotate(labels[i], (x[i], y[i]), xytext=offset,
+                        textcoords='offset points', fontsize=fontsize, **kwargs)
+            for i in keep]
+
+
+def label_heatmap(ax, values, fmt='{:.1f}', fontsize=8, max_labels=None):
+    """Ghi giá trị lên các ô heatmap khác 0
+
+    Khi ô nhỏ hơn nhãn, chỉ ghi nhãn trên các hàng/cột cách đều (luôn giữ hàng
+    và cột của ô lớn nhất) như label_bars; max_labels giới hạn thêm tổng số
+    nhãn, ưu tiên các ô có giá trị lớn
+    """
+    values = np.asarray(values, dtype=float)
+    positive = np.where(values > 0, values, 0)
+    if not positive.any():
+        return []
+
+    labels = [fmt.format(v) for v in values[positive > 0]]
+    n_rows, n_cols = values.shape
+    keep_rows = _decimate(n_rows, max_readable_labels(ax, labels, 'horizontal', fontsize),
+                          positive.max(axis=1))
+    keep_cols = _decimate(n_cols, max_readable_labels(ax, labels, 'vertical', fontsize),
+                          positive.max(axis=0))
+
+    mask = np.zeros(values.shape, dtype=bool)
+    mask[np.ix_(keep_rows, keep_cols)] = True
+    rows, cols = np.nonzero(mask & (positive > 0))
+
+    cell_values = values[rows, cols]
+    if max_labels is not None and len(rows) > max_labels:
+        top = np.sort(np.argsort(-cell_values, kind='stable')[:max_labels])
+        rows, cols, cell_values = rows[top], cols[top], cell_values[top]
+
+    threshold = positive.max() / 2
+    colors = np.where(cell_values < threshold, 'black', 'white')
+
+    return [ax.text(col, row, fmt.format(value), ha='center', va='center',
+                    color=color, fontsize=fontsize)
+            for row, col, value, color in zip(rows, cols, cell_values, colors)]
@@ -0,0 +1,210 @@
+"""chart_renderer.py - Tạo figure, áp dụng style và lưu biểu đồ cho các visualizer
+
+ChartRenderer giữ cách làm cũ (mỗi biểu đồ một figure mới qua pyplot).
+BatchRenderer dành cho việc xuất hàng loạt: chạy headless trên backend Agg,
+áp dụng style một lần, tái sử dụng figure/axes theo từng loại biểu đồ và chỉ
+làm sạch axes (cla) giữa hai lần vẽ.
+"""
+import time
+
+import matplotlib
+import matplotlib.pyplot as plt
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from telemetry import timed
+
+CHART_STYLE = 'seaborn-v0_8-darkgrid'
+CHART_DPI = 300
+
+
+class ChartRenderer:
+    """Tạo figure mới cho mỗi biểu đồ và đóng lại sau khi lưu"""
+
+    def __init__(self, dpi=CHART_DPI):
+        self.dpi = dpi
+        self.render_count = 0
+        self.render_seconds = 0.0
+        self.chart_seconds = {}
+        self._started = None
+        self._first_render = None
+
+    def apply_style(self, style=CHART_STYLE, palette=None):
+        """Thiết lập style matplotlib (và palette seaborn) cho visualizer"""
+        plt.style.use(style)
+        if palette is not None:
+            sns.set_palette(palette)
+
+    def subplots(self, name, nrows=1, ncols=1, figsize=None):
+        """Tạo figure và axes cho biểu đồ `name` (giống plt.subplots)"""
+        self._started = time.perf_counter()
+        if self._first_render is None:
+            self._first_render = self._started
+        return plt.subplots(nrows, ncols, figsize=figsize)
+
+    @timed('ChartRenderer.save')
+    def save(self, fig, path, name=None):
+        """Căn lề, lưu biểu đồ ra file và giải phóng figure"""
+        fig.tight_layout()
+        fig.savefig(path, dpi=self.dpi, bbox_inches='tight')
+        self._release(fig)
+        self._record(name or path)
+        return path
+
+    def _release(self, fig):
+        plt.close(fig)
+
+    def _record(self, name):
+        if self._started is None:
+            return
+        elapsed = time.perf_counter() - self._started
+        self.render_count += 1
+        self.render_seconds += elapsed
+        self.chart_seconds[name] = self.chart_seconds.get(name, 0.0) + elapsed
+        self._started = None
+
+    @property
+    def charts_per_second(self):
+        """Số biểu đồ đã lưu mỗi giây (tính từ lần vẽ đầu tiên)"""
+        if not self.render_count or self._first_render is None:
+            return 0.0
+        wall = time.perf_counter() - self._first_render
+        return self.render_count / wall if wall > 0 else 0.0
+
+    def stats(self):
+        """Thống kê hiệu năng vẽ biểu đồ"""
+        return {
+            'charts': self.render_count,
+            'render_seconds': round(self.render_seconds, 3),
+            'charts_per_second': round(self.charts_per_second, 2),
+            'avg_ms_per_chart': round(1000 * self.render_seconds / self.render_count, 1)
+            if self.render_count else 0.0,
+            'seconds_by_chart': {k: round(v, 3) for k, v in self.chart_seconds.items()},
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"Đã vẽ {stats['charts']} biểu đồ trong {stats['render_seconds']:.2f}s "
+              f"({stats['charts_per_second']:.2f} biểu đồ/giây, "
+              f"{stats['avg_ms_per_chart']:.0f} ms/biểu đồ)")
+
+
+class BatchRenderer(ChartRenderer):
+    """Renderer headless tái sử dụng figure/axes cho việc xuất biểu đồ hàng loạt
+
+    Mỗi loại biểu đồ (theo `name`) có một template figure riêng. Lần vẽ sau bỏ
+    các axes phụ (twinx, colorbar), khôi phục bố cục và làm sạch từng axes
+    (cla: artist, locator / formatter, tick params, giới hạn trục), nên ảnh
+    giống hệt figure mới mà không phải dựng lại figure, canvas, font và style.
+    """
+
+    def __init__(self, dpi=CHART_DPI, style=CHART_STYLE, palette=None):
+        super().__init__(dpi=dpi)
+
+        # Cố định backend Agg (không cần màn hình)
+        if matplotlib.get_backend().lower() != 'agg':
+            plt.switch_backend('agg')
+
+        # Style chỉ áp dụng một lần cho cả lô
+        super().apply_style(style, palette)
+        self._templates = {}
+
+    def apply_style(self, style=CHART_STYLE, palette=None):
+        # Style đã cố định khi khởi tạo, visualizer không cần áp dụng lại;
+        # palette riêng của visualizer vẫn phải áp dụng (cla() lấy vòng màu từ đó)
+        if palette is not None:
+            sns.set_palette(palette)
+
+    def subplots(self, name, nrows=1, ncols=1, figsize=None):
+        self._started = time.perf_counter()
+        if self._first_render is None:
+            self._first_render = self._started
+
+        key = (name, nrows, ncols, tuple(figsize) if figsize is not None else None)
+        template = self._templates.get(key)
+
+        if template is None:
+            fig = Figure(figsize=figsize)
+            FigureCanvasAgg(fig)
+            axes = fig.subplots(nrows, ncols, squeeze=True)
+            flat_axes = list(axes.flat) if hasattr(axes, 'flat') else [axes]
+            template = {
+                'fig': fig,
+                'axes': axes,
+                'base_axes': flat_axes,
+                'specs': [ax.get_subplotspec() for ax in flat_axes],
+                'subplotpars': self._subplotpars(fig),
+            }
+            self._templates[key] = template
+        else:
+            self._reset_template(template)
+
+        return template['fig'], template['axes']
+
+    def _release(self, fig):
+        # Giữ figure lại trong pool để dùng cho lần vẽ sau
+        pass
+
+    def close(self):
+        """Giải phóng toàn bộ template"""
+        self._templates.clear()
+
+    @property
+    def template_count(self):
+        return len(self._templates)
+
+    @staticmethod
+    def _subplotpars(fig):
+        pars = fig.subplotpars
+        return {
+            'left': pars.left, 'right': pars.right,
+            'bottom': pars.bottom, 'top': pars.top,
+            'wspace': pars.wspace, 'hspace': pars.hspace,
+        }
+
+    def _reset_template(self, template):
+        fig = template['fig']
+        base_axes = template['base_axes']
+
+        # 1. Bỏ các axes phát sinh khi vẽ (twinx, colorbar)
+        for ax in list(fig.axes):
+            if ax not in base_axes:
+                ax.remove()
+
+        # 2. Khôi phục bố cục ban đầu (colorbar và tight_layout đã thay đổi)
+        fig.subplots_adjust(**template['subplotpars'])
+        for ax, spec in zip(base_axes, template['specs']):
+            ax.set_subplotspec(spec)
+
+        # 3. Xóa nội dung và trạng thái trục, giữ nguyên đối tượng axes
+        for ax in base_axes:
+            self._clear_axes(ax)
+
+        for text in list(fig.texts):
+            text.remove()
+        for legend in list(fig.legends):
+            legend.remove()
+
+    @staticmethod
+    def _clear_axes(ax):
+        # cla() đặt lại artist, locator / formatter, đơn vị trục phân loại, chiều
+        # trục và vòng màu như một axes mới tạo, nhưng giữ tick params
+        # (labelrotation, labelsize...); reset=True xóa chúng trước, sau đó bật
+        # lại tick / nhãn theo rcParams giống lúc Axes khởi tạo
+        ax.tick_params(axis='both', which='both', reset=True)
+        ax.cla()
+
+        rc = matplotlib.rcParams
+        for which in ('major', 'minor'):
+            ax.tick_params(
+                which=which,
+                top=rc['xtick.top'] and rc[f'xtick.{which}.top'],
+                bottom=rc['xtick.bottom'] and rc[f'xtick.{which}.bottom'],
+                labeltop=rc['xtick.labeltop'] and rc[f'xtick.{which}.top'],
+                labelbottom=rc['xtick.labelbottom'] and rc[f'xtick.{which}.bottom'],
+                left=rc['ytick.left'] and rc[f'ytick.{which}.left'],
+                right=rc['ytick.right'] and rc[f'ytick.{which}.right'],
+                labelleft=rc['ytick.labelleft'] and rc[f'ytick.{which}.left'],
+                labelright=rc['ytick.labelright'] and rc[f'ytick.{which}.right'],
+            )
@@ -0,0 +1,316 @@
+"""cleaned_store.py - Dữ liệu đã làm sạch chia phân vùng kiểu Hive theo Year/Month
+
+Bên cạnh file cleaned_data.csv nguyên khối, dữ liệu được ghi thành các file
+parquet nhỏ, mỗi tháng một thư mục (thêm cấp Store_id nếu dữ liệu có cột này):
+
+    output/cleaned/Year=2023/Month=7/part-0.parquet
+    output/cleaned/_manifest.json      (danh sách phân vùng, số dòng, ngày nhỏ/lớn nhất)
+
+Khi đọc theo khoảng ngày, chỉ các phân vùng giao với khoảng đó được mở, nên
+"3 tháng gần nhất" chỉ đọc 3 file thay vì toàn bộ lịch sử. Cột phân vùng không
+lưu trong file mà được thêm lại khi đọc (giống Hive / Spark).
+
+Khi cần toàn bộ dữ liệu, bản Arrow IPC (Feather v2, không nén) cleaned_data.arrow
+được mở bằng memory map: cột số và cột ngày trỏ thẳng vào trang file trong page
+cache của hệ điều hành, nên các worker vẽ biểu đồ và các tiến trình Streamlit
+dùng chung một bản trên RAM thay vì mỗi tiến trình tự parse CSV.
+
+Chạy: python cleaned_store.py                 (chia phân vùng từ cleaned_data.csv)
+      python cleaned_store.py --last-months 3
+      python cleaned_store.py --from 2023-01-01 --to 2023-03-31
+"""
+import pandas as pd
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from run_config import RunConfig, resolve
+
+MANIFEST_NAME = '_manifest.json'
+PARTITION_COLUMNS = ['Year', 'Month']
+OPTIONAL_PARTITION_COLUMNS = ['Store_id']
+# Giá trị phân vùng cho các dòng không có ngày (quy ước của Hive)
+DEFAULT_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+
+def partition_columns(df):
+    """Year, Month và Store_id (nếu dữ liệu có cột cửa hàng)"""
+    return PARTITION_COLUMNS + [col for col in OPTIONAL_PARTITION_COLUMNS if col in df.columns]
+
+
+def _partition_value(value):
+    if pd.isna(value):
+        return DEFAULT_PARTITION
+    return str(int(value)) if isinstance(value, float) and value.is_integer() else str(value)
+
+
+def write_partitions(df, output_dir):
+    """Ghi DataFrame thành các phân vùng Year=/Month=[/Store_id=]; trả về manifest
+
+    Toàn bộ thư mục được ghi vào thư mục tạm rồi mới đổi tên, nên người đọc
+    không bao giờ thấy bộ phân vùng ghi dở.
+    """
+    df = df.copy()
+    df['Date'] = pd.to_datetime(df['Date'])
+    if 'Year' not in df.columns or 'Month' not in df.columns:
+        df['Year'] = df['Date'].dt.year
+        df['Month'] = df['Date'].dt.month
+
+    keys = partition_columns(df)
+    staging = f'{output_dir.rstrip(os.sep)}.tmp{os.getpid()}'
+    shutil.rmtree(staging, ignore_errors=True)
+
+    partitions = []
+    for values, part in df.groupby(keys, dropna=False, sort=True):
+        values = dict(zip(keys, map(_partition_value, values)))
+        relative = os.path.join(*[f'{key}={value}' for key, value in values.items()], 'part-0.parquet')
+        path = os.path.join(staging, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        part.drop(columns=keys).to_parquet(path, index=False)
+        dates = part['Date'].dropna()
+        partitions.append({
+            'path': relative,
+            'values': values,
+            'rows': len(part),
+            'date_min': dates.min().strftime('%Y-%m-%d') if len(dates) else None,
+            'date_max': dates.max().strftime('%Y-%m-%d') if len(dates) else None,
+        })
+
+    manifest = {
+        'columns': list(df.columns),
+        'partition_by': keys,
+        'rows': len(df),
+        'partitions': partitions,
+    }
+    with open(os.path.join(staging, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+    # Thay thư mục cũ bằng thư mục mới
+    retired = f'{output_dir.rstrip(os.sep)}.old{os.getpid()}'
+    if os.path.exists(output_dir):
+        os.replace(output_dir, retired)
+    os.makedirs(os.path.dirname(output_dir.rstrip(os.sep)) or '.', exist_ok=True)
+    os.replace(staging, output_dir)
+    shutil.rmtree(retired, ignore_errors=True)
+    return manifest
+
+
+def write_arrow(df, output_path):
+    """Ghi bản Arrow IPC không nén (đã sắp theo ngày) để mở bằng memory map
+
+    File được ghi ra file tạm rồi đổi tên: tiến trình đang map bản cũ vẫn đọc
+    được bản cũ cho tới khi mở lại.
+    """
+    df = df.assign(Date=pd.to_datetime(df['Date'])).sort_values('Date', kind='stable')
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    staged = f'{output_path}.tmp{os.getpid()}'
+    feather.write_feather(table, staged, compression='uncompressed')
+    os.replace(staged, output_path)
+    return output_path
+
+
+def read_arrow(path, columns=None):
+    """Mở file Arrow bằng memory map; cột số / ngày không bị sao chép khi sang pandas"""
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    # split_blocks: mỗi cột một block, giữ nguyên buffer của Arrow thay vì gộp (sao chép)
+    return table.to_pandas(split_blocks=True)
+
+
+def arrow_path(csv_path):
+    return os.path.splitext(csv_path)[0] + '.arrow'
+
+
+def preferred_path(csv_path):
+    """Bản Arrow cạnh file CSV nếu có và không cũ hơn CSV, ngược lại là chính file CSV"""
+    path = arrow_path(csv_path)
+    if os.path.exists(path) and (not os.path.exists(csv_path)
+                                 or os.path.getmtime(path) >= os.path.getmtime(csv_path)):
+        return path
+    return csv_path
+
+
+def read_table(path, **csv_options):
+    """Đọc dữ liệu đã làm sạch từ file .arrow (memory map) hoặc CSV"""
+    if path.endswith('.arrow'):
+        return read_arrow(path)
+    return pd.read_csv(path, **csv_options)
+
+
+def load_manifest(output_dir):
+    """Manifest của bộ phân vùng (None nếu chưa chia phân vùng)"""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def prune(manifest, date_from=None, date_to=None, stores=None):
+    """Các phân vùng giao với khoảng ngày (và thuộc các cửa hàng được chọn)"""
+    date_from = None if date_from is None else pd.Timestamp(date_from).strftime('%Y-%m-%d')
+    date_to = None if date_to is None else pd.Timestamp(date_to).strftime('%Y-%m-%d')
+    stores = None if stores is None else {str(store) for store in stores}
+
+    selected = []
+    for partition in manifest['partitions']:
+        if date_from is not None or date_to is not None:
+            if partition['date_min'] is None:
+                continue
+            if date_from is not None and partition['date_max'] < date_from:
+                continue
+            if date_to is not None and partition['date_min'] > date_to:
+                continue
+        if stores is not None and partition['values'].get('Store_id') not in stores:
+            continue
+        selected.append(partition)
+    return selected
+
+
+def _read_partition(output_dir, partition, columns):
+    part = pd.read_parquet(os.path.join(output_dir, partition['path']), columns=columns)
+    for key, value in partition['values'].items():
+        if columns is not None and key not in columns:
+            continue
+        part[key] = None if value == DEFAULT_PARTITION else value
+    return part
+
+
+def read_cleaned(output_dir=None, date_from=None, date_to=None, stores=None, columns=None, config=None):
+    """Đọc dữ liệu đã làm sạch, chỉ mở các phân vùng khớp điều kiện
+
+    Trả về DataFrame (Date đã là datetime) với thứ tự cột như cleaned_data.csv;
+    danh sách file đã đọc nằm trong `df.attrs['partitions']`. None nếu chưa có
+    bộ phân vùng.
+    """
+    output_dir = output_dir or resolve(config).cleaned_dir
+    manifest = load_manifest(output_dir)
+    if manifest is None:
+        print(f"Chưa có dữ liệu phân vùng tại {output_dir}")
+        return None
+
+    selected = prune(manifest, date_from, date_to, stores)
+    file_columns = None
+    if columns is not None:
+        file_columns = [col for col in columns if col not in manifest['partition_by']]
+        if (date_from is not None or date_to is not None) and 'Date' not in file_columns:
+            file_columns.append('Date')
+    parts = [_read_partition(output_dir, partition, file_columns) for partition in selected]
+
+    order = [col for col in manifest['columns'] if columns is None or col in columns]
+    if not parts:
+        df = pd.DataFrame(columns=order)
+    else:
+        df = pd.concat(parts, ignore_index=True)
+        # Giá trị phân vùng được lưu dạng chuỗi trong tên thư mục
+        for key in ('Year', 'Month'):
+            if key in df.columns:
+                df[key] = pd.to_numeric(df[key]).astype('Int64' if df[key].isna().any() else 'int64')
+
+        # Phân vùng ở hai đầu khoảng ngày có thể chứa dòng nằm ngoài khoảng
+        if date_from is not None:
+            df = df[df['Date'] >= pd.Timestamp(date_from).normalize()]
+        if date_to is not None:
+            df = df[df['Date'] < pd.Timestamp(date_to).normalize() + pd.Timedelta(days=1)]
+        df = df[order].reset_index(drop=True)
+
+    df.attrs['partitions'] = [partition['path'] for partition in selected]
+    return df
+
+
+def load_for_run(config=None, df_path=None, date_from=None, date_to=None, **csv_options):
+    """Dữ liệu đã làm sạch cho các hàm main_* (pivot, visualizer)
+
+    Có khoảng ngày: chỉ đọc các phân vùng Year/Month giao với khoảng đó. Không
+    có: đọc `df_path`, mặc định là bản Arrow (memory map) nếu có, không thì CSV.
+    Nguồn đã đọc nằm trong `df.attrs['source']`; None (đã in lỗi) nếu thiếu dữ liệu.
+    """
+    config = resolve(config)
+    if date_from is not None or date_to is not None:
+        df = read_cleaned(config.cleaned_dir, date_from, date_to)
+        source = config.cleaned_dir
+    else:
+        source = df_path or preferred_path(config.cleaned_path)
+        if not os.path.exists(source):
+            print(f"File {source} không tồn tại!")
+            return None
+        df = read_table(source, **csv_options)
+    if df is not None:
+        df.attrs['source'] = source
+    return df
+
+
+def last_months(output_dir=None, months=3, config=None):
+    """Khoảng ngày (từ, đến) phủ `months` tháng gần nhất có dữ liệu"""
+    manifest = load_manifest(output_dir or resolve(config).cleaned_dir)
+    if manifest is None:
+        return None, None
+    dated = [p for p in manifest['partitions'] if p['date_min'] is not None]
+    if not dated:
+        return None, None
+    periods = sorted({(int(p['values']['Year']), int(p['values']['Month'])) for p in dated})
+    year, month = periods[-months:][0]
+    return pd.Timestamp(year=year, month=month, day=1), pd.Timestamp(max(p['date_max'] for p in dated))
+
+
+def date_args(argv=None, config=None):
+    """Đọc --from, --to hoặc --last-months từ dòng lệnh; trả về (date_from, date_to)"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--from', dest='date_from')
+    parser.add_argument('--to', dest='date_to')
+    parser.add_argument('--last-months', type=int)
+    args, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    if args.last_months:
+        return last_months(months=args.last_months, config=config)
+    return args.date_from, args.date_to
+
+
+# Hàm chính cho module này
+def main_cleaned_store(df_path=None, config=None, date_from=None, date_to=None):
+    """Chia phân vùng dữ liệu đã làm sạch và so sánh đọc theo khoảng ngày với đọc toàn bộ"""
+    print("=" * 60)
+    print("DỮ LIỆU ĐÃ LÀM SẠCH THEO PHÂN VÙNG YEAR / MONTH")
+    print("=" * 60)
+
+    config = resolve(config)
+    df_path = df_path or config.cleaned_path
+
+    if not os.path.exists(df_path):
+        print(f"File {df_path} không tồn tại!")
+        return None
+
+    manifest = write_partitions(pd.read_csv(df_path, parse_dates=['Date']), config.cleaned_dir)
+    print(f"Đã ghi {manifest['rows']} bản ghi vào {len(manifest['partitions'])} phân vùng "
+          f"tại {config.cleaned_dir} (theo {', '.join(manifest['partition_by'])})")
+
+    if date_from is None and date_to is None:
+        date_from, date_to = last_months(config.cleaned_dir, 3)
+
+    started = time.perf_counter()
+    full = pd.read_csv(df_path, parse_dates=['Date'])
+    full = full[(full['Date'] >= pd.Timestamp(date_from)) & (full['Date'] <= pd.Timestamp(date_to))]
+    csv_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    df = read_cleaned(config.cleaned_dir, date_from, date_to)
+    partition_seconds = time.perf_counter() - started
+
+    print(f"Khoảng ngày: {pd.Timestamp(date_from):%d/%m/%Y} - {pd.Timestamp(date_to):%d/%m/%Y}")
+    print(f"  Đọc toàn bộ CSV rồi lọc: {len(full):>6} dòng, {csv_seconds * 1000:8.1f} ms")
+    print(f"  Đọc theo phân vùng:      {len(df):>6} dòng, {partition_seconds * 1000:8.1f} ms, "
+          f"{len(df.attrs['partitions'])}/{len(manifest['partitions'])} file")
+    for path in df.attrs['partitions']:
+        print(f"    {path}")
+    return df
+
+
+if __name__ == "__main__":
+    config = RunConfig.from_args()
+    main_cleaned_store(None, config, *date_args(config=config))
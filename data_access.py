@@ -0,0 +1,227 @@
+"""data_access.py - Tải dữ liệu cho dashboard Streamlit có cache
+
+Mỗi hàm tải được cache trong bộ nhớ theo chữ ký file nguồn (mtime + kích thước),
+nên các lần rerun không đọc lại CSV/Excel; khi file thay đổi chữ ký đổi theo
+và cache tự làm mới. Số lần hit/miss được đếm để hiển thị ở panel debug.
+Dữ liệu đã làm sạch là một đối tượng dùng chung (SharedDataset) cho mọi phiên,
+không sao chép theo từng phiên như st.cache_data. Khi chỉ cần vài tháng gần
+nhất, load_cleaned_range() đọc các phân vùng Year/Month (cleaned_store.py).
+Nếu có cleaned_data.arrow, bộ dữ liệu dùng chung được mở bằng memory map.
+"""
+import os
+import pandas as pd
+import streamlit as st
+
+import hierarchical_forecast
+from raw_index import RawDataIndex
+from query_engine import QueryEngine
+from bitmap_index import BitmapIndex
+from shared_dataset import SharedDataset
+from sales_store import SalesStore
+from run_config import RunConfig
+import cleaned_store
+
+# Dashboard đọc kết quả của lần chạy cấu hình qua biến môi trường (HLC_OUTPUT_ROOT...)
+CONFIG = RunConfig.from_env()
+RAW_DATA_PATH = CONFIG.input_path
+CLEANED_DATA_PATH = CONFIG.cleaned_path
+CLEANED_DIR = CONFIG.cleaned_dir
+PIVOT_PATH = CONFIG.pivot_path
+SALES_DB_PATH = CONFIG.sales_db_path
+FORECAST_PATH = CONFIG.forecast_path
+
+# Bộ đếm theo tiến trình: số lần gọi và số lần phải đọc lại từ đĩa
+_cache_stats = {}
+
+
+def file_signature(path):
+    """Chữ ký file dùng làm khóa cache (FileNotFoundError nếu không tồn tại)"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _record_call(name):
+    _cache_stats.setdefault(name, {'calls': 0, 'misses': 0})['calls'] += 1
+
+
+def _record_miss(name):
+    _cache_stats.setdefault(name, {'calls': 0, 'misses': 0})['misses'] += 1
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _read_raw(path, signature):
+    _record_miss('raw_data')
+    return pd.read_csv(path, sep=';', encoding='utf-8-sig')
+
+
+@st.cache_resource(show_spinner="Đang tải dữ liệu đã làm sạch...", max_entries=2)
+def _open_shared_dataset(path, signature):
+    _record_miss('cleaned_data')
+    return SharedDataset(path)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _read_cleaned_range(output_dir, signature, date_from, date_to):
+    _record_miss('cleaned_partitions')
+    return cleaned_store.read_cleaned(output_dir, date_from, date_to)
+
+
+@st.cache_data(show_spinner="Đang đọc pivot tables...", max_entries=4)
+def _read_pivots(path, signature):
+    _record_miss('pivot_tables')
+    # Đọc tất cả sheet trong một lần mở file
+    return pd.read_excel(path, sheet_name=None)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _build_chart_aggregates(path, signature):
+    _record_miss('chart_aggregates')
+    # altair chỉ cần cho trang biểu đồ tương tác, không tải sẵn cho các trang khác
+    import interactive_charts
+    return interactive_charts.build_aggregates(_open_shared_dataset(path, signature).df)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _read_forecasts(path, signature):
+    _record_miss('hierarchical_forecast')
+    return hierarchical_forecast.load_forecasts(path)
+
+
+@st.cache_resource(show_spinner="Đang lập chỉ mục dữ liệu gốc...", max_entries=4)
+def _open_raw_index(path, signature):
+    _record_miss('raw_index')
+    return RawDataIndex(path).open()
+
+
+@st.cache_resource(show_spinner="Đang dựng bộ truy vấn...", max_entries=2)
+def _build_query_engine(path, signature):
+    _record_miss('query_engine')
+    return QueryEngine(_open_shared_dataset(path, signature).df)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _build_bitmap_index(path, signature):
+    _record_miss('bitmap_index')
+    # Cùng thứ tự dòng với query engine (đã sắp theo ngày) để ghép được khoảng ngày
+    return BitmapIndex(_build_query_engine(path, signature).df)
+
+
+def get_bitmap_index(path=CLEANED_DATA_PATH):
+    """Bitmap index trên các cột phân loại của dữ liệu đã làm sạch"""
+    _record_call('bitmap_index')
+    path = cleaned_store.preferred_path(path)
+    return _build_bitmap_index(path, file_signature(path))
+
+
+def get_query_engine(path=CLEANED_DATA_PATH):
+    """Bộ truy vấn theo khoảng ngày / kênh / sản phẩm (dùng chung cho mọi phiên)"""
+    _record_call('query_engine')
+    path = cleaned_store.preferred_path(path)
+    return _build_query_engine(path, file_signature(path))
+
+
+def get_raw_index(path=RAW_DATA_PATH):
+    """Chỉ mục offset dòng của file gốc (dùng chung cho mọi phiên)"""
+    _record_call('raw_index')
+    return _open_raw_index(path, file_signature(path))
+
+
+@st.cache_resource(show_spinner="Đang tạo kho dữ liệu SQLite...", max_entries=2)
+def _open_sales_store(db_path, cleaned_path, signature):
+    _record_miss('sales_store')
+    return SalesStore(db_path, CONFIG).ensure(cleaned_path)
+
+
+def get_sales_store(db_path=SALES_DB_PATH, cleaned_path=CLEANED_DATA_PATH):
+    """Kho giao dịch SQLite (tạo lại khi dữ liệu đã làm sạch thay đổi)"""
+    _record_call('sales_store')
+    return _open_sales_store(db_path, cleaned_path, file_signature(cleaned_path))
+
+
+def load_raw_data(path=RAW_DATA_PATH):
+    """Dữ liệu gốc (chưa xử lý)"""
+    _record_call('raw_data')
+    return _read_raw(path, file_signature(path))
+
+
+def get_shared_dataset(path=CLEANED_DATA_PATH):
+    """Bộ dữ liệu đã làm sạch dùng chung (đã sắp theo ngày, có view theo khoảng ngày)"""
+    _record_call('cleaned_data')
+    # Bản Arrow (memory map, dùng chung page cache giữa các tiến trình) nếu có
+    path = cleaned_store.preferred_path(path)
+    return _open_shared_dataset(path, file_signature(path))
+
+
+def load_cleaned_data(path=CLEANED_DATA_PATH):
+    """Dữ liệu đã làm sạch (DataFrame dùng chung, không sửa trực tiếp)"""
+    return get_shared_dataset(path).df
+
+
+def has_partitions(output_dir=CLEANED_DIR):
+    return os.path.exists(os.path.join(output_dir, cleaned_store.MANIFEST_NAME))
+
+
+def load_cleaned_range(date_from=None, date_to=None, output_dir=CLEANED_DIR):
+    """Dữ liệu đã làm sạch trong khoảng ngày, chỉ đọc các phân vùng tháng liên quan"""
+    _record_call('cleaned_partitions')
+    signature = file_signature(os.path.join(output_dir, cleaned_store.MANIFEST_NAME))
+    return _read_cleaned_range(output_dir, signature, date_from, date_to)
+
+
+def load_last_months(months, output_dir=CLEANED_DIR):
+    """Dữ liệu đã làm sạch của `months` tháng gần nhất"""
+    return load_cleaned_range(*cleaned_store.last_months(output_dir, months), output_dir=output_dir)
+
+
+def load_pivot_tables(path=PIVOT_PATH):
+    """Tất cả pivot table (dict tên sheet -> DataFrame)"""
+    _record_call('pivot_tables')
+    return _read_pivots(path, file_signature(path))
+
+
+def load_pivot_sheet(sheet_name, path=PIVOT_PATH):
+    """Một sheet trong file pivot, theo tên hoặc theo thứ tự (0 là sheet đầu)"""
+    tables = load_pivot_tables(path)
+    if isinstance(sheet_name, int):
+        return list(tables.values())[sheet_name]
+    return tables[sheet_name]
+
+
+def load_chart_aggregates(path=CLEANED_DATA_PATH):
+    """Bảng tổng hợp cho biểu đồ tương tác"""
+    _record_call('chart_aggregates')
+    path = cleaned_store.preferred_path(path)
+    return _build_chart_aggregates(path, file_signature(path))
+
+
+def load_hierarchical_forecast(path=FORECAST_PATH):
+    """Dự báo theo sản phẩm / kênh / nhân viên đã tính sẵn (None nếu chưa chạy)"""
+    _record_call('hierarchical_forecast')
+    if not os.path.exists(path):
+        return None
+    return _read_forecasts(path, file_signature(path))
+
+
+def cache_stats():
+    """Thống kê cache: số lần gọi, hit, miss cho từng nguồn dữ liệu"""
+    rows = []
+    for name, stats in _cache_stats.items():
+        hits = stats['calls'] - stats['misses']
+        rows.append({
+            'Nguồn': name,
+            'Lượt gọi': stats['calls'],
+            'Hit': hits,
+            'Miss': stats['misses'],
+            'Tỷ lệ hit': f"{hits / stats['calls']:.0%}" if stats['calls'] else '-',
+        })
+    return pd.DataFrame(rows, columns=['Nguồn', 'Lượt gọi', 'Hit', 'Miss', 'Tỷ lệ hit'])
+
+
+def clear_cache():
+    """Xóa toàn bộ cache dữ liệu và bộ đếm"""
+    for loader in (_read_raw, _open_shared_dataset, _read_cleaned_range, _read_pivots,
+                   _build_chart_aggregates,
+                   _read_forecasts, _open_raw_index, _build_query_engine,
+                   _build_bitmap_index, _open_sales_store):
+        loader.clear()
+    _cache_stats.clear()
@@ -3,11 +3,17 @@ import pandas as pd
 import numpy as np
 import os
 from datetime import datetime
+from telemetry import timed
+from run_config import RunConfig, resolve
+import cleaned_store
+import sales_store
 class DataPreprocessor:
-    def __init__(self, data_path):
-        self.data_path = data_path
+    def __init__(self, data_path=None, config=None):
+        self.config = resolve(config)
+        self.data_path = data_path or self.config.input_path
         self.df = None
 
+    @timed
     def load_data(self):
         """Tải dữ liệu từ file CSV"""
         try:
@@ -19,6 +25,7 @@ class DataPreprocessor:
             print(f" Lỗi khi tải dữ liệu: {e}")
             return False
 
+    @timed
     def clean_data(self):
         """Làm sạch và chuẩn hóa dữ liệu"""
         if self.df is None:
@@ -100,6 +107,9 @@ class DataPreprocessor:
         if important_cols:
             self.df = self.df.dropna(subset=important_cols)
 
+        # 7. Áp dụng các giao dịch thêm/sửa/xóa trên trang quản lý giao dịch
+        self.df = sales_store.apply_edits(self.df, self.config.sales_edits_path)
+
         print(f" Đã làm sạch dữ liệu. Còn {len(self.df)} bản ghi hợp lệ.")
         return True
 
@@ -121,8 +131,10 @@ class DataPreprocessor:
 
         return summary
 
-    def save_cleaned_data(self, output_path='output/cleaned_data.csv'):
+    @timed
+    def save_cleaned_data(self, output_path=None):
         """Lưu dữ liệu đã làm sạch"""
+        output_path = output_path or self.config.cleaned_path
         if self.df is not None:
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             self.df.to_csv(output_path, index=False, encoding='utf-8-sig')
@@ -130,8 +142,29 @@ class DataPreprocessor:
             return True
         return False
 
-    def generate_test_data(self, num_records=1000, output_path='data/highlands_test.csv'):
+    @timed
+    def save_arrow(self, output_path=None):
+        """Lưu bản Arrow IPC không nén để các bước sau mở bằng memory map"""
+        output_path = output_path or self.config.cleaned_arrow_path
+        if self.df is None:
+            return False
+        cleaned_store.write_arrow(self.df, output_path)
+        print(f"Đã lưu bản Arrow tại: {output_path}")
+        return True
+
+    @timed
+    def save_partitioned(self, output_dir=None):
+        """Lưu dữ liệu đã làm sạch theo phân vùng Year/Month (xem cleaned_store.py)"""
+        output_dir = output_dir or self.config.cleaned_dir
+        if self.df is None:
+            return False
+        manifest = cleaned_store.write_partitions(self.df, output_dir)
+        print(f"Đã lưu {len(manifest['partitions'])} phân vùng tại: {output_dir}")
+        return True
+
+    def generate_test_data(self, num_records=1000, output_path=None):
         """Tạo dữ liệu test mở rộng"""
+        output_path = output_path or self.config.test_data_path
         if self.df is None:
             print(" Không có dữ liệu mẫu để tạo test data!")
             return False
@@ -176,21 +209,22 @@ class DataPreprocessor:
 
 data_path = 'data_1.csv'
 # Hàm chính cho module này
-def main_preprocess():
+def main_preprocess(config=None):
     """Hàm chính cho tiền xử lý dữ liệu"""
     print("=" * 60)
     print("TIỀN XỬ LÝ DỮ LIỆU HIGHLANDS")
     print("=" * 60)
 
     # Đường dẫn dữ liệu
-    data_path = 'data_1.csv'
+    config = resolve(config)
+    data_path = config.input_path
 
     if not os.path.exists(data_path):
         print(f" File {data_path} không tồn tại!")
         return None
 
     # Khởi tạo preprocessor
-    preprocessor = DataPreprocessor(data_path)
+    preprocessor = DataPreprocessor(data_path, config=config)
 
     # 1. Tải dữ liệu
     if not preprocessor.load_data():
@@ -214,6 +248,8 @@ def main_preprocess():
 
     # 4. Lưu dữ liệu đã làm sạch
     preprocessor.save_cleaned_data()
+    preprocessor.save_arrow()
+    preprocessor.save_partitioned()
 
     # 5. Tạo dữ liệu test (tùy chọn)
     create_test = input(" Bạn có muốn tạo dữ liệu test mở rộng? (y/n): ")
@@ -225,4 +261,4 @@ def main_preprocess():
 
 
 if __name__ == "__main__":
-    df = main_preprocess()
+    df = main_preprocess(RunConfig.from_args())
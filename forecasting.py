@@ -0,0 +1,238 @@
+"""forecasting.py - Các mô hình dự báo doanh thu có khoảng dự báo
+
+Gồm Holt-Winters (ETS), SARIMA, seasonal-naive và hồi quy tuyến tính (mô hình
+cũ của tab dự báo). Mô hình đã fit được cache trong bộ nhớ tiến trình theo hash
+của chuỗi huấn luyện, nên đổi số kỳ dự báo chỉ gọi lại `forecast(h)` mà không
+fit lại.
+"""
+import hashlib
+import threading
+import warnings
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+from run_config import resolve
+
+SEASONAL_PERIODS = 12
+
+MODEL_LABELS = {
+    'holt_winters': 'Holt-Winters (ETS)',
+    'sarima': 'SARIMA',
+    'seasonal_naive': 'Seasonal naive',
+    'linear': 'Hồi quy tuyến tính',
+}
+
+_fitted = LRUCache(maxsize=256)
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def _interval_frame(mean, std, alpha):
+    """Bảng dự báo chuẩn: Forecast, Lower, Upper (doanh thu không âm)"""
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+    mean = np.asarray(mean, dtype=float)
+    std = np.asarray(std, dtype=float)
+    return pd.DataFrame({
+        'Forecast': np.clip(mean, 0, None),
+        'Lower': np.clip(mean - z * std, 0, None),
+        'Upper': np.clip(mean + z * std, 0, None),
+    })
+
+
+class LinearTrendModel:
+    """Đường xu hướng bậc nhất (như np.polyfit cũ) với khoảng dự báo OLS"""
+    name = 'linear'
+
+    def fit(self, y):
+        y = np.asarray(y, dtype=float)
+        self.n = len(y)
+        if self.n < 3:
+            raise ValueError("Cần ít nhất 3 điểm dữ liệu cho hồi quy tuyến tính")
+        X = np.arange(self.n)
+        self.slope, self.intercept = np.polyfit(X, y, 1)
+        residuals = y - (self.slope * X + self.intercept)
+        self.sigma = np.sqrt(np.sum(residuals ** 2) / (self.n - 2))
+        self.x_mean = X.mean()
+        self.sxx = np.sum((X - self.x_mean) ** 2)
+        return self
+
+    def forecast(self, h, alpha=0.05):
+        future_X = np.arange(self.n, self.n + h)
+        mean = self.slope * future_X + self.intercept
+        std = self.sigma * np.sqrt(1 + 1 / self.n + (future_X - self.x_mean) ** 2 / self.sxx)
+        return _interval_frame(mean, std, alpha)
+
+
+class SeasonalNaiveModel:
+    """Lặp lại giá trị cùng kỳ mùa trước"""
+    name = 'seasonal_naive'
+
+    def __init__(self, seasonal_periods=SEASONAL_PERIODS):
+        self.m = seasonal_periods
+
+    def fit(self, y):
+        y = np.asarray(y, dtype=float)
+        if len(y) <= self.m:
+            raise ValueError(f"Cần hơn {self.m} điểm dữ liệu cho seasonal naive")
+        self.last_season = y[-self.m:]
+        residuals = y[self.m:] - y[:-self.m]
+        self.sigma = np.sqrt(np.mean(residuals ** 2))
+        return self
+
+    def forecast(self, h, alpha=0.05):
+        steps = np.arange(h)
+        mean = self.last_season[steps % self.m]
+        # Sai số tăng theo số mùa phải ngoại suy
+        std = self.sigma * np.sqrt(steps // self.m + 1)
+        return _interval_frame(mean, std, alpha)
+
+
+class HoltWintersModel:
+    """ETS cộng tính: xu hướng giảm chấn + mùa vụ (bỏ mùa vụ nếu chưa đủ 2 mùa)"""
+    name = 'holt_winters'
+
+    def __init__(self, seasonal_periods=SEASONAL_PERIODS):
+        self.m = seasonal_periods
+
+    def fit(self, y):
+        from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+
+        y = pd.Series(np.asarray(y, dtype=float))
+        if len(y) < 4:
+            raise ValueError("Cần ít nhất 4 điểm dữ liệu cho Holt-Winters")
+        seasonal = 'add' if len(y) >= 2 * self.m else None
+        model = ETSModel(y, error='add', trend='add', damped_trend=True,
+                         seasonal=seasonal, seasonal_periods=self.m if seasonal else None)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            self.result = model.fit(disp=False)
+        self.n = len(y)
+        return self
+
+    def forecast(self, h, alpha=0.05):
+        frame = self.result.get_prediction(start=self.n, end=self.n + h - 1).summary_frame(alpha=alpha)
+        z = NormalDist().inv_cdf(1 - alpha / 2)
+        std = (frame['pi_upper'] - frame['pi_lower']) / (2 * z)
+        return _interval_frame(frame['mean'], std, alpha)
+
+
+class SarimaModel:
+    """SARIMA(1,1,1)(0,1,1,m); bỏ thành phần mùa vụ nếu chưa đủ 2 mùa"""
+    name = 'sarima'
+
+    def __init__(self, seasonal_periods=SEASONAL_PERIODS, order=(1, 1, 1), seasonal_order=(0, 1, 1)):
+        self.m = seasonal_periods
+        self.order = order
+        self.seasonal_order = seasonal_order
+
+    def fit(self, y):
+        from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+        y = pd.Series(np.asarray(y, dtype=float))
+        if len(y) < 6:
+            raise ValueError("Cần ít nhất 6 điểm dữ liệu cho SARIMA")
+        seasonal_order = (*self.seasonal_order, self.m) if len(y) >= 2 * self.m else (0, 0, 0, 0)
+        model = SARIMAX(y, order=self.order, seasonal_order=seasonal_order)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            self.result = model.fit(disp=False)
+        return self
+
+    def forecast(self, h, alpha=0.05):
+        frame = self.result.get_forecast(h).summary_frame(alpha=alpha)
+        return _interval_frame(frame['mean'], frame['mean_se'], alpha)
+
+
+MODELS = {
+    'holt_winters': HoltWintersModel,
+    'sarima': SarimaModel,
+    'seasonal_naive': SeasonalNaiveModel,
+    'linear': LinearTrendModel,
+}
+
+
+def make_model(name, seasonal_periods=SEASONAL_PERIODS):
+    if name not in MODELS:
+        raise ValueError(f"Không có mô hình {name}")
+    if name == 'linear':
+        return LinearTrendModel()
+    return MODELS[name](seasonal_periods)
+
+
+def series_hash(y):
+    """Hash nội dung chuỗi huấn luyện (dùng làm khóa cache mô hình)"""
+    values = np.ascontiguousarray(np.asarray(y, dtype=np.float64))
+    return hashlib.sha256(values.tobytes()).hexdigest()[:16]
+
+
+def fit_model(name, y, seasonal_periods=SEASONAL_PERIODS):
+    """Mô hình đã fit cho chuỗi `y` (lấy từ cache nếu chuỗi không đổi)"""
+    key = (name, seasonal_periods, series_hash(y))
+    with _lock:
+        model = _fitted.get(key)
+        if model is not None:
+            _stats['hits'] += 1
+            return model
+        _stats['misses'] += 1
+
+    model = make_model(name, seasonal_periods).fit(y)
+    with _lock:
+        _fitted[key] = model
+    return model
+
+
+def forecast_series(name, y, h, alpha=0.05, seasonal_periods=SEASONAL_PERIODS):
+    """Dự báo h kỳ tiếp theo của chuỗi `y` bằng mô hình `name`"""
+    return fit_model(name, y, seasonal_periods).forecast(h, alpha)
+
+
+def future_periods(last_period, h, freq='M'):
+    """Nhãn các kỳ tương lai sau `last_period` (vd '2024-01' -> '2024-02', ...)"""
+    start = pd.Period(last_period, freq=freq)
+    return [str(start + i) for i in range(1, h + 1)]
+
+
+def cache_stats():
+    with _lock:
+        return {'models': len(_fitted), 'hits': _stats['hits'], 'misses': _stats['misses']}
+
+
+def clear_cache():
+    with _lock:
+        _fitted.clear()
+        _stats['hits'] = _stats['misses'] = 0
+
+
+def main_forecasting(pivot_path=None, horizon=6, config=None):
+    """Hàm chính: so sánh dự báo doanh thu tháng của các mô hình"""
+    print("=" * 60)
+    print("DỰ BÁO DOANH THU THEO THÁNG")
+    print("=" * 60)
+
+    pivot_path = pivot_path or resolve(config).pivot_path
+    try:
+        df_monthly = pd.read_excel(pivot_path, sheet_name='monthly_trend')
+    except FileNotFoundError:
+        print(f"File {pivot_path} không tồn tại!")
+        return None
+
+    y = df_monthly['Revenue'].values
+    labels = future_periods(df_monthly['Year_Month'].iloc[-1], horizon)
+    results = {}
+    for name, label in MODEL_LABELS.items():
+        try:
+            frame = forecast_series(name, y, horizon)
+        except ValueError as e:
+            print(f"{label}: {e}")
+            continue
+        frame.index = labels
+        results[name] = frame
+        print(f"\n{label}:")
+        print(frame.round(0).to_string())
+
+    return results
+
+
+if __name__ == "__main__":
+    main_forecasting()
@@ -0,0 +1,207 @@
+"""hierarchical_forecast.py - Dự báo doanh thu theo sản phẩm, kênh và nhân viên
+
+Tất cả chuỗi tháng (tổng, từng sản phẩm, từng kênh, từng nhân viên) được dựng
+từ một bảng tổng hợp duy nhất, rồi fit song song trên nhiều tiến trình. Dự báo
+của từng nhóm được điều chỉnh tỷ lệ (reconcile) để cộng lại đúng bằng dự báo
+tổng, sau đó lưu ra output/forecasts để dashboard đọc ngay không phải fit lại.
+"""
+import pandas as pd
+import numpy as np
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import forecasting
+from run_config import RunConfig, resolve
+
+# Các cấp dự báo: tên cấp -> cột trong dữ liệu đã làm sạch
+LEVELS = {
+    'Sản phẩm': 'Product_Name',
+    'Kênh': 'Order_Channel',
+    'Nhân viên': 'Staff_id',
+}
+TOTAL_LEVEL = 'Tổng'
+
+
+# Thứ tự mô hình dự phòng khi chuỗi quá ngắn hoặc fit lỗi
+FALLBACK_MODELS = ['seasonal_naive', 'linear']
+
+
+def build_series(df, levels=LEVELS):
+    """Dựng mọi chuỗi doanh thu theo tháng từ một lần groupby
+
+    Trả về (danh sách tháng, dict (cấp, thành viên) -> mảng doanh thu).
+    """
+    columns = list(levels.values())
+    # Bảng tổng hợp nhỏ nhất chứa đủ mọi chiều; các cấp khác cộng từ bảng này
+    facts = df.groupby(['Year_Month'] + columns, observed=True)['Revenue'].sum()
+    periods = pd.period_range(df['Year_Month'].min(), df['Year_Month'].max(), freq='M').astype(str)
+
+    series = {(TOTAL_LEVEL, TOTAL_LEVEL):
+              facts.groupby(level='Year_Month').sum().reindex(periods, fill_value=0).to_numpy(float)}
+    for level, col in levels.items():
+        wide = facts.groupby(level=['Year_Month', col]).sum().unstack(col, fill_value=0)
+        wide = wide.reindex(periods, fill_value=0)
+        for member in wide.columns:
+            series[(level, member)] = wide[member].to_numpy(float)
+
+    return list(periods), series
+
+
+def _fit_series(task):
+    """Fit một chuỗi (chạy trong worker), thử mô hình dự phòng nếu lỗi"""
+    key, y, model_name, horizon, alpha = task
+    started = time.perf_counter()
+
+    for name in [model_name] + [m for m in FALLBACK_MODELS if m != model_name]:
+        try:
+            frame = forecasting.make_model(name).fit(y).forecast(horizon, alpha)
+            if np.isfinite(frame.to_numpy()).all():
+                break
+        except Exception:
+            continue
+    else:
+        # Không mô hình nào dùng được: giữ nguyên mức trung bình gần nhất
+        level = float(np.mean(y[-3:])) if len(y) else 0.0
+        name = 'mean'
+        frame = pd.DataFrame({'Forecast': [level] * horizon, 'Lower': [level] * horizon,
+                              'Upper': [level] * horizon})
+
+    return key, name, frame, time.perf_counter() - started
+
+
+def reconcile(forecasts, levels=LEVELS):
+    """Điều chỉnh dự báo từng cấp theo tỷ lệ để tổng bằng dự báo cấp Tổng
+
+    forecasts: dict (cấp, thành viên) -> DataFrame Forecast/Lower/Upper
+    """
+    total = forecasts[(TOTAL_LEVEL, TOTAL_LEVEL)]['Forecast'].to_numpy()
+    reconciled = dict(forecasts)
+
+    for level in levels:
+        keys = [key for key in forecasts if key[0] == level]
+        if not keys:
+            continue
+        members = np.vstack([forecasts[key]['Forecast'].to_numpy() for key in keys])
+        sums = members.sum(axis=0)
+        positive = sums > 0
+        scale = np.divide(total, sums, out=np.zeros_like(total), where=positive)
+
+        for key in keys:
+            values = forecasts[key][['Forecast', 'Lower', 'Upper']].to_numpy()
+            # Kỳ nào tổng các thành viên bằng 0 thì chia đều dự báo tổng
+            adjusted = np.where(positive[:, None], values * scale[:, None],
+                                (total / len(keys))[:, None])
+            reconciled[key] = pd.DataFrame(adjusted, columns=['Forecast', 'Lower', 'Upper'])
+
+    return reconciled
+
+
+class HierarchicalForecaster:
+    def __init__(self, df_path=None, output_path=None, model_name='holt_winters', horizon=12,
+                 alpha=0.05, workers=None, config=None):
+        config = resolve(config)
+        self.df_path = df_path or config.cleaned_path
+        self.output_path = output_path or config.forecast_path
+        self.model_name = model_name
+        self.horizon = horizon
+        self.alpha = alpha
+        self.workers = workers or config.forecast_workers
+
+    def fit_all(self, series):
+        """Fit mọi chuỗi, song song nếu có nhiều worker"""
+        tasks = [(key, y, self.model_name, self.horizon, self.alpha) for key, y in series.items()]
+        if self.workers <= 1:
+            return [_fit_series(task) for task in tasks]
+
+        # Mỗi chuỗi fit rất nhanh: gửi theo lô để giảm chi phí giao tiếp giữa tiến trình
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(_fit_series, tasks, chunksize=chunksize))
+
+    def run(self):
+        """Dựng chuỗi, fit, reconcile và lưu kết quả; trả về DataFrame dạng dài"""
+        started = time.perf_counter()
+        df = pd.read_csv(self.df_path)
+        periods, series = build_series(df)
+        del df
+        load_seconds = time.perf_counter() - started
+
+        # Chỉ đo thời gian fit, không gồm đọc CSV và dựng chuỗi
+        started = time.perf_counter()
+        results = self.fit_all(series)
+        fit_seconds = time.perf_counter() - started
+
+        models = {key: name for key, name, _, _ in results}
+        forecasts = reconcile({key: frame for key, _, frame, _ in results})
+        future = forecasting.future_periods(periods[-1], self.horizon)
+
+        frames = []
+        for (level, member), frame in forecasts.items():
+            frame = frame.copy()
+            frame.insert(0, 'Year_Month', future)
+            frame.insert(0, 'Member', member)
+            frame.insert(0, 'Level', level)
+            frame['Model'] = models[(level, member)]
+            frames.append(frame)
+        result = pd.concat(frames, ignore_index=True)
+
+        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+        result.to_csv(self.output_path, index=False, encoding='utf-8-sig')
+        meta = {
+            'source': self.df_path,
+            'model': self.model_name,
+            'horizon': self.horizon,
+            'alpha': self.alpha,
+            'series': len(series),
+            'last_period': periods[-1],
+            'load_seconds': round(load_seconds, 3),
+            'seconds': round(fit_seconds, 3),
+            'fit_seconds_total': round(sum(seconds for *_, seconds in results), 3),
+        }
+        with open(os.path.splitext(self.output_path)[0] + '.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+        print(f"Đã dự báo {len(series)} chuỗi ({self.horizon} tháng) trong {fit_seconds:.1f}s "
+              f"với {self.workers} worker: {self.output_path}")
+        return result
+
+
+def load_forecasts(path=None, config=None):
+    """Đọc kết quả dự báo đã lưu (None nếu chưa chạy)"""
+    path = path or resolve(config).forecast_path
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, dtype={'Year_Month': str})
+
+
+# Hàm chính cho module này
+def main_hierarchical_forecast(df_path=None, model_name='holt_winters', horizon=12,
+                               workers=None, config=None):
+    """Hàm chính cho dự báo theo cấp"""
+    print("=" * 60)
+    print("DỰ BÁO THEO SẢN PHẨM / KÊNH / NHÂN VIÊN")
+    print("=" * 60)
+
+    config = resolve(config)
+    df_path = df_path or config.cleaned_path
+
+    if not os.path.exists(df_path):
+        print(f"File {df_path} không tồn tại!")
+        return None
+
+    forecaster = HierarchicalForecaster(df_path, model_name=model_name, horizon=horizon,
+                                        workers=workers, config=config)
+    result = forecaster.run()
+
+    # Kiểm tra: tổng từng cấp phải khớp dự báo tổng
+    totals = result.groupby(['Level', 'Year_Month'])['Forecast'].sum().unstack('Level')
+    gap = totals.drop(columns=TOTAL_LEVEL).sub(totals[TOTAL_LEVEL], axis=0).abs().max().max()
+    print(f"Sai lệch lớn nhất giữa tổng các cấp và dự báo tổng: {gap:,.2f}")
+    print(result.groupby(['Level', 'Model']).size().to_string())
+    return result
+
+
+if __name__ == "__main__":
+    main_hierarchical_forecast(config=RunConfig.from_args())
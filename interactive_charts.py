@@ -0,0 +1,169 @@
+"""interactive_charts.py - Biểu đồ tương tác (Altair) từ dữ liệu đã tổng hợp
+
+Chỉ các bảng tổng hợp nhỏ (theo tháng, kênh, sản phẩm, nhân viên) được gửi tới
+trình duyệt, việc vẽ, tooltip và zoom do Vega-Lite thực hiện phía client.
+"""
+import altair as alt
+
+
+CHANNEL_COLORS = alt.Scale(scheme='set2')
+
+# Các cột mỗi bảng tổng hợp cần đến
+AGGREGATE_COLUMNS = {
+    'monthly': ['Year_Month', 'Order_Channel', 'Revenue', 'Quantity'],
+    'channel': ['Order_Channel', 'Revenue', 'Quantity', 'Sale_id'],
+    'product': ['Product_Name', 'Size', 'Order_Channel', 'Revenue', 'Quantity'],
+    'staff': ['Staff_id', 'Revenue', 'Quantity', 'Sale_id'],
+}
+
+
+def build_aggregates(df):
+    """Tổng hợp dữ liệu đã làm sạch thành các bảng nhỏ cho biểu đồ tương tác
+
+    Mỗi bảng chỉ được tạo khi dữ liệu có đủ các cột bảng đó dùng (xem
+    AGGREGATE_COLUMNS); trang biểu đồ chỉ hiện tab của các bảng có mặt.
+    """
+    aggregates = {}
+
+    def has(name):
+        return all(col in df.columns for col in AGGREGATE_COLUMNS[name])
+
+    # 1. Theo tháng và kênh
+    if has('monthly'):
+        monthly = df.groupby(['Year_Month', 'Order_Channel']).agg(
+            Revenue=('Revenue', 'sum'),
+            Quantity=('Quantity', 'sum')
+        ).reset_index()
+        # Ngày đầu tháng để Vega-Lite hiểu là trục thời gian (cho phép zoom)
+        monthly['Month_Start'] = monthly['Year_Month'] + '-01'
+        aggregates['monthly'] = monthly
+
+    # 2. Theo kênh
+    if has('channel'):
+        channel = df.groupby('Order_Channel').agg(
+            Revenue=('Revenue', 'sum'),
+            Quantity=('Quantity', 'sum'),
+            Order_Count=('Sale_id', 'count')
+        ).reset_index()
+        aggregates['channel'] = channel
+
+    # 3. Theo sản phẩm, size và kênh
+    if has('product'):
+        product = df.groupby(['Product_Name', 'Size', 'Order_Channel']).agg(
+            Revenue=('Revenue', 'sum'),
+            Quantity=('Quantity', 'sum')
+        ).reset_index()
+        aggregates['product'] = product
+
+    # 4. Theo nhân viên
+    if has('staff'):
+        staff = df.groupby('Staff_id').agg(
+            Revenue=('Revenue', 'sum'),
+            Quantity=('Quantity', 'sum'),
+            Order_Count=('Sale_id', 'count')
+        ).reset_index()
+        staff = staff.sort_values('Revenue', ascending=False)
+        staff['Rank'] = range(1, len(staff) + 1)
+        aggregates['staff'] = staff
+
+    return aggregates
+
+
+def monthly_chart(monthly):
+    """Doanh thu theo tháng, xếp chồng theo kênh (kéo để zoom trục thời gian)"""
+    zoom = alt.selection_interval(bind='scales', encodings=['x'])
+
+    bars = alt.Chart(monthly).mark_bar().encode(
+        x=alt.X('yearmonth(Month_Start):T', title='Tháng'),
+        y=alt.Y('sum(Revenue):Q', title='Doanh thu (VND)'),
+        color=alt.Color('Order_Channel:N', title='Kênh', scale=CHANNEL_COLORS),
+        tooltip=[
+            alt.Tooltip('yearmonth(Month_Start):T', title='Tháng', format='%m/%Y'),
+            alt.Tooltip('Order_Channel:N', title='Kênh'),
+            alt.Tooltip('sum(Revenue):Q', title='Doanh thu', format=',.0f'),
+            alt.Tooltip('sum(Quantity):Q', title='Số lượng', format=',')
+        ]
+    ).add_params(zoom).properties(title='Doanh thu theo tháng', height=360)
+
+    return bars
+
+
+def channel_chart(channel):
+    """Tỷ trọng và doanh thu theo kênh"""
+    tooltip = [
+        alt.Tooltip('Order_Channel:N', title='Kênh'),
+        alt.Tooltip('Revenue:Q', title='Doanh thu', format=',.0f'),
+        alt.Tooltip('Order_Count:Q', title='Số đơn hàng', format=','),
+        alt.Tooltip('Quantity:Q', title='Số lượng', format=',')
+    ]
+    base = alt.Chart(channel).encode(
+        color=alt.Color('Order_Channel:N', title='Kênh', scale=CHANNEL_COLORS),
+        tooltip=tooltip
+    )
+
+    donut = base.mark_arc(innerRadius=60).encode(
+        theta=alt.Theta('Revenue:Q')
+    ).properties(title='Phân phối doanh thu theo kênh', width=280, height=280)
+
+    bars = base.mark_bar().encode(
+        x=alt.X('Order_Channel:N', title='Kênh bán hàng'),
+        y=alt.Y('Revenue:Q', title='Doanh thu (VND)')
+    ).properties(title='Doanh thu theo kênh', width=280, height=280)
+
+    return alt.hconcat(donut, bars)
+
+
+def product_chart(product):
+    """Doanh thu sản phẩm theo size; chọn kênh để lọc, click legend để làm nổi size"""
+    channels = sorted(product['Order_Channel'].unique().tolist())
+    channel_pick = alt.selection_point(
+        fields=['Order_Channel'],
+        bind=alt.binding_radio(options=[None] + channels,
+                               labels=['Tất cả'] + channels,
+                               name='Kênh: ')
+    )
+    size_pick = alt.selection_point(fields=['Size'], bind='legend')
+
+    bars = alt.Chart(product).mark_bar().encode(
+        y=alt.Y('Product_Name:N', title='Sản phẩm', sort='-x'),
+        x=alt.X('sum(Revenue):Q', title='Doanh thu (VND)'),
+        color=alt.Color('Size:N', title='Kích cỡ', sort=['S', 'M', 'L']),
+        opacity=alt.condition(size_pick, alt.value(1), alt.value(0.25)),
+        tooltip=[
+            alt.Tooltip('Product_Name:N', title='Sản phẩm'),
+            alt.Tooltip('Size:N', title='Kích cỡ'),
+            alt.Tooltip('sum(Revenue):Q', title='Doanh thu', format=',.0f'),
+            alt.Tooltip('sum(Quantity):Q', title='Số lượng', format=',')
+        ]
+    ).add_params(channel_pick, size_pick).transform_filter(channel_pick).properties(
+        title='Doanh thu theo sản phẩm và kích cỡ', height=360
+    )
+
+    return bars
+
+
+def staff_chart(staff, top_n=15):
+    """Số đơn - doanh thu nhân viên (zoom/pan) và top N nhân viên"""
+    tooltip = [
+        alt.Tooltip('Staff_id:N', title='Nhân viên'),
+        alt.Tooltip('Rank:Q', title='Hạng'),
+        alt.Tooltip('Revenue:Q', title='Doanh thu', format=',.0f'),
+        alt.Tooltip('Order_Count:Q', title='Số đơn hàng', format=','),
+        alt.Tooltip('Quantity:Q', title='Số lượng', format=',')
+    ]
+
+    scatter = alt.Chart(staff).mark_circle(opacity=0.8, stroke='black', strokeWidth=0.5).encode(
+        x=alt.X('Order_Count:Q', title='Số đơn hàng', scale=alt.Scale(zero=False)),
+        y=alt.Y('Revenue:Q', title='Doanh thu (VND)', scale=alt.Scale(zero=False)),
+        size=alt.Size('Quantity:Q', title='Số lượng'),
+        color=alt.Color('Rank:Q', scale=alt.Scale(scheme='viridis', reverse=True), legend=None),
+        tooltip=tooltip
+    ).interactive().properties(title='Mối quan hệ Số đơn - Doanh thu', height=360)
+
+    top = alt.Chart(staff.head(top_n)).mark_bar(color='#2E86AB').encode(
+        y=alt.Y('Staff_id:N', title='Mã nhân viên', sort='-x'),
+        x=alt.X('Revenue:Q', title='Doanh thu (VND)'),
+        tooltip=tooltip
+    ).properties(title=f'Top {top_n} nhân viên doanh thu cao nhất', height=360)
+
+    return alt.hconcat(scatter, top)
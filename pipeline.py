@@ -0,0 +1,383 @@
+"""pipeline.py - Pipeline dạng DAG, bỏ qua các bước có đầu vào không đổi
+
+Mỗi bước khai báo file đầu vào và đầu ra; quan hệ phụ thuộc được suy ra từ đó:
+
+    data_1.csv -> clean -> cleaned_data.csv -> pivots
+                                            -> charts.daily / product / channel / staff
+                                            -> forecasts
+                                            -> sales_db (sales.db cho trang CRUD)
+                        -> cleaned_data.arrow (memory map cho pivots / charts)
+                        -> cleaned/Year=/Month=/  (đọc theo khoảng ngày, cleaned_store.py)
+
+Bước clean còn đọc nhật ký sales_edits.jsonl (thêm/sửa/xóa trên trang CRUD,
+xem sales_store.py) nếu có.
+
+Một bước chỉ chạy khi hash nội dung của đầu vào khác lần chạy trước (hoặc thiếu
+đầu ra). Các bước độc lập (pivots, từng nhóm biểu đồ, dự báo) chạy song song
+trên nhiều tiến trình. Hash được nhớ theo (mtime, kích thước) nên chạy lại trên
+dữ liệu không đổi chỉ tốn vài lệnh stat, không đọc lại file.
+
+Đường dẫn lấy từ RunConfig (run_config.py): nhiều pipeline với `output_root`
+khác nhau chạy song song được bằng run_parallel().
+
+Chạy: python pipeline.py           (chỉ chạy bước có thay đổi)
+      python pipeline.py --force   (chạy lại toàn bộ)
+      python pipeline.py --input data_1.csv --output-root output/run_a --profile draft
+"""
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import hashlib
+import warnings
+import functools
+import contextlib
+from concurrent.futures import (Future, ProcessPoolExecutor, ThreadPoolExecutor, wait,
+                                FIRST_COMPLETED)
+
+from telemetry import timed
+from run_config import RunConfig, resolve, active
+
+# Ảnh do từng nhóm biểu đồ tạo ra (theo create_all_charts của visualizer)
+CHART_FILES = {
+    'daily': ['daily_revenue.png', 'monthly_trend.png', 'quarterly_comparison.png'],
+    'product': ['top_products_quantity.png', 'top_products_revenue.png', 'product_size_distribution.png'],
+    'channel': ['channel_analysis.png', 'channel_trend.png', 'channel_by_product.png'],
+    'staff': ['top_staff_performance.png', 'staff_by_channel.png', 'staff_trend.png'],
+}
+
+
+def file_hash(path):
+    """SHA-256 nội dung file (None nếu file không tồn tại)"""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def tmp_path(path):
+    root, ext = os.path.splitext(path)
+    return f'{root}.tmp{os.getpid()}{ext}'
+
+
+def publish(tmp, path):
+    """Đưa file tạm vào vị trí chính thức (đổi tên nguyên tử)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    os.replace(tmp, path)
+
+
+# --- Các bước xử lý: mỗi bước đọc `inputs`, ghi `outputs` ---
+def _run_clean(config):
+    from data_preprocess_1 import DataPreprocessor
+
+    preprocessor = DataPreprocessor(config=config)
+    if not preprocessor.load_data() or not preprocessor.clean_data():
+        raise RuntimeError("Không làm sạch được dữ liệu gốc")
+    staged = tmp_path(config.cleaned_path)
+    preprocessor.save_cleaned_data(staged)
+    publish(staged, config.cleaned_path)
+    # Bản Arrow cho các bước sau mở bằng memory map (đã ghi tạm rồi đổi tên)
+    preprocessor.save_arrow(config.cleaned_arrow_path)
+    # Bản chia phân vùng Year/Month cho các lần đọc theo khoảng ngày
+    preprocessor.save_partitioned(config.cleaned_dir)
+
+
+def _run_pivots(config):
+    import cleaned_store
+    from pivot_analysis import PivotAnalyzer
+
+    analyzer = PivotAnalyzer(cleaned_store.read_arrow(config.cleaned_arrow_path), config)
+    analyzer.create_all_pivots()
+    staged = tmp_path(config.pivot_path)
+    if not analyzer.save_to_excel(staged):
+        raise RuntimeError("Không tạo được pivot tables")
+    publish(staged, config.pivot_path)
+
+    staging = f'{config.pivot_csv_dir}.tmp{os.getpid()}'
+    analyzer.save_to_csv(staging)
+    for name in os.listdir(staging):
+        publish(os.path.join(staging, name), os.path.join(config.pivot_csv_dir, name))
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+def _run_chart_group(config, group):
+    import cleaned_store
+    from visualize_daily1 import DailyVisualizer
+    from visualize_product1 import ProductVisualizer
+    from visualize_channel1 import ChannelVisualizer
+    from visualize_staff1 import StaffVisualizer
+
+    visualizer_cls = {
+        'daily': DailyVisualizer,
+        'product': ProductVisualizer,
+        'channel': ChannelVisualizer,
+        'staff': StaffVisualizer,
+    }[group]
+
+    df = cleaned_store.read_arrow(config.cleaned_arrow_path)
+    staging = f'{config.chart_dir}.tmp-{group}-{os.getpid()}'
+    try:
+        visualizer_cls(df, output_dir=staging, config=config).create_all_charts()
+        # Từng ảnh được thay thế nguyên tử, dashboard không bao giờ đọc ảnh đang ghi dở
+        for name in os.listdir(staging):
+            publish(os.path.join(staging, name), os.path.join(config.chart_dir, name))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _run_sales_db(config):
+    import pandas as pd
+    from sales_store import SalesStore, file_signature
+
+    staged = tmp_path(config.sales_db_path)
+    SalesStore(staged, config).create_from_cleaned(pd.read_csv(config.cleaned_path),
+                                                   file_signature(config.cleaned_path))
+    publish(staged, config.sales_db_path)
+
+
+def _run_forecasts(config):
+    from hierarchical_forecast import HierarchicalForecaster
+
+    staged = tmp_path(config.forecast_path)
+    HierarchicalForecaster(output_path=staged, config=config).run()
+    publish(staged, config.forecast_path)
+    publish(os.path.splitext(staged)[0] + '.json', os.path.splitext(config.forecast_path)[0] + '.json')
+
+
+class Stage:
+    def __init__(self, name, inputs, outputs, run, optional=()):
+        self.name = name
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.run = run
+        # Đầu vào có thể chưa tồn tại (nhật ký sửa giao dịch) mà bước vẫn chạy được
+        self.optional = set(optional)
+
+    def __repr__(self):
+        return f'Stage({self.name!r}, inputs={self.inputs}, outputs={self.outputs})'
+
+
+def build_stages(config):
+    """Các bước của pipeline với đường dẫn theo cấu hình lần chạy"""
+    import cleaned_store
+
+    stages = [
+        Stage('clean', [config.input_path, config.sales_edits_path],
+              [config.cleaned_path, config.cleaned_arrow_path,
+               os.path.join(config.cleaned_dir, cleaned_store.MANIFEST_NAME)],
+              functools.partial(_run_clean, config), optional=[config.sales_edits_path]),
+        Stage('pivots', [config.cleaned_arrow_path], [config.pivot_path],
+              functools.partial(_run_pivots, config)),
+    ]
+    for group, files in CHART_FILES.items():
+        stages.append(Stage(f'charts.{group}', [config.cleaned_arrow_path],
+                            [os.path.join(config.chart_dir, name) for name in files],
+                            functools.partial(_run_chart_group, config, group)))
+    stages.append(Stage('forecasts', [config.cleaned_path], [config.forecast_path],
+                        functools.partial(_run_forecasts, config)))
+    stages.append(Stage('sales_db', [config.cleaned_path], [config.sales_db_path],
+                        functools.partial(_run_sales_db, config)))
+    return stages
+
+
+def _execute(name, run, config):
+    """Chạy một bước trong tiến trình worker; trả về số giây"""
+    started = time.perf_counter()
+    # Ẩn log chi tiết của từng module, chỉ in tóm tắt từng bước. Metrics / trace
+    # của bước được ghi dưới output_root của lần chạy (run_config.active)
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings(), active(config):
+        warnings.simplefilter('ignore')
+        with timed(f'Pipeline.{name}'):
+            run()
+    return time.perf_counter() - started
+
+
+class Pipeline:
+    def __init__(self, config=None, stages=None, state_path=None, workers=None):
+        self.config = resolve(config)
+        self.stages = stages or build_stages(self.config)
+        self.state_path = state_path or self.config.state_path
+        self.workers = workers or min(len(self.stages), self.config.stage_workers)
+        self.dependencies = self._resolve_dependencies()
+
+    def _resolve_dependencies(self):
+        """Bước A phụ thuộc bước B nếu một đầu vào của A là đầu ra của B"""
+        producers = {}
+        for stage in self.stages:
+            for path in stage.outputs:
+                if path in producers:
+                    raise ValueError(f"{path} được tạo bởi cả {producers[path]} và {stage.name}")
+                producers[path] = stage.name
+
+        dependencies = {stage.name: {producers[path] for path in stage.inputs if path in producers}
+                        for stage in self.stages}
+
+        # Kiểm tra chu trình bằng sắp xếp topo
+        remaining = {name: set(deps) for name, deps in dependencies.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Pipeline có chu trình giữa các bước: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return dependencies
+
+    def load_state(self):
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            state = {}
+        state.setdefault('stages', {})
+        state.setdefault('hashes', {})
+        return state
+
+    def save_state(self, state):
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        staged = tmp_path(self.state_path)
+        with open(staged, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        publish(staged, self.state_path)
+
+    def input_hash(self, path, state):
+        """Hash nội dung, chỉ đọc lại file khi mtime hoặc kích thước thay đổi"""
+        if not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        cached = state['hashes'].get(path)
+        if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+            return cached['sha256']
+        digest = file_hash(path)
+        state['hashes'][path] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest}
+        return digest
+
+    def _submit(self, executor, stage):
+        if executor is None:
+            # workers=1: chạy ngay trong tiến trình hiện tại
+            future = Future()
+            try:
+                future.set_result(_execute(stage.name, stage.run, self.config))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return executor.submit(_execute, stage.name, stage.run, self.config)
+
+    def run(self, force=False):
+        """Chạy các bước có đầu vào thay đổi theo thứ tự phụ thuộc; trả về danh sách bước đã chạy"""
+        state = self.load_state()
+        pending = {stage.name: stage for stage in self.stages}
+        finished, failed, ran = set(), set(), []
+        running = {}
+        executor = None
+
+        try:
+            while pending or running:
+                for name in list(pending):
+                    stage = pending[name]
+                    if not self.dependencies[name] <= finished | failed:
+                        continue
+                    del pending[name]
+
+                    if self.dependencies[name] & failed:
+                        print(f"[{name}] bỏ qua vì bước phía trước bị lỗi")
+                        failed.add(name)
+                        continue
+
+                    hashes = {path: self.input_hash(path, state) for path in stage.inputs}
+                    missing = [p for p, h in hashes.items() if h is None and p not in stage.optional]
+                    if missing:
+                        print(f"[{name}] thiếu đầu vào {missing}, bỏ qua")
+                        failed.add(name)
+                        continue
+
+                    previous = state['stages'].get(name, {})
+                    outputs_ready = all(os.path.exists(path) for path in stage.outputs)
+                    if not force and outputs_ready and previous.get('inputs') == hashes:
+                        finished.add(name)
+                        continue
+
+                    if executor is None and self.workers > 1:
+                        executor = ProcessPoolExecutor(max_workers=self.workers)
+                    running[self._submit(executor, stage)] = (stage, hashes)
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, hashes = running.pop(future)
+                    try:
+                        seconds = future.result()
+                    except Exception as e:
+                        print(f"[{stage.name}] lỗi: {e}")
+                        failed.add(stage.name)
+                        continue
+
+                    state['stages'][stage.name] = {'inputs': hashes, 'seconds': round(seconds, 3),
+                                                   'finished_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+                    self.save_state(state)
+                    finished.add(stage.name)
+                    ran.append(stage.name)
+                    print(f"[{stage.name}] xong trong {seconds:.1f}s")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.save_state(state)
+        if not ran and not failed:
+            print("Không có thay đổi, dữ liệu đã mới nhất")
+        return ran
+
+
+def run_parallel(configs, force=False):
+    """Chạy nhiều pipeline (mỗi cấu hình một output_root) cùng lúc, chia đều số CPU"""
+    roots = [config.output_root for config in configs]
+    if len(set(roots)) != len(roots):
+        raise ValueError("Các lần chạy song song phải có output_root khác nhau")
+
+    share = max(1, (os.cpu_count() or 1) // len(configs))
+    pipelines = [Pipeline(config.replace(workers=min(config.workers, share))) for config in configs]
+    # Mỗi luồng chỉ điều phối; việc nặng chạy trong process pool riêng của từng pipeline
+    with ThreadPoolExecutor(max_workers=len(pipelines)) as executor:
+        results = executor.map(lambda pipeline: pipeline.run(force=force), pipelines)
+        return dict(zip(roots, results))
+
+
+def last_run(state_path=None):
+    """Thời điểm hoàn thành gần nhất của từng bước (cho dashboard)"""
+    state_path = state_path or resolve().state_path
+    try:
+        with open(state_path, encoding='utf-8') as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return {name: info.get('finished_at') for name, info in state.get('stages', {}).items()}
+
+
+# Hàm chính cho module này
+def main_pipeline(force=False, config=None):
+    """Hàm chính chạy toàn bộ pipeline"""
+    print("=" * 60)
+    print("PIPELINE DỮ LIỆU (DAG)")
+    print("=" * 60)
+
+    config = resolve(config)
+    if not os.path.exists(config.input_path):
+        print(f"File {config.input_path} không tồn tại!")
+        return None
+
+    started = time.perf_counter()
+    ran = Pipeline(config).run(force=force)
+    print(f"Hoàn tất trong {time.perf_counter() - started:.2f}s ({len(ran)} bước đã chạy)")
+    return ran
+
+
+if __name__ == "__main__":
+    main_pipeline(force='--force' in sys.argv, config=RunConfig.from_args())
@@ -1,113 +1,138 @@
 """pivot_analysis.py - Tạo các pivot table cho phân tích"""
 import pandas as pd
 import os
+from bitmap_index import BitmapIndex
+from telemetry import timed
+from run_config import RunConfig, resolve
+import cleaned_store
 
 
 class PivotAnalyzer:
-    def __init__(self, df):
+    def __init__(self, df, config=None):
         self.df = df
+        self.config = resolve(config)
         self.pivot_tables = {}
+        self.bitmap_index = None
 
+    def filter(self, **filters):
+        """PivotAnalyzer mới chỉ gồm các dòng khớp bộ lọc
+
+        Ví dụ: analyzer.filter(Size='L', Order_Channel='Online', Product_Name=['Mocha', 'Latte'])
+        Bộ lọc dùng bitmap index (dựng một lần cho mỗi analyzer) thay vì mặt nạ pandas.
+        """
+        if self.bitmap_index is None:
+            self.bitmap_index = BitmapIndex(self.df)
+        bitmap = self.bitmap_index.select(**filters)
+        return PivotAnalyzer(self.bitmap_index.rows(bitmap).reset_index(drop=True), self.config)
+
+    @timed
     def create_all_pivots(self):
         """Tạo tất cả các pivot table"""
         print("Đang tạo pivot tables...")
 
         # 1. Pivot theo sản phẩm và kênh
         if 'Product_Name' in self.df.columns and 'Order_Channel' in self.df.columns and 'Revenue' in self.df.columns:
-            pivot1 = self.df.pivot_table(
-                index='Product_Name',
-                columns='Order_Channel',
-                values=['Revenue', 'Quantity'],
-                aggfunc={'Revenue': 'sum', 'Quantity': 'sum'},
-                fill_value=0
-            )
-
-            # Làm phẳng multi-index
-            pivot1.columns = [f'{col[1]}_{col[0]}' for col in pivot1.columns]
-            pivot1 = pivot1.reset_index()
-
-            # Tính tổng
-            pivot1['Total_Revenue'] = pivot1.filter(like='Revenue').sum(axis=1)
-            pivot1['Total_Quantity'] = pivot1.filter(like='Quantity').sum(axis=1)
-            pivot1 = pivot1.sort_values('Total_Revenue', ascending=False)
-
-            self.pivot_tables['product_channel'] = pivot1
-            print("Đã tạo pivot: Sản phẩm theo kênh")
+            with timed('PivotAnalyzer.pivot.product_channel'):
+                pivot1 = self.df.pivot_table(
+                    index='Product_Name',
+                    columns='Order_Channel',
+                    values=['Revenue', 'Quantity'],
+                    aggfunc={'Revenue': 'sum', 'Quantity': 'sum'},
+                    fill_value=0
+                )
+
+                # Làm phẳng multi-index
+                pivot1.columns = [f'{col[1]}_{col[0]}' for col in pivot1.columns]
+                pivot1 = pivot1.reset_index()
+
+                # Tính tổng
+                pivot1['Total_Revenue'] = pivot1.filter(like='Revenue').sum(axis=1)
+                pivot1['Total_Quantity'] = pivot1.filter(like='Quantity').sum(axis=1)
+                pivot1 = pivot1.sort_values('Total_Revenue', ascending=False)
+
+                self.pivot_tables['product_channel'] = pivot1
+                print("Đã tạo pivot: Sản phẩm theo kênh")
 
         # 2. Pivot theo thời gian
         if 'Year_Month' in self.df.columns and 'Revenue' in self.df.columns:
-            pivot2 = self.df.pivot_table(
-                index='Year_Month',
-                values=['Revenue', 'Quantity'],
-                aggfunc={'Revenue': 'sum', 'Quantity': 'sum'},
-                fill_value=0
-            ).reset_index()
-
-            pivot2 = pivot2.sort_values('Year_Month')
-            self.pivot_tables['monthly_trend'] = pivot2
-            print("Đã tạo pivot: Xu hướng theo tháng")
+            with timed('PivotAnalyzer.pivot.monthly_trend'):
+                pivot2 = self.df.pivot_table(
+                    index='Year_Month',
+                    values=['Revenue', 'Quantity'],
+                    aggfunc={'Revenue': 'sum', 'Quantity': 'sum'},
+                    fill_value=0
+                ).reset_index()
+
+                pivot2 = pivot2.sort_values('Year_Month')
+                self.pivot_tables['monthly_trend'] = pivot2
+                print("Đã tạo pivot: Xu hướng theo tháng")
 
         # 3. Pivot theo nhân viên
         if 'Staff_id' in self.df.columns and 'Revenue' in self.df.columns:
-            pivot3 = self.df.pivot_table(
-                index='Staff_id',
-                values=['Revenue', 'Quantity'],
-                aggfunc={'Revenue': 'sum', 'Quantity': 'sum'},
-                fill_value=0
-            ).reset_index()
-
-            pivot3 = pivot3.sort_values('Revenue', ascending=False)
-            pivot3['Rank'] = range(1, len(pivot3) + 1)
-            self.pivot_tables['staff_performance'] = pivot3
-            print("Đã tạo pivot: Hiệu suất nhân viên")
+            with timed('PivotAnalyzer.pivot.staff_performance'):
+                pivot3 = self.df.pivot_table(
+                    index='Staff_id',
+                    values=['Revenue', 'Quantity'],
+                    aggfunc={'Revenue': 'sum', 'Quantity': 'sum'},
+                    fill_value=0
+                ).reset_index()
+
+                pivot3 = pivot3.sort_values('Revenue', ascending=False)
+                pivot3['Rank'] = range(1, len(pivot3) + 1)
+                self.pivot_tables['staff_performance'] = pivot3
+                print("Đã tạo pivot: Hiệu suất nhân viên")
 
         # 4. Pivot theo kích cỡ sản phẩm
         if 'Product_Name' in self.df.columns and 'Size' in self.df.columns:
-            pivot4 = self.df.pivot_table(
-                index='Product_Name',
-                columns='Size',
-                values=['Quantity', 'Revenue'],
-                aggfunc={'Quantity': 'sum', 'Revenue': 'sum'},
-                fill_value=0
-            )
-
-            # Làm phẳng columns
-            pivot4.columns = [f'{col[1]}_{col[0]}' for col in pivot4.columns]
-            pivot4 = pivot4.reset_index()
-
-            # Thêm tổng
-            size_cols = ['L', 'M', 'S']
-            for col in size_cols:
-                if f'{col}_Quantity' not in pivot4.columns:
-                    pivot4[f'{col}_Quantity'] = 0
-                if f'{col}_Revenue' not in pivot4.columns:
-                    pivot4[f'{col}_Revenue'] = 0
-
-            pivot4['Total_Quantity'] = pivot4[[f'{c}_Quantity' for c in size_cols]].sum(axis=1)
-            pivot4['Total_Revenue'] = pivot4[[f'{c}_Revenue' for c in size_cols]].sum(axis=1)
-            pivot4 = pivot4.sort_values('Total_Revenue', ascending=False)
-
-            self.pivot_tables['product_size'] = pivot4
-            print("Dã tạo pivot: Sản phẩm theo kích cỡ")
+            with timed('PivotAnalyzer.pivot.product_size'):
+                pivot4 = self.df.pivot_table(
+                    index='Product_Name',
+                    columns='Size',
+                    values=['Quantity', 'Revenue'],
+                    aggfunc={'Quantity': 'sum', 'Revenue': 'sum'},
+                    fill_value=0
+                )
+
+                # Làm phẳng columns
+                pivot4.columns = [f'{col[1]}_{col[0]}' for col in pivot4.columns]
+                pivot4 = pivot4.reset_index()
+
+                # Thêm tổng
+                size_cols = ['L', 'M', 'S']
+                for col in size_cols:
+                    if f'{col}_Quantity' not in pivot4.columns:
+                        pivot4[f'{col}_Quantity'] = 0
+                    if f'{col}_Revenue' not in pivot4.columns:
+                        pivot4[f'{col}_Revenue'] = 0
+
+                pivot4['Total_Quantity'] = pivot4[[f'{c}_Quantity' for c in size_cols]].sum(axis=1)
+                pivot4['Total_Revenue'] = pivot4[[f'{c}_Revenue' for c in size_cols]].sum(axis=1)
+                pivot4 = pivot4.sort_values('Total_Revenue', ascending=False)
+
+                self.pivot_tables['product_size'] = pivot4
+                print("Dã tạo pivot: Sản phẩm theo kích cỡ")
 
         # 5. Pivot theo sản phẩm và size
         if all(col in self.df.columns for col in ['Product_Name', 'Size', 'Revenue']):
-            pivot5 = self.df.pivot_table(
-                index=['Product_Name', 'Size'],
-                values=['Revenue', 'Quantity'],
-                aggfunc={'Revenue': 'sum', 'Quantity': 'sum'},
-                fill_value=0
-            ).reset_index()
-
-            pivot5 = pivot5.sort_values(['Product_Name', 'Revenue'], ascending=[True, False])
-            self.pivot_tables['product_size_detail'] = pivot5
-            print("Đã tạo pivot: Chi tiết sản phẩm theo size")
+            with timed('PivotAnalyzer.pivot.product_size_detail'):
+                pivot5 = self.df.pivot_table(
+                    index=['Product_Name', 'Size'],
+                    values=['Revenue', 'Quantity'],
+                    aggfunc={'Revenue': 'sum', 'Quantity': 'sum'},
+                    fill_value=0
+                ).reset_index()
+
+                pivot5 = pivot5.sort_values(['Product_Name', 'Revenue'], ascending=[True, False])
+                self.pivot_tables['product_size_detail'] = pivot5
+                print("Đã tạo pivot: Chi tiết sản phẩm theo size")
 
         print(f"Đã tạo tổng cộng {len(self.pivot_tables)} pivot tables")
         return self.pivot_tables
 
-    def save_to_excel(self, output_path='output/pivot_tables.xlsx'):
+    @timed
+    def save_to_excel(self, output_path=None):
         """Lưu tất cả pivot tables vào file Excel"""
+        output_path = output_path or self.config.pivot_path
         if not self.pivot_tables:
             print(" Không có pivot tables để lưu!")
             return False
@@ -132,8 +157,10 @@ class PivotAnalyzer:
         print(f"Đã lưu {len(self.pivot_tables)} pivot tables vào: {output_path}")
         return True
 
-    def save_to_csv(self, output_folder='output/pivot_csv'):
+    @timed
+    def save_to_csv(self, output_folder=None):
         """Lưu từng pivot table ra file CSV riêng"""
+        output_folder = output_folder or self.config.pivot_csv_dir
         if not self.pivot_tables:
             print("Không có pivot tables để lưu!")
             return False
@@ -150,22 +177,22 @@ class PivotAnalyzer:
 
 
 # Hàm chính cho module nà
-def main_pivot_analysis(df_path='output/cleaned_data.csv'):
+def main_pivot_analysis(df_path=None, config=None, date_from=None, date_to=None):
     """Hàm chính cho phân tích pivot"""
     print("=" * 60)
     print("PHÂN TÍCH PIVOT TABLES")
     print("=" * 60)
 
-    if not os.path.exists(df_path):
-        print(f"File {df_path} không tồn tại!")
-        return None
+    config = resolve(config)
 
-    # Đọc dữ liệu đã làm sạch
-    df = pd.read_csv(df_path)
-    print(f" Đã tải {len(df)} bản ghi từ {df_path}")
+    # Đọc dữ liệu: phân vùng theo khoảng ngày, bản Arrow (memory map) hoặc CSV
+    df = cleaned_store.load_for_run(config, df_path, date_from, date_to)
+    if df is None:
+        return None
+    print(f" Đã tải {len(df)} bản ghi từ {df.attrs['source']}")
 
     # Khởi tạo analyzer
-    analyzer = PivotAnalyzer(df)
+    analyzer = PivotAnalyzer(df, config)
 
     # Tạo pivot tables
     pivots = analyzer.create_all_pivots()
@@ -180,4 +207,6 @@ def main_pivot_analysis(df_path='output/cleaned_data.csv'):
 
 
 if __name__ == "__main__":
-    main_pivot_analysis()
\ No newline at end of file
+    config = RunConfig.from_args()
+    date_from, date_to = cleaned_store.date_args(config=config)
+    main_pivot_analysis(config=config, date_from=date_from, date_to=date_to)
\ No newline at end of file
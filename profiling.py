@@ -0,0 +1,293 @@
+"""profiling.py - Ghi trace (định dạng Chrome trace-event) cho các bước pipeline
+
+Được gọi từ telemetry.Span nên mọi chỗ đã dùng `@timed` / `with timed(...)`
+(DataPreprocessor, PivotAnalyzer, các visualizer, ChartRenderer, trang dashboard)
+đều có span tương ứng: thời gian, số dòng, thay đổi RSS, lồng nhau theo luồng.
+Mặc định tắt, bật bằng biến môi trường:
+
+    HLC_PROFILE=1            ghi trace vào <output_root>/profiles/trace-<pid>-<thời gian>.json
+    HLC_PROFILE_CPROFILE=1   thêm một file .prof (cProfile) cho mỗi bước ngoài cùng
+
+Sự kiện được ghi nối (định dạng JSON Array của trace-event) mỗi khi span ngoài
+cùng của một luồng kết thúc, hoặc khi bộ đệm đạt MAX_BUFFERED_EVENTS, nên tiến
+trình sống lâu (Streamlit) và worker của process pool (không chạy atexit)
+không giữ sự kiện trong bộ nhớ mãi.
+
+Mở file trace bằng chrome://tracing hoặc https://ui.perfetto.dev; file .prof
+xem bằng `python -m pstats` hoặc snakeviz.
+"""
+import os
+import io
+import sys
+import json
+import time
+import atexit
+import pstats
+import cProfile
+import threading
+import warnings
+import contextlib
+import psutil
+
+from run_config import resolve
+
+# Số sự kiện tối đa giữ trong bộ nhớ trước khi ghi ra file trace
+MAX_BUFFERED_EVENTS = 5000
+
+_lock = threading.Lock()
+_local = threading.local()
+_events = []
+_process = psutil.Process()
+_trace_path = None
+_profile_count = 0
+
+
+def enabled():
+    return os.environ.get('HLC_PROFILE', '0') == '1'
+
+
+def cprofile_enabled():
+    return enabled() and os.environ.get('HLC_PROFILE_CPROFILE', '0') == '1'
+
+
+def enable(cprofile=False):
+    """Bật profiling trong tiến trình hiện tại (và các tiến trình con sinh sau đó)"""
+    os.environ['HLC_PROFILE'] = '1'
+    if cprofile:
+        os.environ['HLC_PROFILE_CPROFILE'] = '1'
+
+
+def _now_us():
+    return time.perf_counter_ns() / 1000
+
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def _safe_name(name):
+    return ''.join(c if c.isalnum() or c in '._-' else '_' for c in name)
+
+
+def begin(name, category='pipeline'):
+    """Mở một span; trả về None nếu profiling đang tắt"""
+    if not enabled():
+        return None
+    # Cố định file trace theo cấu hình của lần chạy đang active khi có span đầu tiên
+    trace_path()
+    stack = _stack()
+    span = {
+        'name': name,
+        'cat': category,
+        'ts': _now_us(),
+        'rss': _process.memory_info().rss,
+        'parent': stack[-1]['name'] if stack else None,
+        'profiler': None,
+    }
+    # cProfile không lồng được, chỉ đo bước ngoài cùng của mỗi luồng
+    if not stack and cprofile_enabled():
+        span['profiler'] = cProfile.Profile()
+        span['profiler'].enable()
+    stack.append(span)
+    return span
+
+
+def end(span, **fields):
+    """Đóng span, thêm một sự kiện 'X' (complete) vào trace"""
+    if span is None:
+        return None
+    end_ts = _now_us()
+    stack = _stack()
+    if span in stack:
+        del stack[stack.index(span):]
+
+    args = {key: value for key, value in fields.items() if value is not None}
+    args['rss_delta_mb'] = round((_process.memory_info().rss - span['rss']) / 1e6, 2)
+    if span['parent']:
+        args['parent'] = span['parent']
+
+    if span['profiler'] is not None:
+        span['profiler'].disable()
+        args['cprofile'] = _dump_profile(span['profiler'], span['name'])
+
+    event = {
+        'name': span['name'],
+        'cat': span['cat'],
+        'ph': 'X',
+        'ts': round(span['ts'], 3),
+        'dur': round(end_ts - span['ts'], 3),
+        'pid': os.getpid(),
+        'tid': threading.get_ident(),
+        'args': args,
+    }
+    with _lock:
+        _events.append(event)
+        full = len(_events) >= MAX_BUFFERED_EVENTS
+    if not stack or full:
+        flush()
+    return event
+
+
+@contextlib.contextmanager
+def trace(name, category='pipeline', **fields):
+    """Context manager cho các đoạn mã không đi qua telemetry"""
+    span = begin(name, category)
+    try:
+        yield span
+    finally:
+        end(span, **fields)
+
+
+def _dump_profile(profiler, name):
+    global _profile_count
+    with _lock:
+        _profile_count += 1
+        count = _profile_count
+    profile_dir = resolve().profile_dir
+    os.makedirs(profile_dir, exist_ok=True)
+    path = os.path.join(profile_dir, f'{_safe_name(name)}-{os.getpid()}-{count}.prof')
+    profiler.dump_stats(path)
+    return path
+
+
+def trace_path():
+    """Đường dẫn file trace của tiến trình (cố định cho tới khi gọi reset())"""
+    global _trace_path
+    if _trace_path is None:
+        _trace_path = os.path.join(
+            resolve().profile_dir, f"trace-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    return _trace_path
+
+
+def flush():
+    """Ghi nối các sự kiện trong bộ đệm vào file trace; trả về đường dẫn (None nếu chưa có)"""
+    with _lock:
+        path = trace_path()
+        if _events:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                # File mới: mở mảng JSON và ghi tên tiến trình; dấu ']' cuối có thể bỏ
+                if f.tell() == 0:
+                    metadata = {'name': 'process_name', 'ph': 'M', 'pid': os.getpid(),
+                                'args': {'name': os.path.basename(sys.argv[0]) or 'python'}}
+                    f.write('[\n' + json.dumps(metadata, ensure_ascii=False) + ',\n')
+                for event in _events:
+                    f.write(json.dumps(event, ensure_ascii=False) + ',\n')
+            _events.clear()
+        return path if os.path.exists(path) else None
+
+
+def reset():
+    """Bỏ các sự kiện chưa ghi; span tiếp theo ghi vào một file trace mới"""
+    global _trace_path
+    with _lock:
+        _events.clear()
+        _trace_path = None
+
+
+atexit.register(flush)
+
+
+def load_trace(path):
+    with open(path, encoding='utf-8') as f:
+        text = f.read().strip()
+    if text.startswith('['):
+        # Định dạng JSON Array: có thể thiếu ']' và còn dấu phẩy cuối
+        events = json.loads(text.rstrip(']').rstrip().rstrip(',') + ']')
+    else:
+        events = json.loads(text)['traceEvents']
+    return [e for e in events if e.get('ph') == 'X']
+
+
+def summarize_trace(events, top=15):
+    """Tổng thời gian, thời gian riêng (trừ span con) và số lần gọi theo tên span"""
+    import pandas as pd
+
+    # Một lượt qua các span đã sắp theo (tiến trình, luồng, bắt đầu); ngăn xếp giữ
+    # các span đang mở, span con được trừ vào thời gian riêng của span cha trực tiếp
+    events = sorted(events, key=lambda e: (e['pid'], e['tid'], e['ts'], -e['dur']))
+    children = [0.0] * len(events)
+    stack = []
+    for i, event in enumerate(events):
+        thread, end_ts = (event['pid'], event['tid']), event['ts'] + event['dur']
+        while stack and (stack[-1][0] != thread or stack[-1][2] < end_ts):
+            stack.pop()
+        if stack:
+            children[stack[-1][1]] += event['dur']
+        stack.append((thread, i, end_ts))
+
+    rows = [{'span': event['name'], 'total_ms': event['dur'] / 1000,
+             'self_ms': (event['dur'] - children[i]) / 1000,
+             'rss_delta_mb': event['args'].get('rss_delta_mb', 0)}
+            for i, event in enumerate(events)]
+
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    summary = df.groupby('span').agg(
+        calls=('total_ms', 'size'),
+        total_ms=('total_ms', 'sum'),
+        self_ms=('self_ms', 'sum'),
+        rss_delta_mb=('rss_delta_mb', 'sum'),
+    ).reset_index()
+    return summary.sort_values('self_ms', ascending=False).head(top)
+
+
+def print_profile(path, limit=10):
+    """In các hàm tốn thời gian nhất trong một file .prof"""
+    stats = pstats.Stats(path, stream=sys.stdout)
+    stats.sort_stats('cumulative').print_stats(limit)
+
+
+# Hàm chính cho module này
+def main_profiling(data_path='data_1.csv', output_dir=None, cprofile=True):
+    """Chạy pipeline với profiling bật, ghi trace và in tóm tắt"""
+    print("=" * 60)
+    print("PROFILING PIPELINE (CHROME TRACE)")
+    print("=" * 60)
+
+    output_dir = output_dir or os.path.join(resolve().profile_dir, 'run')
+
+    if not os.path.exists(data_path):
+        print(f"File {data_path} không tồn tại!")
+        return None
+
+    # Khi chạy `python profiling.py`, telemetry dùng module `profiling` (không phải __main__)
+    import profiling
+    profiling.enable(cprofile=cprofile)
+    profiling.reset()
+
+    from data_preprocess_1 import DataPreprocessor
+    from pivot_analysis import PivotAnalyzer
+    from visualize_daily1 import DailyVisualizer
+    from visualize_product1 import ProductVisualizer
+    from visualize_channel1 import ChannelVisualizer
+    from visualize_staff1 import StaffVisualizer
+
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        preprocessor = DataPreprocessor(data_path)
+        preprocessor.load_data()
+        preprocessor.clean_data()
+        preprocessor.save_cleaned_data(os.path.join(output_dir, 'cleaned_data.csv'))
+
+        analyzer = PivotAnalyzer(preprocessor.df)
+        analyzer.create_all_pivots()
+        analyzer.save_to_excel(os.path.join(output_dir, 'pivot_tables.xlsx'))
+
+        for visualizer_cls in (DailyVisualizer, ProductVisualizer, ChannelVisualizer, StaffVisualizer):
+            visualizer_cls(preprocessor.df, output_dir=os.path.join(output_dir, 'charts')).create_all_charts()
+
+    path = profiling.flush()
+    print(summarize_trace(load_trace(path)).to_string(index=False))
+    print(f"\nĐã lưu trace: {path}")
+    print("Mở bằng chrome://tracing hoặc https://ui.perfetto.dev")
+    if cprofile:
+        print(f"File cProfile theo bước: {resolve().profile_dir}/*.prof")
+    return path
+
+
+if __name__ == "__main__":
+    main_profiling()
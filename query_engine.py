@@ -0,0 +1,198 @@
+"""query_engine.py - Truy vấn nhanh doanh thu theo khoảng ngày, kênh và sản phẩm
+
+Dữ liệu được sắp theo ngày một lần. Engine giữ mảng ngày có bán hàng và mảng
+cộng dồn doanh thu / số lượng / số đơn cho toàn bộ dữ liệu, cho từng kênh, từng
+sản phẩm và từng cặp (kênh, sản phẩm). Mỗi truy vấn dùng bảng thô nhất đủ cho bộ
+lọc, nên tổng của một khoảng ngày chỉ cần vài lần tìm nhị phân và phép trừ,
+không phải quét lại DataFrame hay duyệt mọi nhóm khi người dùng đổi bộ lọc.
+"""
+import pandas as pd
+import numpy as np
+import os
+import time
+from run_config import resolve
+
+MEASURES = ['Revenue', 'Quantity', 'Orders']
+
+
+def _to_day(value):
+    """Ngày (date / chuỗi / Timestamp) -> số ngày kể từ epoch"""
+    return np.datetime64(pd.Timestamp(value).normalize(), 'D').astype(np.int64)
+
+
+def _cumulative_index(daily, level):
+    """{khóa: (mảng ngày, mảng cộng dồn)} từ bảng tổng theo (khóa..., ngày)"""
+    index = {}
+    for key, group in daily.groupby(level=level, sort=True):
+        index[key] = _cumulative(group)
+    return index
+
+
+def _cumulative(daily):
+    # Mảng cộng dồn có phần tử 0 ở đầu: tổng [i, j) = cum[j] - cum[i]
+    cumulative = np.zeros((len(daily) + 1, len(MEASURES)))
+    np.cumsum(daily[MEASURES].to_numpy(float), axis=0, out=cumulative[1:])
+    return daily.index.get_level_values(-1).to_numpy(), cumulative
+
+
+class QueryEngine:
+    def __init__(self, df):
+        # Sắp theo ngày một lần; các lát cắt theo khoảng ngày là slice liên tục.
+        # Dữ liệu đã sắp sẵn (SharedDataset) được dùng chung, không sao chép
+        if (pd.api.types.is_datetime64_any_dtype(df['Date']) and df['Date'].is_monotonic_increasing
+                and isinstance(df.index, pd.RangeIndex) and df.index.start == 0):
+            self.df = df
+        else:
+            self.df = df.assign(Date=pd.to_datetime(df['Date'])).sort_values('Date', kind='stable')
+            self.df = self.df.reset_index(drop=True)
+        self.days = self.df['Date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+
+        self.channels = sorted(self.df['Order_Channel'].unique())
+        self.products = sorted(self.df['Product_Name'].unique())
+
+        daily = self.df.groupby(['Order_Channel', 'Product_Name', self.days], sort=True).agg(
+            Revenue=('Revenue', 'sum'),
+            Quantity=('Quantity', 'sum'),
+            Orders=('Revenue', 'size'),
+        )
+        # Bảng theo cặp (kênh, sản phẩm), theo kênh, theo sản phẩm và toàn bộ
+        self.groups = _cumulative_index(daily, [0, 1])
+        self.channel_groups = _cumulative_index(daily.groupby(level=[0, 2]).sum(), 0)
+        self.product_groups = _cumulative_index(daily.groupby(level=[1, 2]).sum(), 0)
+        self.overall = _cumulative(daily.groupby(level=2).sum())
+
+    @property
+    def date_range(self):
+        if not len(self.days):
+            return None, None
+        return (pd.Timestamp(np.datetime64(int(self.days[0]), 'D')),
+                pd.Timestamp(np.datetime64(int(self.days[-1]), 'D')))
+
+    def _selected_groups(self, channels=None, products=None, by=None):
+        """Các bảng cộng dồn cần cộng cho bộ lọc, dùng bảng thô nhất có thể
+
+        Trả về các cặp (giá trị của chiều `by`, (mảng ngày, mảng cộng dồn));
+        khi by=None khóa luôn là None.
+        """
+        need_channel = bool(channels) or by == 'Order_Channel'
+        need_product = bool(products) or by == 'Product_Name'
+        # dict.fromkeys: bỏ giá trị lặp trong bộ lọc, giữ thứ tự
+        channels = dict.fromkeys(channels) if channels else self.channels
+        products = dict.fromkeys(products) if products else self.products
+
+        if need_channel and need_product:
+            for channel in channels:
+                for product in products:
+                    arrays = self.groups.get((channel, product))
+                    if arrays is not None:
+                        yield (channel if by == 'Order_Channel' else
+                               product if by == 'Product_Name' else None), arrays
+        elif need_channel:
+            for channel in channels:
+                if channel in self.channel_groups:
+                    yield (channel if by else None), self.channel_groups[channel]
+        elif need_product:
+            for product in products:
+                if product in self.product_groups:
+                    yield (product if by else None), self.product_groups[product]
+        else:
+            yield None, self.overall
+
+    def _bounds(self, days, date_from, date_to):
+        lo = 0 if date_from is None else np.searchsorted(days, _to_day(date_from), side='left')
+        hi = len(days) if date_to is None else np.searchsorted(days, _to_day(date_to), side='right')
+        return lo, hi
+
+    def row_bounds(self, date_from=None, date_to=None):
+        """Vị trí [đầu, cuối) trong dữ liệu đã sắp của các dòng thuộc khoảng ngày"""
+        return self._bounds(self.days, date_from, date_to)
+
+    def totals(self, date_from=None, date_to=None, channels=None, products=None):
+        """Tổng doanh thu, số lượng, số đơn trong khoảng ngày (gồm 2 đầu mút)"""
+        result = np.zeros(len(MEASURES))
+        for _, (days, cumulative) in self._selected_groups(channels, products):
+            lo, hi = self._bounds(days, date_from, date_to)
+            result += cumulative[hi] - cumulative[lo]
+        return dict(zip(MEASURES, result.tolist()))
+
+    def breakdown(self, by='Product_Name', date_from=None, date_to=None, channels=None, products=None):
+        """Tổng theo từng kênh hoặc từng sản phẩm trong khoảng ngày"""
+        by = 'Order_Channel' if by == 'Order_Channel' else 'Product_Name'
+        rows = {}
+        for key, (days, cumulative) in self._selected_groups(channels, products, by):
+            lo, hi = self._bounds(days, date_from, date_to)
+            rows[key] = rows.get(key, 0) + (cumulative[hi] - cumulative[lo])
+
+        table = pd.DataFrame.from_dict(rows, orient='index', columns=MEASURES)
+        table.index.name = by
+        return table.sort_values('Revenue', ascending=False).reset_index()
+
+    def daily_series(self, date_from=None, date_to=None, channels=None, products=None):
+        """Doanh thu theo ngày trong khoảng (ngày không bán = 0)"""
+        start, end = self.date_range
+        start = pd.Timestamp(date_from) if date_from is not None else start
+        end = pd.Timestamp(date_to) if date_to is not None else end
+        if start is None or end < start:
+            return pd.Series(dtype=float, name='Revenue')
+
+        first = _to_day(start)
+        values = np.zeros(_to_day(end) - first + 1)
+        for _, (days, cumulative) in self._selected_groups(channels, products):
+            lo, hi = self._bounds(days, start, end)
+            # Hiệu liên tiếp của mảng cộng dồn là doanh thu từng ngày có bán
+            np.add.at(values, days[lo:hi] - first, np.diff(cumulative[lo:hi + 1, 0]))
+
+        index = pd.date_range(start.normalize(), end.normalize(), freq='D', name='Date')
+        return pd.Series(values, index=index, name='Revenue')
+
+    def rows(self, date_from=None, date_to=None, channels=None, products=None):
+        """Các giao dịch trong khoảng ngày (slice liên tục rồi mới lọc kênh/sản phẩm)"""
+        lo, hi = self.row_bounds(date_from, date_to)
+        sliced = self.df.iloc[lo:hi]
+        if channels:
+            sliced = sliced[sliced['Order_Channel'].isin(channels)]
+        if products:
+            sliced = sliced[sliced['Product_Name'].isin(products)]
+        return sliced
+
+
+# Hàm chính cho module này
+def main_query_engine(df_path=None, repeat=200, config=None):
+    """So sánh thời gian truy vấn của engine với lọc trực tiếp trên DataFrame"""
+    print("=" * 60)
+    print("QUERY ENGINE - SO SÁNH TỐC ĐỘ")
+    print("=" * 60)
+
+    df_path = df_path or resolve(config).cleaned_path
+    if not os.path.exists(df_path):
+        print(f"File {df_path} không tồn tại!")
+        return None
+
+    df = pd.read_csv(df_path, parse_dates=['Date'])
+    started = time.perf_counter()
+    engine = QueryEngine(df)
+    print(f"Dựng engine cho {len(df):,} bản ghi: {time.perf_counter() - started:.3f}s")
+
+    start, end = engine.date_range
+    date_from, date_to = start + (end - start) / 4, end - (end - start) / 4
+    channels, products = engine.channels[:1], engine.products[:3]
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = engine.totals(date_from, date_to, channels, products)
+    engine_ms = (time.perf_counter() - started) / repeat * 1000
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        mask = (df['Date'].between(date_from.normalize(), date_to)
+                & df['Order_Channel'].isin(channels) & df['Product_Name'].isin(products))
+        expected = df.loc[mask, 'Revenue'].sum()
+    pandas_ms = (time.perf_counter() - started) / repeat * 1000
+
+    print(f"Doanh thu: engine {result['Revenue']:,.0f} / pandas {expected:,.0f}")
+    print(f"Thời gian mỗi truy vấn: engine {engine_ms:.3f} ms, pandas {pandas_ms:.3f} ms")
+    return engine
+
+
+if __name__ == "__main__":
+    main_query_engine()
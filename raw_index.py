@@ -0,0 +1,125 @@
+"""raw_index.py - Chỉ mục vị trí byte của từng dòng trong file CSV gốc
+
+Chỉ mục (mảng int64 các offset đầu dòng) được lưu ra file .npy cạnh metadata
+và mở lại bằng memory-map, nên bộ nhớ không phụ thuộc kích thước file. Đọc một
+trang chỉ cần seek tới offset đầu trang và đọc đúng số byte của trang đó.
+"""
+import io
+import os
+import json
+import numpy as np
+import pandas as pd
+from run_config import resolve
+
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def _scan_row_offsets(path, chunk_size=CHUNK_SIZE):
+    """Quét file theo khối, trả về offset đầu mỗi dòng (gồm dòng tiêu đề)"""
+    offsets = [np.zeros(1, dtype=np.int64)]
+    position = 0
+
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == ord('\n'))
+            offsets.append(newlines.astype(np.int64) + position + 1)
+            position += len(chunk)
+
+    offsets = np.concatenate(offsets)
+    # Dòng "rỗng" sau ký tự xuống dòng cuối file không phải là một bản ghi
+    if len(offsets) and offsets[-1] >= position:
+        offsets = offsets[:-1]
+    return offsets, position
+
+
+class RawDataIndex:
+    def __init__(self, data_path, index_dir=None, sep=';', encoding='utf-8-sig'):
+        self.data_path = data_path
+        self.index_dir = index_dir = index_dir or resolve().index_dir
+        self.sep = sep
+        self.encoding = encoding
+
+        name = os.path.splitext(os.path.basename(data_path))[0]
+        self.offsets_path = os.path.join(index_dir, f'{name}.offsets.npy')
+        self.meta_path = os.path.join(index_dir, f'{name}.offsets.json')
+
+        self.columns = []
+        self._offsets = None
+        self._file_size = 0
+
+    def _signature(self):
+        stat = os.stat(self.data_path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def _load_meta(self):
+        if not (os.path.exists(self.meta_path) and os.path.exists(self.offsets_path)):
+            return None
+        with open(self.meta_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def build(self):
+        """Quét file gốc và lưu chỉ mục offset ra đĩa"""
+        signature = self._signature()
+        offsets, file_size = _scan_row_offsets(self.data_path)
+
+        with open(self.data_path, 'rb') as f:
+            header_end = offsets[1] if len(offsets) > 1 else file_size
+            header = f.read(int(header_end)).decode(self.encoding).rstrip('\r\n')
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        # Offset đầu các bản ghi (bỏ dòng tiêu đề) + offset kết thúc file;
+        # file rỗng không có cả dòng tiêu đề nên số bản ghi phải chặn ở 0
+        np.save(self.offsets_path, np.append(offsets[1:], file_size).astype(np.int64))
+        meta = dict(signature, source=self.data_path, rows=max(0, int(len(offsets) - 1)),
+                    columns=[col.strip() for col in header.split(self.sep)] if header else [])
+        with open(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        return meta
+
+    def open(self):
+        """Mở chỉ mục (dựng lại nếu file gốc đã thay đổi)"""
+        meta = self._load_meta()
+        signature = self._signature()
+        if meta is None or any(meta.get(k) != v for k, v in signature.items()):
+            meta = self.build()
+
+        self.columns = meta['columns']
+        self._file_size = meta['size']
+        self._offsets = np.load(self.offsets_path, mmap_mode='r')
+        return self
+
+    @property
+    def row_count(self):
+        return 0 if self._offsets is None else max(0, len(self._offsets) - 1)
+
+    def page_count(self, page_size):
+        return max(1, -(-self.row_count // page_size))
+
+    def read_rows(self, start, stop):
+        """Đọc các bản ghi [start, stop) bằng một lần seek"""
+        if self._offsets is None:
+            self.open()
+
+        start = max(0, min(start, self.row_count))
+        stop = max(start, min(stop, self.row_count))
+        if start == stop:
+            return pd.DataFrame(columns=self.columns)
+
+        begin, end = int(self._offsets[start]), int(self._offsets[stop])
+        with open(self.data_path, 'rb') as f:
+            f.seek(begin)
+            data = f.read(end - begin)
+
+        page = pd.read_csv(io.BytesIO(data), sep=self.sep, header=None,
+                           names=self.columns, encoding=self.encoding)
+        page.index = pd.RangeIndex(start + 1, start + 1 + len(page), name='Dòng')
+        return page
+
+    def read_page(self, page, page_size=100):
+        """Đọc trang thứ `page` (bắt đầu từ 1)"""
+        start = (page - 1) * page_size
+        return self.read_rows(start, start + page_size)
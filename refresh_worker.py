@@ -0,0 +1,145 @@
+"""refresh_worker.py - Tiến trình nền tự làm mới dữ liệu cho dashboard
+
+Theo dõi file dữ liệu gốc (data_1.csv), thư mục thả file (RunConfig.drop_dir,
+mặc định data/incoming) và nhật ký sửa giao dịch của trang CRUD
+(sales_edits.jsonl). Khi có thay đổi, worker chờ cho file ổn định (debounce)
+rồi chạy pipeline (pipeline.py): chỉ những bước có dữ liệu đầu vào thực sự
+thay đổi mới chạy lại (gồm cả kho SQLite sales.db), các bước độc lập chạy song
+song. Kết quả được ghi ra file tạm rồi đổi tên
+(os.replace), nên dashboard luôn đọc được bản hoàn chỉnh và tự nhận bản mới nhờ
+cache theo chữ ký file, không phải chờ tính toán trong request.
+
+Chạy: python refresh_worker.py          (theo dõi liên tục)
+      python refresh_worker.py --once   (làm mới một lần rồi thoát)
+"""
+import os
+import sys
+import glob
+import time
+
+from pipeline import Pipeline, tmp_path, publish, last_run
+from run_config import RunConfig, resolve
+
+
+class RefreshWorker:
+    def __init__(self, config=None, drop_dir=None, debounce=5.0, poll_interval=2.0,
+                 pipeline=None):
+        self.config = resolve(config)
+        self.raw_path = self.config.input_path
+        self.drop_dir = drop_dir or self.config.drop_dir
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.pipeline = pipeline or Pipeline(self.config)
+
+    def dropped_files(self):
+        return sorted(glob.glob(os.path.join(self.drop_dir, '*.csv')))
+
+    def watch_signature(self):
+        """Chữ ký rẻ (mtime, kích thước) của file gốc, thư mục thả file và nhật ký sửa"""
+        paths = [self.raw_path, self.config.sales_edits_path] + self.dropped_files()
+        return tuple((path, os.stat(path).st_mtime_ns, os.stat(path).st_size)
+                     for path in paths if os.path.exists(path))
+
+    def ingest_drops(self):
+        """Nối các file CSV trong thư mục thả vào file gốc, rồi chuyển sang processed/"""
+        dropped = self.dropped_files()
+        if not dropped:
+            return 0
+
+        with open(self.raw_path, 'rb') as f:
+            raw = f.read()
+        header = raw.split(b'\n', 1)[0].lstrip(b'\xef\xbb\xbf').strip()
+        if not raw.endswith(b'\n'):
+            raw += b'\n'
+
+        appended, accepted = [], []
+        for path in dropped:
+            with open(path, 'rb') as f:
+                content = f.read().lstrip(b'\xef\xbb\xbf')
+            first_line, _, body = content.partition(b'\n')
+            # Chỉ nhận file cùng cấu trúc cột với file gốc
+            if first_line.strip() != header:
+                print(f"Bỏ qua {path}: tiêu đề cột khác file gốc")
+                continue
+            if body and not body.endswith(b'\n'):
+                body += b'\n'
+            appended.append(body)
+            accepted.append(path)
+
+        if not accepted:
+            return 0
+
+        staged = tmp_path(self.raw_path)
+        with open(staged, 'wb') as f:
+            f.write(raw + b''.join(appended))
+        publish(staged, self.raw_path)
+
+        processed_dir = os.path.join(self.drop_dir, 'processed')
+        os.makedirs(processed_dir, exist_ok=True)
+        for path in accepted:
+            os.replace(path, os.path.join(processed_dir, os.path.basename(path)))
+        print(f"Đã nhập {len(accepted)} file từ {self.drop_dir} vào {self.raw_path}")
+        return len(accepted)
+
+    def run_once(self, force=False):
+        """Nhập file mới rồi chạy các bước có đầu vào thay đổi; trả về danh sách bước đã chạy"""
+        self.ingest_drops()
+        return self.pipeline.run(force=force)
+
+    def wait_until_stable(self, signature):
+        """Debounce: chờ đến khi chữ ký không đổi trong `debounce` giây"""
+        stable_since = time.monotonic()
+        while time.monotonic() - stable_since < self.debounce:
+            time.sleep(min(self.poll_interval, self.debounce))
+            current = self.watch_signature()
+            if current != signature:
+                signature, stable_since = current, time.monotonic()
+        return signature
+
+    def watch(self):
+        """Theo dõi liên tục cho đến khi bị dừng (Ctrl+C)"""
+        print(f"Đang theo dõi {self.raw_path} và {self.drop_dir}/ (Ctrl+C để dừng)")
+        os.makedirs(self.drop_dir, exist_ok=True)
+        self.run_once()
+        signature = self.watch_signature()
+
+        try:
+            while True:
+                time.sleep(self.poll_interval)
+                current = self.watch_signature()
+                if current == signature:
+                    continue
+                print("Phát hiện thay đổi, chờ file ổn định...")
+                self.wait_until_stable(current)
+                self.run_once()
+                signature = self.watch_signature()
+        except KeyboardInterrupt:
+            print("Đã dừng theo dõi")
+
+
+def last_refresh(state_path=None):
+    """Thời điểm và các bước của lần làm mới gần nhất (cho dashboard)"""
+    return last_run(state_path)
+
+
+# Hàm chính cho module này
+def main_refresh_worker(once=False, config=None):
+    """Hàm chính cho worker làm mới dữ liệu"""
+    print("=" * 60)
+    print("WORKER LÀM MỚI DỮ LIỆU")
+    print("=" * 60)
+
+    config = resolve(config)
+    if not os.path.exists(config.input_path):
+        print(f"File {config.input_path} không tồn tại!")
+        return None
+
+    worker = RefreshWorker(config)
+    if once:
+        return worker.run_once()
+    worker.watch()
+    return True
+
+
+if __name__ == "__main__":
+    main_refresh_worker(once='--once' in sys.argv, config=RunConfig.from_args())
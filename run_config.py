@@ -0,0 +1,231 @@
+"""run_config.py - Cấu hình một lần chạy pipeline (nguồn dữ liệu, thư mục kết quả...)
+
+Mọi đường dẫn kết quả được suy ra từ `output_root`, nên hai lần chạy với hai
+thư mục gốc khác nhau (hai cửa hàng, hai khoảng ngày) có thể chạy song song
+trên cùng máy mà không ghi đè lên nhau. Các module nhận tham số `config`; khi
+không truyền, cấu hình lấy từ biến môi trường (mặc định giống đường dẫn cũ):
+
+    HLC_INPUT            file dữ liệu gốc               (data_1.csv)
+    HLC_OUTPUT_ROOT      thư mục gốc cho mọi kết quả    (output)
+    HLC_DROP_DIR         thư mục thả file CSV mới       (data/incoming)
+    HLC_RENDER_PROFILE   print / screen / draft         (print)
+    HLC_WORKERS          số tiến trình tối đa           (số CPU)
+
+Trong một bước pipeline, `active(config)` đặt cấu hình cho luồng hiện tại, nên
+các module không nhận `config` (telemetry, profiling...) cũng ghi vào đúng
+`output_root` của lần chạy đó.
+"""
+import os
+import sys
+import copy
+import argparse
+import threading
+import contextlib
+
+# dpi và loại renderer cho từng mục đích xuất ảnh
+RENDER_PROFILES = {
+    'print': {'dpi': 300, 'batch': False},
+    'screen': {'dpi': 120, 'batch': False},
+    'draft': {'dpi': 72, 'batch': True},
+}
+
+DEFAULT_INPUT = 'data_1.csv'
+DEFAULT_OUTPUT_ROOT = 'output'
+DEFAULT_DROP_DIR = 'data/incoming'
+DEFAULT_PROFILE = 'print'
+
+# Cấu hình của lần chạy mà luồng hiện tại đang thực hiện (xem active())
+_active = threading.local()
+
+
+class RunConfig:
+    def __init__(self, input_path=DEFAULT_INPUT, output_root=DEFAULT_OUTPUT_ROOT,
+                 render_profile=DEFAULT_PROFILE, workers=None, stage_workers=None,
+                 chart_workers=None, forecast_workers=None, drop_dir=DEFAULT_DROP_DIR):
+        if render_profile not in RENDER_PROFILES:
+            raise ValueError(f"Render profile không hợp lệ: {render_profile} "
+                             f"(chọn trong {list(RENDER_PROFILES)})")
+        self.input_path = input_path
+        self.output_root = output_root
+        self.render_profile = render_profile
+        self.workers = workers or os.cpu_count() or 1
+        self.stage_workers = stage_workers or self.workers
+        self.chart_workers = chart_workers or self.workers
+        self.forecast_workers = forecast_workers or self.workers
+        # File CSV thả vào đây được refresh_worker nối vào input_path
+        self.drop_dir = drop_dir
+
+    def __repr__(self):
+        return (f"RunConfig(input_path={self.input_path!r}, output_root={self.output_root!r}, "
+                f"render_profile={self.render_profile!r}, workers={self.workers})")
+
+    def path(self, *parts):
+        return os.path.join(self.output_root, *parts)
+
+    # --- Đường dẫn kết quả ---
+    @property
+    def cleaned_path(self):
+        return self.path('cleaned_data.csv')
+
+    @property
+    def cleaned_arrow_path(self):
+        return self.path('cleaned_data.arrow')
+
+    @property
+    def cleaned_dir(self):
+        return self.path('cleaned')
+
+    @property
+    def pivot_path(self):
+        return self.path('pivot_tables.xlsx')
+
+    @property
+    def pivot_csv_dir(self):
+        return self.path('pivot_csv')
+
+    @property
+    def chart_dir(self):
+        return self.path('charts')
+
+    @property
+    def segments_dir(self):
+        return self.path('segments')
+
+    @property
+    def forecast_path(self):
+        return self.path('forecasts', 'hierarchical_forecast.csv')
+
+    @property
+    def leaderboard_path(self):
+        return self.path('forecasts', 'backtest_leaderboard.csv')
+
+    @property
+    def folds_path(self):
+        return self.path('forecasts', 'backtest_folds.csv')
+
+    @property
+    def test_data_path(self):
+        return self.path('data', 'highlands_test.csv')
+
+    @property
+    def state_path(self):
+        return self.path('pipeline_state.json')
+
+    @property
+    def sales_db_path(self):
+        return self.path('sales.db')
+
+    @property
+    def sales_edits_path(self):
+        return self.path('sales_edits.jsonl')
+
+    @property
+    def metrics_path(self):
+        return self.path('metrics', 'metrics.jsonl')
+
+    @property
+    def profile_dir(self):
+        return self.path('profiles')
+
+    @property
+    def index_dir(self):
+        return self.path('index')
+
+    @property
+    def asset_dir(self):
+        return self.path('assets')
+
+    @property
+    def benchmark_dir(self):
+        return self.path('benchmarks')
+
+    # --- Biểu đồ ---
+    @property
+    def dpi(self):
+        return RENDER_PROFILES[self.render_profile]['dpi']
+
+    def make_renderer(self):
+        """Renderer theo render profile (import matplotlib chỉ khi cần vẽ)"""
+        from chart_renderer import ChartRenderer, BatchRenderer
+
+        if RENDER_PROFILES[self.render_profile]['batch']:
+            return BatchRenderer(dpi=self.dpi)
+        return ChartRenderer(dpi=self.dpi)
+
+    def replace(self, **changes):
+        """Bản sao với một số thuộc tính thay đổi"""
+        config = copy.copy(self)
+        for key, value in changes.items():
+            if not hasattr(config, key):
+                raise AttributeError(f"RunConfig không có thuộc tính {key}")
+            setattr(config, key, value)
+        if 'workers' in changes:
+            for key in ('stage_workers', 'chart_workers', 'forecast_workers'):
+                if key not in changes:
+                    setattr(config, key, changes['workers'])
+        return config
+
+    @classmethod
+    def from_env(cls, environ=None):
+        environ = os.environ if environ is None else environ
+        workers = environ.get('HLC_WORKERS')
+        return cls(
+            input_path=environ.get('HLC_INPUT', DEFAULT_INPUT),
+            output_root=environ.get('HLC_OUTPUT_ROOT', DEFAULT_OUTPUT_ROOT),
+            render_profile=environ.get('HLC_RENDER_PROFILE', DEFAULT_PROFILE),
+            workers=int(workers) if workers else None,
+            drop_dir=environ.get('HLC_DROP_DIR', DEFAULT_DROP_DIR),
+        )
+
+    @classmethod
+    def from_args(cls, argv=None):
+        """Đọc --input, --output-root, --profile, --workers, --drop-dir (mặc định theo biến môi trường)"""
+        base = cls.from_env()
+        parser = argparse.ArgumentParser(add_help=False)
+        parser.add_argument('--input', default=base.input_path)
+        parser.add_argument('--output-root', default=base.output_root)
+        parser.add_argument('--profile', default=base.render_profile, choices=list(RENDER_PROFILES))
+        parser.add_argument('--workers', type=int, default=base.workers)
+        parser.add_argument('--drop-dir', default=base.drop_dir)
+        args, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+        return cls(args.input, args.output_root, args.profile, args.workers, drop_dir=args.drop_dir)
+
+
+@contextlib.contextmanager
+def active(config):
+    """Dùng `config` làm cấu hình mặc định của luồng hiện tại trong khối `with`"""
+    previous = getattr(_active, 'config', None)
+    _active.config = config
+    try:
+        yield config
+    finally:
+        _active.config = previous
+
+
+def resolve(config=None):
+    """Cấu hình được truyền vào, cấu hình đang active của luồng, hoặc từ biến môi trường"""
+    if config is not None:
+        return config
+    current = getattr(_active, 'config', None)
+    return current if current is not None else RunConfig.from_env()
+
+
+# Hàm chính cho module này
+def main_run_config():
+    """In cấu hình và các đường dẫn sẽ dùng cho lần chạy hiện tại"""
+    print("=" * 60)
+    print("CẤU HÌNH LẦN CHẠY")
+    print("=" * 60)
+
+    config = RunConfig.from_args()
+    print(config)
+    for name in ('cleaned_path', 'cleaned_arrow_path', 'cleaned_dir', 'pivot_path', 'pivot_csv_dir',
+                 'chart_dir', 'forecast_path', 'leaderboard_path', 'state_path', 'metrics_path',
+                 'profile_dir', 'index_dir', 'asset_dir', 'benchmark_dir'):
+        print(f"  {name:<18} {getattr(config, name)}")
+    print(f"  {'dpi':<18} {config.dpi}")
+    return config
+
+
+if __name__ == "__main__":
+    main_run_config()
@@ -0,0 +1,339 @@
+"""sales_store.py - Kho dữ liệu bán hàng SQLite cho thêm/sửa/xóa giao dịch
+
+Bảng `sales` được tạo từ dữ liệu đã làm sạch, có index trên Sale_id, Date,
+Staff_id và Product_Name. Các bảng tổng hợp (theo tháng, nhân viên, sản phẩm
+theo kênh) được lưu sẵn; mỗi lần sửa dữ liệu chỉ tính lại các dòng tổng hợp
+có khóa bị ảnh hưởng thay vì chạy lại toàn bộ pipeline.
+
+Kho ghi nhớ chữ ký (mtime, kích thước) của file đã làm sạch và tự tạo lại khi
+file đó thay đổi. Mỗi lần thêm/sửa/xóa cũng được ghi vào nhật ký
+<output_root>/sales_edits.jsonl; bước làm sạch áp dụng lại nhật ký này
+(apply_edits), nên pivot, biểu đồ, dự báo và các trang phân tích nhận thay đổi
+ở lần làm mới dữ liệu kế tiếp.
+"""
+import os
+import json
+import sqlite3
+import pandas as pd
+from contextlib import contextmanager
+from run_config import resolve
+
+SALES_COLUMNS = ['Sale_id', 'Date', 'Product_Name', 'Size', 'Quantity',
+                 'Original_Price_Online', 'Original_Price_Offline', 'Discount_Online',
+                 'Applied_Price', 'Order_Channel', 'Actual_Selling_Price', 'Revenue',
+                 'Staff_id', 'Year', 'Month', 'Quarter', 'Day', 'Year_Month', 'Year_Quarter']
+
+REQUIRED_FIELDS = ['Sale_id', 'Date', 'Product_Name', 'Size', 'Quantity',
+                   'Order_Channel', 'Actual_Selling_Price', 'Staff_id']
+
+NUMERIC_FIELDS = ['Quantity', 'Original_Price_Online', 'Original_Price_Offline',
+                  'Discount_Online', 'Applied_Price', 'Actual_Selling_Price', 'Revenue']
+
+INTEGER_FIELDS = ['Year', 'Month', 'Quarter', 'Day']
+
+# Bảng tổng hợp: tên bảng -> (cột khóa, biểu thức tổng hợp)
+AGGREGATES = {
+    'agg_monthly': (['Year_Month'],
+                    'SUM(Revenue) AS Revenue, SUM(Quantity) AS Quantity'),
+    'agg_staff': (['Staff_id'],
+                  'SUM(Revenue) AS Revenue, SUM(Quantity) AS Quantity, COUNT(*) AS Order_Count'),
+    'agg_product_channel': (['Product_Name', 'Order_Channel'],
+                            'SUM(Revenue) AS Revenue, SUM(Quantity) AS Quantity'),
+}
+
+
+def file_signature(path):
+    """Chữ ký (mtime, kích thước) của file nguồn để biết kho đã cũ hay chưa"""
+    stat = os.stat(path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def load_edits(edits_path):
+    """Trạng thái cuối của mỗi giao dịch đã sửa: Sale_id -> bản ghi (None nếu đã xóa)"""
+    edits = {}
+    if not os.path.exists(edits_path):
+        return edits
+    with open(edits_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                edit = json.loads(line)
+            except ValueError:
+                continue
+            edits[edit['Sale_id']] = edit.get('row') if edit['op'] != 'delete' else None
+    return edits
+
+
+def apply_edits(df, edits_path):
+    """Áp dụng nhật ký thêm/sửa/xóa lên DataFrame đã làm sạch"""
+    edits = load_edits(edits_path)
+    if not edits or 'Sale_id' not in df.columns:
+        return df
+
+    kept = df[~df['Sale_id'].astype(str).isin(edits)]
+    rows = [row for row in edits.values() if row is not None]
+    if not rows:
+        return kept.reset_index(drop=True)
+
+    edited = pd.DataFrame(rows, columns=SALES_COLUMNS)
+    edited['Date'] = pd.to_datetime(edited['Date'])
+    edited = edited[[col for col in df.columns if col in edited.columns]]
+    # Giữ kiểu cột của dữ liệu gốc (Quantity nguyên...) khi giá trị sửa cho phép
+    for col in edited.columns:
+        if edited[col].dtype != df[col].dtype and edited[col].notna().all():
+            try:
+                edited[col] = edited[col].astype(df[col].dtype)
+            except (TypeError, ValueError):
+                pass
+    print(f"Đã áp dụng {len(edits)} giao dịch thêm/sửa/xóa từ {edits_path}")
+    return pd.concat([kept, edited], ignore_index=True)
+
+
+def prepare_record(record):
+    """Chuẩn hóa một giao dịch và tính các cột suy ra (thời gian, doanh thu)"""
+    missing = [field for field in REQUIRED_FIELDS if record.get(field) in (None, '')]
+    if missing:
+        raise ValueError(f"Thiếu thông tin: {', '.join(missing)}")
+
+    row = {col: record.get(col) for col in SALES_COLUMNS}
+
+    # Ngày nhập tay theo dạng dd/mm/YYYY như file gốc, hoặc ISO / date
+    if isinstance(record['Date'], str) and '/' in record['Date']:
+        date = pd.to_datetime(record['Date'], format='%d/%m/%Y', errors='coerce')
+    else:
+        date = pd.to_datetime(record['Date'], errors='coerce')
+    if pd.isna(date):
+        raise ValueError(f"Ngày không hợp lệ: {record['Date']}")
+
+    for col in NUMERIC_FIELDS:
+        if row[col] not in (None, ''):
+            row[col] = float(row[col])
+            if row[col] < 0:
+                raise ValueError(f"{col} không được âm")
+        else:
+            row[col] = None
+
+    row['Sale_id'] = str(row['Sale_id']).strip()
+    row['Product_Name'] = str(row['Product_Name']).strip()
+    row['Size'] = str(row['Size']).strip().upper()
+    row['Order_Channel'] = str(row['Order_Channel']).strip().title()
+    row['Staff_id'] = str(row['Staff_id']).strip()
+
+    if row['Revenue'] is None:
+        row['Revenue'] = row['Quantity'] * row['Actual_Selling_Price']
+
+    row['Date'] = date.strftime('%Y-%m-%d')
+    row['Year'] = date.year
+    row['Month'] = date.month
+    row['Quarter'] = date.quarter
+    row['Day'] = date.day
+    row['Year_Month'] = date.strftime('%Y-%m')
+    row['Year_Quarter'] = f'{date.year}-Q{date.quarter}'
+    return row
+
+
+class SalesStore:
+    def __init__(self, db_path=None, config=None, edits_path=None):
+        self.config = resolve(config)
+        self.db_path = db_path or self.config.sales_db_path
+        self.edits_path = edits_path or self.config.sales_edits_path
+
+    @contextmanager
+    def _connect(self):
+        # Mỗi thao tác một kết nối: an toàn khi nhiều phiên Streamlit dùng chung
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def exists(self):
+        if not os.path.exists(self.db_path):
+            return False
+        with self._connect() as conn:
+            found = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name='sales'").fetchone()
+        return found is not None
+
+    def source_signature(self):
+        """Chữ ký file đã làm sạch mà kho được tạo từ đó (None nếu chưa ghi)"""
+        if not self.exists():
+            return None
+        with self._connect() as conn:
+            try:
+                row = conn.execute("SELECT value FROM store_meta WHERE key = 'source'").fetchone()
+            except sqlite3.OperationalError:
+                # Kho tạo từ phiên bản cũ, chưa có bảng store_meta
+                return None
+        return json.loads(row[0]) if row else None
+
+    def create_from_cleaned(self, df, source_signature=None):
+        """Tạo (lại) kho dữ liệu từ DataFrame đã làm sạch"""
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        data = df[[col for col in SALES_COLUMNS if col in df.columns]].copy()
+        data['Date'] = pd.to_datetime(data['Date']).dt.strftime('%Y-%m-%d')
+
+        with self._connect() as conn:
+            conn.execute("DROP TABLE IF EXISTS sales")
+            column_defs = ['Sale_id TEXT PRIMARY KEY']
+            for col in SALES_COLUMNS[1:]:
+                col_type = 'REAL' if col in NUMERIC_FIELDS else 'INTEGER' if col in INTEGER_FIELDS else 'TEXT'
+                column_defs.append(f'{col} {col_type}')
+            conn.execute(f"CREATE TABLE sales ({', '.join(column_defs)})")
+            data.to_sql('sales', conn, if_exists='append', index=False)
+
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(Date)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_staff ON sales(Staff_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_product ON sales(Product_Name)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_year_month ON sales(Year_Month)")
+
+            for table, (keys, measures) in AGGREGATES.items():
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"""
+                    CREATE TABLE {table} AS
+                    SELECT {', '.join(keys)}, {measures}
+                    FROM sales GROUP BY {', '.join(keys)}""")
+                conn.execute(f"CREATE UNIQUE INDEX idx_{table} ON {table}({', '.join(keys)})")
+
+            conn.execute("DROP TABLE IF EXISTS store_meta")
+            conn.execute("CREATE TABLE store_meta (key TEXT PRIMARY KEY, value TEXT)")
+            if source_signature is not None:
+                conn.execute("INSERT INTO store_meta VALUES ('source', ?)",
+                             [json.dumps(source_signature)])
+
+        print(f"Đã tạo kho SQLite với {len(data)} giao dịch: {self.db_path}")
+        return len(data)
+
+    def ensure(self, cleaned_path=None):
+        """Tạo (lại) kho khi chưa có hoặc file đã làm sạch đã thay đổi"""
+        cleaned_path = cleaned_path or self.config.cleaned_path
+        signature = file_signature(cleaned_path)
+        if self.source_signature() != signature:
+            self.create_from_cleaned(pd.read_csv(cleaned_path), signature)
+        return self
+
+    def _journal(self, op, row):
+        """Ghi thao tác vào nhật ký để bước làm sạch áp dụng lại lên dữ liệu"""
+        os.makedirs(os.path.dirname(self.edits_path) or '.', exist_ok=True)
+        with open(self.edits_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'op': op, 'Sale_id': row['Sale_id'], 'row': row},
+                               ensure_ascii=False, default=str) + '\n')
+
+    # --- Tra cứu (dùng index) ---
+    def get(self, sale_id):
+        with self._connect() as conn:
+            df = pd.read_sql_query("SELECT * FROM sales WHERE Sale_id = ?", conn,
+                                   params=[str(sale_id).strip()])
+        return None if df.empty else df.iloc[0].to_dict()
+
+    def find(self, date_from=None, date_to=None, staff_id=None, product_name=None, limit=500):
+        """Tìm giao dịch theo khoảng ngày, nhân viên, sản phẩm"""
+        conditions, params = [], []
+        if date_from is not None:
+            conditions.append("Date >= ?")
+            params.append(pd.Timestamp(date_from).strftime('%Y-%m-%d'))
+        if date_to is not None:
+            conditions.append("Date <= ?")
+            params.append(pd.Timestamp(date_to).strftime('%Y-%m-%d'))
+        if staff_id:
+            conditions.append("Staff_id = ?")
+            params.append(staff_id)
+        if product_name:
+            conditions.append("Product_Name = ?")
+            params.append(product_name)
+
+        query = "SELECT * FROM sales"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY Date DESC, Sale_id LIMIT ?"
+        params.append(int(limit))
+
+        with self._connect() as conn:
+            return pd.read_sql_query(query, conn, params=params)
+
+    def distinct_values(self, column):
+        if column not in ('Staff_id', 'Product_Name', 'Order_Channel', 'Size'):
+            raise ValueError(f"Không hỗ trợ cột {column}")
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT DISTINCT {column} FROM sales ORDER BY {column}").fetchall()
+        return [row[0] for row in rows]
+
+    def next_sale_id(self):
+        """Mã giao dịch kế tiếp theo dạng S0001"""
+        with self._connect() as conn:
+            ids = [row[0] for row in conn.execute("SELECT Sale_id FROM sales WHERE Sale_id LIKE 'S%'")]
+        numbers = [int(i[1:]) for i in ids if i[1:].isdigit()]
+        return f'S{(max(numbers) + 1 if numbers else 1):04d}'
+
+    # --- Thêm / sửa / xóa ---
+    def insert(self, record):
+        row = prepare_record(record)
+        with self._connect() as conn:
+            try:
+                conn.execute(f"INSERT INTO sales ({', '.join(SALES_COLUMNS)}) "
+                             f"VALUES ({', '.join('?' * len(SALES_COLUMNS))})",
+                             [row[col] for col in SALES_COLUMNS])
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Mã giao dịch {row['Sale_id']} đã tồn tại")
+            self._refresh_aggregates(conn, [row])
+        self._journal('insert', row)
+        return row
+
+    def update(self, sale_id, changes):
+        old = self.get(sale_id)
+        if old is None:
+            raise ValueError(f"Không tìm thấy giao dịch {sale_id}")
+
+        merged = dict(old, **changes)
+        merged['Sale_id'] = old['Sale_id']
+        if 'Revenue' not in changes:
+            # Doanh thu tính lại theo số lượng và giá mới
+            merged['Revenue'] = None
+        row = prepare_record(merged)
+
+        with self._connect() as conn:
+            conn.execute(f"UPDATE sales SET {', '.join(f'{col} = ?' for col in SALES_COLUMNS[1:])} "
+                         f"WHERE Sale_id = ?",
+                         [row[col] for col in SALES_COLUMNS[1:]] + [row['Sale_id']])
+            self._refresh_aggregates(conn, [old, row])
+        self._journal('update', row)
+        return row
+
+    def delete(self, sale_id):
+        old = self.get(sale_id)
+        if old is None:
+            raise ValueError(f"Không tìm thấy giao dịch {sale_id}")
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sales WHERE Sale_id = ?", [old['Sale_id']])
+            self._refresh_aggregates(conn, [old])
+        self._journal('delete', {'Sale_id': old['Sale_id']})
+        return old
+
+    def _refresh_aggregates(self, conn, rows):
+        """Tính lại chỉ những dòng tổng hợp có khóa thuộc các giao dịch bị sửa"""
+        for table, (keys, measures) in AGGREGATES.items():
+            affected = {tuple(row[key] for key in keys) for row in rows}
+            where = ' AND '.join(f'{key} = ?' for key in keys)
+            for values in affected:
+                conn.execute(f"DELETE FROM {table} WHERE {where}", values)
+                conn.execute(f"""
+                    INSERT INTO {table}
+                    SELECT {', '.join(keys)}, {measures}
+                    FROM sales WHERE {where} GROUP BY {', '.join(keys)}""", values)
+
+    # --- Đọc bảng tổng hợp ---
+    def aggregate(self, table):
+        order = 'Year_Month' if table == 'agg_monthly' else 'Revenue DESC'
+        with self._connect() as conn:
+            return pd.read_sql_query(f"SELECT * FROM {table} ORDER BY {order}", conn)
+
+    def monthly_trend(self):
+        return self.aggregate('agg_monthly')
+
+    def staff_performance(self):
+        df = self.aggregate('agg_staff')
+        df['Rank'] = range(1, len(df) + 1)
+        return df
+
+    def product_channel(self):
+        return self.aggregate('agg_product_channel')
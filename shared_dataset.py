@@ -0,0 +1,109 @@
+"""shared_dataset.py - Dữ liệu đã làm sạch dùng chung cho mọi phiên Streamlit
+
+Thay vì mỗi phiên (và mỗi lần rerun) nhận một bản sao DataFrame từ
+st.cache_data, tiến trình chỉ giữ một bản duy nhất, đã sắp theo ngày. Các phiên
+đọc trực tiếp bản này; bộ lọc theo khoảng ngày trả về slice liên tục (view)
+hoặc bảng tổng hợp nhỏ, nên mỗi phiên thêm vào gần như không tốn bộ nhớ.
+Không sửa trực tiếp `dataset.df` trong dashboard.
+
+Với file .arrow (cleaned_data.arrow) dữ liệu được mở bằng memory map và đã sắp
+sẵn theo ngày, nên cột số / ngày không bị sao chép và các tiến trình Streamlit
+trên cùng máy dùng chung page cache.
+"""
+import pandas as pd
+import numpy as np
+import os
+import gc
+import pickle
+import psutil
+
+import cleaned_store
+from run_config import resolve
+
+
+class SharedDataset:
+    def __init__(self, path=None, config=None):
+        self.path = path = path or resolve(config).cleaned_path
+        df = cleaned_store.read_table(path, parse_dates=['Date'])
+        # Bản Arrow đã sắp theo ngày: giữ nguyên để không sao chép
+        if not df['Date'].is_monotonic_increasing:
+            df = df.sort_values('Date', kind='stable').reset_index(drop=True)
+        self.df = df
+        self.days = self.df['Date'].to_numpy().astype('datetime64[D]')
+
+    @property
+    def nbytes(self):
+        return int(self.df.memory_usage(deep=True).sum())
+
+    def __len__(self):
+        return len(self.df)
+
+    def row_bounds(self, date_from=None, date_to=None):
+        lo = 0 if date_from is None else np.searchsorted(
+            self.days, np.datetime64(pd.Timestamp(date_from).date()), side='left')
+        hi = len(self.days) if date_to is None else np.searchsorted(
+            self.days, np.datetime64(pd.Timestamp(date_to).date()), side='right')
+        return int(lo), int(hi)
+
+    def view(self, date_from=None, date_to=None, columns=None):
+        """Các dòng trong khoảng ngày: slice liên tục, không sao chép dữ liệu"""
+        lo, hi = self.row_bounds(date_from, date_to)
+        sliced = self.df.iloc[lo:hi]
+        return sliced if columns is None else sliced[columns]
+
+    def aggregate(self, by, measures=('Revenue', 'Quantity'), date_from=None, date_to=None):
+        """Bảng tổng hợp nhỏ theo cột `by` trong khoảng ngày"""
+        return (self.view(date_from, date_to)
+                .groupby(by)[list(measures)].sum()
+                .reset_index())
+
+
+def _rss_mb():
+    return psutil.Process().memory_info().rss / 1e6
+
+
+# Hàm chính cho module này
+def main_shared_dataset(df_path=None, sessions=30, scale=200, config=None):
+    """So sánh bộ nhớ: mỗi phiên một bản sao (cache_data) và dùng chung một bản"""
+    print("=" * 60)
+    print("BỘ NHỚ DỮ LIỆU DÙNG CHUNG GIỮA CÁC PHIÊN")
+    print("=" * 60)
+
+    config = resolve(config)
+    df_path = df_path or config.cleaned_path
+    if not os.path.exists(df_path):
+        print(f"File {df_path} không tồn tại!")
+        return None
+
+    # Nhân bản dữ liệu để chênh lệch bộ nhớ đủ rõ
+    os.makedirs(config.benchmark_dir, exist_ok=True)
+    big_path = os.path.join(config.benchmark_dir, 'shared_dataset_bench.csv')
+    pd.concat([pd.read_csv(df_path)] * scale, ignore_index=True).to_csv(big_path, index=False)
+
+    try:
+        dataset = SharedDataset(big_path)
+        print(f"Dữ liệu: {len(dataset):,} dòng, {dataset.nbytes / 1e6:.1f} MB trong bộ nhớ")
+
+        # st.cache_data trả về bản sao (pickle) cho mỗi lần gọi
+        base = _rss_mb()
+        copies = [pickle.loads(pickle.dumps(dataset.df)) for _ in range(sessions)]
+        copied_mb = _rss_mb() - base
+        del copies
+        gc.collect()
+
+        # Dùng chung: mỗi phiên chỉ giữ tham chiếu và view theo bộ lọc
+        base = _rss_mb()
+        start, end = dataset.df['Date'].iloc[[0, -1]]
+        views = [dataset.view(start, start + (end - start) / 2) for _ in range(sessions)]
+        shared_mb = _rss_mb() - base
+        del views
+
+        print(f"{sessions} phiên, mỗi phiên một bản sao: +{copied_mb:,.1f} MB")
+        print(f"{sessions} phiên dùng chung + view theo ngày: +{shared_mb:,.1f} MB")
+        return {'copied_mb': copied_mb, 'shared_mb': shared_mb}
+    finally:
+        os.remove(big_path)
+
+
+if __name__ == "__main__":
+    main_shared_dataset()
@@ -0,0 +1,242 @@
+"""telemetry.py - Đo thời gian và bộ nhớ cho pipeline và dashboard
+
+Dùng `timed` làm decorator hoặc context manager (hoặc `Span` khi cần bắt đầu /
+kết thúc ở hai chỗ khác nhau). Mỗi lần đo ghi một dòng JSON vào
+<output_root>/metrics/metrics.jsonl của cấu hình đang chạy: tên bước, nguồn (pipeline/dashboard), thời gian,
+RSS hiện tại, RSS đỉnh của tiến trình, số dòng dữ liệu (nếu có). File được xoay
+vòng khi vượt quá kích thước giới hạn. Đặt biến môi trường HLC_TELEMETRY=0 để tắt.
+Mỗi Span cũng được chuyển sang profiling.py (trace Chrome) khi HLC_PROFILE=1.
+"""
+import os
+import sys
+import json
+import time
+import functools
+import threading
+import psutil
+import profiling
+from run_config import resolve
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 3
+
+_lock = threading.Lock()
+_process = psutil.Process()
+
+
+def enabled():
+    return os.environ.get('HLC_TELEMETRY', '1') != '0'
+
+
+def _rss_mb():
+    return _process.memory_info().rss / 1e6
+
+
+def _peak_rss_mb():
+    """RSS đỉnh của tiến trình từ lúc khởi động"""
+    if resource is not None:
+        # Linux trả về KB, macOS trả về byte
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == 'darwin' else peak * 1024 / 1e6
+    info = _process.memory_info()
+    return getattr(info, 'peak_wset', info.rss) / 1e6
+
+
+def _rotate(path):
+    """Xoay vòng: metrics.jsonl -> metrics.1.jsonl -> ... (giữ BACKUP_COUNT file)"""
+    root, ext = os.path.splitext(path)
+    for i in range(BACKUP_COUNT - 1, 0, -1):
+        if os.path.exists(f'{root}.{i}{ext}'):
+            os.replace(f'{root}.{i}{ext}', f'{root}.{i + 1}{ext}')
+    os.replace(path, f'{root}.1{ext}')
+
+
+def record(entry, path=None):
+    """Ghi một bản ghi đo vào file metrics"""
+    if not enabled():
+        return
+    path = path or resolve().metrics_path
+    line = json.dumps(entry, ensure_ascii=False) + '\n'
+    # Nhiều tiến trình (worker pipeline, worker biểu đồ, Streamlit) cùng ghi một file:
+    # lỗi xoay vòng / ghi chỉ làm mất bản ghi đo, không bao giờ làm hỏng bước đang đo
+    with _lock:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                if os.path.getsize(path) + len(line) > MAX_BYTES:
+                    _rotate(path)
+            except OSError:
+                # File chưa có, hoặc tiến trình khác vừa xoay vòng trước
+                pass
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line)
+        except OSError:
+            pass
+
+
+class Span:
+    """Một lần đo: start() ... stop(), hoặc dùng với `with`"""
+
+    def __init__(self, stage, source='pipeline', **fields):
+        self.stage = stage
+        self.source = source
+        self.fields = fields
+        self._started = None
+        self._rss_start = None
+        self._trace = None
+
+    def start(self):
+        self._trace = profiling.begin(self.stage, self.source)
+        self._rss_start = _rss_mb()
+        self._started = time.perf_counter()
+        return self
+
+    def stop(self, **fields):
+        if self._started is None:
+            return None
+        seconds = time.perf_counter() - self._started
+        rss = _rss_mb()
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'stage': self.stage,
+            'source': self.source,
+            'seconds': round(seconds, 6),
+            'rss_mb': round(rss, 1),
+            'rss_delta_mb': round(rss - self._rss_start, 1),
+            'peak_rss_mb': round(_peak_rss_mb(), 1),
+            'pid': os.getpid(),
+        }
+        entry.update(self.fields)
+        entry.update(fields)
+        self._started = None
+        profiling.end(self._trace, **{key: entry[key] for key in ('rows', 'error') if key in entry})
+        self._trace = None
+        record(entry)
+        return entry
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop(**({'error': exc_type.__name__} if exc_type else {}))
+        return False
+
+
+def _row_count(args):
+    """Số dòng của self.df (DataPreprocessor, PivotAnalyzer, visualizer)"""
+    df = getattr(args[0], 'df', None) if args else None
+    # pandas chỉ import khi cần đọc metrics: nếu chưa được tải thì không thể có DataFrame
+    pd = sys.modules.get('pandas')
+    return len(df) if pd is not None and isinstance(df, pd.DataFrame) else None
+
+
+class _Timed(Span):
+    """Span dùng được làm decorator"""
+
+    def __call__(self, func):
+        name = self.stage or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled() and not profiling.enabled():
+                return func(*args, **kwargs)
+            span = Span(name, self.source, **self.fields).start()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                span.stop(rows=_row_count(args), error=type(e).__name__)
+                raise
+            span.stop(rows=_row_count(args))
+            return result
+        return wrapper
+
+
+def timed(stage=None, source='pipeline', **fields):
+    """Decorator / context manager đo thời gian một bước
+
+    @timed                          -> tên bước là Class.method
+    @timed('pivot.save_excel')      -> tên bước tự đặt
+    @timed('chart.segment', kind='batch')  -> thêm trường vào mỗi bản ghi
+    with timed('page.HOME', source='dashboard'): ...
+    """
+    if callable(stage):
+        return _Timed(None, source, **fields)(stage)
+    return _Timed(stage, source, **fields)
+
+
+def load_metrics(path=None):
+    """Đọc các bản ghi đo (gồm các file đã xoay vòng) thành DataFrame"""
+    import pandas as pd
+
+    path = path or resolve().metrics_path
+    root, ext = os.path.splitext(path)
+    paths = [f'{root}.{i}{ext}' for i in range(BACKUP_COUNT, 0, -1)] + [path]
+    rows = []
+    for p in paths:
+        if not os.path.exists(p):
+            continue
+        with open(p, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        df['ts'] = pd.to_datetime(df['ts'])
+    return df
+
+
+def summarize(df):
+    """p50 / p95 / max thời gian và RSS đỉnh theo từng bước"""
+    if df.empty:
+        return df
+    summary = df.groupby(['source', 'stage']).agg(
+        runs=('seconds', 'size'),
+        p50_s=('seconds', lambda s: s.quantile(0.5)),
+        p95_s=('seconds', lambda s: s.quantile(0.95)),
+        max_s=('seconds', 'max'),
+        peak_rss_mb=('peak_rss_mb', 'max'),
+        last_run=('ts', 'max'),
+    ).reset_index()
+    return summary.sort_values('p95_s', ascending=False)
+
+
+def daily_percentiles(df, stage):
+    """Xu hướng p50 / p95 theo ngày của một bước"""
+    import pandas as pd
+
+    data = df[df['stage'] == stage].set_index('ts')['seconds']
+    return pd.DataFrame({
+        'p50': data.resample('D').quantile(0.5),
+        'p95': data.resample('D').quantile(0.95),
+    }).dropna()
+
+
+# Hàm chính cho module này
+def main_telemetry():
+    """In tóm tắt số liệu đo đã ghi"""
+    print("=" * 60)
+    print("TELEMETRY - TÓM TẮT THỜI GIAN CÁC BƯỚC")
+    print("=" * 60)
+
+    df = load_metrics()
+    if df.empty:
+        print(f"Chưa có số liệu trong {resolve().metrics_path}")
+        return None
+
+    import pandas as pd
+
+    summary = summarize(df)
+    with pd.option_context('display.width', 140, 'display.float_format', '{:,.4f}'.format):
+        print(summary.to_string(index=False))
+    return summary
+
+
+if __name__ == "__main__":
+    main_telemetry()
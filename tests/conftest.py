@@ -0,0 +1,15 @@
+"""conftest.py - Cho phép import các module ở thư mục gốc của dự án"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_output(tmp_path, monkeypatch):
+    # Kết quả mặc định (metrics, trace...) ghi vào thư mục tạm, không vào output/ của repo
+    monkeypatch.setenv('HLC_OUTPUT_ROOT', str(tmp_path / 'output'))
+    monkeypatch.setenv('HLC_TELEMETRY', '0')
+    monkeypatch.delenv('HLC_PROFILE', raising=False)
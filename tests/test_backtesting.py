@@ -0,0 +1,50 @@
+"""test_backtesting.py - Bảng xếp hạng backtest"""
+import numpy as np
+import pandas as pd
+
+from backtesting import leaderboard, load_series, mase
+from pivot_analysis import PivotAnalyzer
+from visualize_daily1 import DailyVisualizer
+
+
+def _folds(rows):
+    return pd.DataFrame(rows, columns=['Series', 'Model', 'Origin', 'MAPE', 'sMAPE', 'MASE',
+                                       'Fit_s', 'Predict_s'])
+
+
+def test_mase_constant_training_series_is_nan():
+    train = np.zeros(24)
+    assert np.isnan(mase(np.array([1.0, 2.0]), np.array([0.0, 0.0]), train, 12))
+
+
+def test_leaderboard_picks_cheapest_when_all_mase_nan():
+    folds = _folds([
+        ('monthly', 'holt_winters', 0, np.nan, 0.0, np.nan, 0.30, 0.01),
+        ('monthly', 'seasonal_naive', 0, np.nan, 0.0, np.nan, 0.01, 0.01),
+    ])
+    board = leaderboard(folds)
+    assert board.loc[board['Selected'], 'Model'].tolist() == ['seasonal_naive']
+
+
+def test_leaderboard_prefers_cheaper_model_within_tolerance():
+    folds = _folds([
+        ('monthly', 'holt_winters', 0, 5.0, 5.0, 1.00, 0.30, 0.01),
+        ('monthly', 'seasonal_naive', 0, 5.0, 5.0, 1.02, 0.01, 0.01),
+        ('monthly', 'ets', 0, 5.0, 5.0, 2.00, 0.001, 0.001),
+    ])
+    board = leaderboard(folds)
+    assert board.loc[board['Selected'], 'Model'].tolist() == ['seasonal_naive']
+
+
+def test_load_series_matches_pivot_and_visualizer(tmp_path):
+    rng = np.random.default_rng(0)
+    # Có ngày không bán được ở giữa chuỗi
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.choice(np.arange(0, 70, 2), 300), unit='D')
+    df = pd.DataFrame({'Date': dates.strftime('%Y-%m-%d'), 'Year_Month': dates.strftime('%Y-%m'),
+                       'Quantity': 1, 'Revenue': rng.integers(20, 80, 300) * 1000})
+
+    series = load_series(df)
+    monthly = PivotAnalyzer(df).create_all_pivots()['monthly_trend']
+    daily = DailyVisualizer(df, output_dir=str(tmp_path)).daily_series()
+    np.testing.assert_array_equal(series['monthly'], monthly['Revenue'].to_numpy(float))
+    np.testing.assert_array_equal(series['daily'], daily.to_numpy(float))
@@ -0,0 +1,61 @@
+"""test_batch_charts.py - Marker phân đoạn: bỏ qua khi khớp hash/profile, ghi nhận lỗi"""
+import os
+
+import pandas as pd
+
+import batch_charts
+from batch_charts import BatchChartEngine, read_marker
+from run_config import RunConfig
+
+CALLS = []
+
+
+class _StubVisualizer:
+    """Visualizer giả: ghi lại phân đoạn được vẽ, lỗi khi kênh là 'Lỗi'"""
+
+    def __init__(self, df, renderer=None, output_dir=None):
+        self.df = df
+        self.output_dir = output_dir
+
+    def plot(self):
+        CALLS.append(self.output_dir)
+        if (self.df['Order_Channel'] == 'Lỗi').any():
+            raise ValueError('không vẽ được')
+        return True
+
+
+def _write(path, revenue):
+    pd.DataFrame({
+        'Date': ['2024-01-01', '2024-01-02', '2024-01-03'],
+        'Order_Channel': ['Online', 'Offline', 'Lỗi'],
+        'Revenue': revenue,
+    }).to_csv(path, index=False)
+
+
+def _run(path, tmp_path, profile='draft', **kwargs):
+    CALLS.clear()
+    config = RunConfig(output_root=str(tmp_path / 'output'), render_profile=profile)
+    engine = BatchChartEngine(str(path), workers=1, config=config, **kwargs)
+    engine.run(['Order_Channel'])
+    return sorted(os.path.basename(call) for call in CALLS)
+
+
+def test_markers_track_input_and_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_charts, 'CHART_GROUPS', [(_StubVisualizer, ['plot'])])
+    path = tmp_path / 'cleaned.csv'
+    _write(path, [10, 20, 30])
+
+    assert _run(path, tmp_path) == ['Order_Channel=Lỗi', 'Order_Channel=Offline', 'Order_Channel=Online']
+    segment = tmp_path / 'output' / 'segments' / 'Order_Channel=Lỗi'
+    assert read_marker(str(segment))['status'] == 'failed'
+
+    # Không đổi gì: không vẽ lại, kể cả phân đoạn lỗi
+    assert _run(path, tmp_path) == []
+    assert _run(path, tmp_path, retry_failed=True) == ['Order_Channel=Lỗi']
+
+    # Chỉ phân đoạn có dữ liệu thay đổi được vẽ lại
+    _write(path, [10, 25, 30])
+    assert _run(path, tmp_path) == ['Order_Channel=Offline']
+
+    # Đổi render profile thì vẽ lại toàn bộ
+    assert len(_run(path, tmp_path, profile='screen')) == 3
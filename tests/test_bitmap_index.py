@@ -0,0 +1,78 @@
+"""test_bitmap_index.py - Bộ lọc bitmap khớp với mặt nạ pandas"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bitmap_index import BitmapIndex
+from pivot_analysis import PivotAnalyzer
+
+FILTERS = [
+    {},
+    {'Size': 'L'},
+    # OR trong cùng một cột
+    {'Product_Name': ['Mocha', 'Latte']},
+    # AND giữa các cột
+    {'Size': ['M', 'L'], 'Order_Channel': 'Online', 'Product_Name': ['Mocha', 'Trà đào']},
+    # Giá trị không có trong dữ liệu: bỏ qua trong OR, không khớp dòng nào khi đứng riêng
+    {'Product_Name': ['Mocha', 'Không có']},
+    {'Staff_id': 'NV99'},
+    # Danh sách rỗng / None: không lọc cột đó
+    {'Size': [], 'Order_Channel': None},
+]
+
+
+def _sales(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Product_Name': rng.choice(['Mocha', 'Latte', 'Trà đào', 'Bạc xỉu'], n),
+        'Size': rng.choice(['S', 'M', 'L'], n),
+        'Order_Channel': rng.choice(['Online', 'Offline'], n),
+        'Staff_id': rng.choice(['NV01', 'NV02', 'NV03'], n),
+        'Year_Month': rng.choice(['2024-01', '2024-02'], n),
+        'Quantity': rng.integers(1, 5, n),
+        'Revenue': rng.integers(20, 80, n) * 1000,
+    })
+
+
+def _mask(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in filters.items():
+        if values is None or (not isinstance(values, str) and len(values) == 0):
+            continue
+        mask &= df[column].isin([values] if isinstance(values, str) else values).to_numpy()
+    return mask
+
+
+# Số dòng không chia hết cho 8: byte cuối của bitmap có bit đệm
+@pytest.mark.parametrize('n', [203, 1, 8])
+@pytest.mark.parametrize('filters', FILTERS)
+def test_select_and_aggregate_match_pandas(n, filters):
+    df = _sales(n)
+    index = BitmapIndex(df)
+    mask = _mask(df, filters)
+
+    bitmap = index.select(**filters)
+    assert index.count(bitmap) == mask.sum()
+    np.testing.assert_array_equal(index.positions(bitmap), np.flatnonzero(mask))
+
+    totals = index.aggregate(bitmap)
+    assert totals == {'Revenue': float(df.loc[mask, 'Revenue'].sum()),
+                      'Quantity': float(df.loc[mask, 'Quantity'].sum()),
+                      'Orders': int(mask.sum())}
+
+    grouped = index.aggregate(bitmap, by='Product_Name').set_index('Product_Name').sort_index()
+    expected = df[mask].groupby('Product_Name').agg(
+        Revenue=('Revenue', 'sum'), Quantity=('Quantity', 'sum'), Orders=('Revenue', 'size'))
+    pd.testing.assert_frame_equal(grouped, expected.sort_index(), check_index_type=False)
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_pivot_analyzer_filter_matches_pandas(filters):
+    df = _sales(203, seed=1)
+    filtered = PivotAnalyzer(df).filter(**filters).df
+    pd.testing.assert_frame_equal(filtered, df[_mask(df, filters)].reset_index(drop=True))
+
+
+def test_select_unknown_column_raises():
+    with pytest.raises(KeyError):
+        BitmapIndex(_sales(20)).select(Customer='A')
@@ -0,0 +1,40 @@
+"""test_chart_labels.py - Thưa bớt nhãn cột và heatmap"""
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from chart_labels import label_bars, label_heatmap
+
+
+def test_bar_labels_decimated_keep_peak():
+    fig, ax = plt.subplots(figsize=(4, 3))
+    values = np.arange(1, 201, dtype=float)
+    values[57] = 1000
+    texts = label_bars(ax, ax.bar(range(200), values), fmt='{:,.0f}')
+    assert 0 < len(texts) < 200
+    assert '1,000' in [t.get_text() for t in texts]
+    plt.close(fig)
+
+
+def test_heatmap_labels_decimated_keep_peak():
+    fig, ax = plt.subplots(figsize=(4, 3))
+    values = np.ones((60, 80))
+    values[13, 41] = 9
+    ax.imshow(values)
+    texts = label_heatmap(ax, values)
+    assert 0 < len(texts) < values.size
+    assert (41, 13) in [t.get_position() for t in texts]
+    plt.close(fig)
+
+
+def test_heatmap_small_grid_labels_every_positive_cell():
+    fig, ax = plt.subplots(figsize=(8, 6))
+    values = np.array([[1.0, 0.0], [2.5, 4.0]])
+    ax.imshow(values)
+    assert sorted(t.get_text() for t in label_heatmap(ax, values)) == ['1.0', '2.5', '4.0']
+    assert len(label_heatmap(ax, values, max_labels=1)) == 1
+    assert label_heatmap(ax, np.zeros((3, 3))) == []
+    plt.close(fig)
@@ -0,0 +1,93 @@
+"""test_chart_renderer.py - BatchRenderer cho ảnh giống hệt figure mới"""
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.ticker import FuncFormatter, MultipleLocator
+from PIL import Image
+
+from chart_renderer import BatchRenderer, ChartRenderer
+from visualize_channel1 import ChannelVisualizer
+from visualize_product1 import ProductVisualizer
+
+
+def _plot_ranking(renderer, path, names, values):
+    # Biểu đồ đầu tiên để lại nhiều trạng thái trục: locator, formatter,
+    # tick params, trục phân loại và trục y đảo ngược
+    fig, ax = renderer.subplots('ranking', figsize=(6, 4))
+    ax.barh(names, values, color='steelblue')
+    ax.invert_yaxis()
+    ax.xaxis.set_major_locator(MultipleLocator(5))
+    ax.xaxis.set_major_formatter(FuncFormatter(lambda x, _: f'{x:.0f}k'))
+    ax.tick_params(axis='x', labelrotation=30, labelsize=7)
+    ax.set_title('Xếp hạng')
+    renderer.save(fig, path, name='ranking')
+
+
+def _plot_trend(renderer, path, months, values):
+    fig, ax = renderer.subplots('ranking', figsize=(6, 4))
+    ax.plot(months, values, marker='o', label='Doanh thu')
+    ax.legend()
+    ax.set_title('Xu hướng')
+    renderer.save(fig, path, name='trend')
+
+
+def _pixels(path):
+    return np.asarray(Image.open(path))
+
+
+def test_reused_template_matches_fresh_figure(tmp_path):
+    months = ['2023-01', '2023-02', '2023-03', '2023-04']
+    values = [3.0, 1.5, 4.2, 2.8]
+
+    with plt.rc_context():
+        batch = BatchRenderer(dpi=40)
+        _plot_ranking(batch, tmp_path / 'ranking.png', ['Mocha', 'Latte', 'Trà'], [12, 30, 7])
+        _plot_trend(batch, tmp_path / 'batch.png', months, values)
+        batch.close()
+    assert batch.template_count == 0
+
+    with plt.rc_context():
+        fresh = ChartRenderer(dpi=40)
+        fresh.apply_style()
+        _plot_trend(fresh, tmp_path / 'fresh.png', months, values)
+
+    np.testing.assert_array_equal(_pixels(tmp_path / 'batch.png'), _pixels(tmp_path / 'fresh.png'))
+
+
+def _sales(n, channels):
+    rng = np.random.default_rng(n)
+    return pd.DataFrame({
+        'Year_Month': np.repeat(['2023-01', '2023-02', '2023-03'], n // 3),
+        'Order_Channel': rng.choice(channels, n - n % 3),
+        'Product_Name': rng.choice(['Mocha', 'Latte', 'Trà đào', 'Bạc xỉu'], n - n % 3),
+        'Quantity': rng.integers(1, 5, n - n % 3),
+        'Revenue': rng.integers(20, 80, n - n % 3) * 1000,
+    })
+
+
+def _render_all(renderer, df, out):
+    out.mkdir()
+    ProductVisualizer(df, renderer=renderer, output_dir=str(out)).plot_product_quantity()
+    ChannelVisualizer(df, renderer=renderer, output_dir=str(out)).plot_channel_trend()
+
+
+def test_visualizers_match_fresh_renderer(tmp_path):
+    # Palette "husl" của ProductVisualizer phải áp dụng cho cả BatchRenderer
+    first, second = _sales(60, ['Online', 'Offline']), _sales(30, ['Online'])
+
+    with plt.rc_context():
+        batch = BatchRenderer(dpi=40)
+        _render_all(batch, first, tmp_path / 'b1')
+        _render_all(batch, second, tmp_path / 'b2')
+        batch.close()
+
+    with plt.rc_context():
+        _render_all(ChartRenderer(dpi=40), second, tmp_path / 'f2')
+
+    for name in ('top_products_quantity.png', 'channel_trend.png'):
+        np.testing.assert_array_equal(_pixels(tmp_path / 'b2' / name),
+                                      _pixels(tmp_path / 'f2' / name))
@@ -0,0 +1,41 @@
+"""test_cleaned_store.py - Phân vùng Year/Month, bản Arrow và hàm đọc cho main_*"""
+import pandas as pd
+
+import cleaned_store
+from run_config import RunConfig
+
+
+def _cleaned(config):
+    dates = pd.date_range('2023-01-01', periods=6, freq='MS') + pd.Timedelta(days=14)
+    df = pd.DataFrame({'Sale_id': [f'S{i}' for i in range(6)], 'Date': dates,
+                       'Revenue': range(6), 'Year': dates.year, 'Month': dates.month})
+    df.to_csv(config.cleaned_path, index=False)
+    cleaned_store.write_arrow(df, config.cleaned_arrow_path)
+    cleaned_store.write_partitions(df, config.cleaned_dir)
+    return df
+
+
+def test_last_three_months_reads_three_partitions(tmp_path):
+    config = RunConfig(output_root=str(tmp_path))
+    _cleaned(config)
+    date_from, date_to = cleaned_store.last_months(config.cleaned_dir, 3)
+    df = cleaned_store.read_cleaned(config.cleaned_dir, date_from, date_to)
+    assert len(df.attrs['partitions']) == 3
+    assert df['Sale_id'].tolist() == ['S3', 'S4', 'S5']
+
+
+def test_load_for_run_prefers_arrow_then_partitions(tmp_path):
+    config = RunConfig(output_root=str(tmp_path))
+    expected = _cleaned(config)
+
+    df = cleaned_store.load_for_run(config)
+    assert df.attrs['source'] == config.cleaned_arrow_path
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+
+    df = cleaned_store.load_for_run(config, date_from='2023-03-01', date_to='2023-04-30')
+    assert df.attrs['source'] == config.cleaned_dir
+    assert df['Sale_id'].tolist() == ['S2', 'S3']
+
+
+def test_load_for_run_missing_file(tmp_path):
+    assert cleaned_store.load_for_run(RunConfig(output_root=str(tmp_path))) is None
@@ -0,0 +1,69 @@
+"""test_forecasting.py - Mô hình dự báo, khoảng dự báo và cache mô hình đã fit"""
+import hashlib
+
+import numpy as np
+import pytest
+
+import forecasting
+
+
+def _monthly(n, seed=0):
+    rng = np.random.default_rng(seed)
+    months = np.arange(n)
+    return 1000 + 10 * months + 200 * np.sin(2 * np.pi * months / 12) + rng.normal(0, 30, n)
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    forecasting.clear_cache()
+    yield
+    forecasting.clear_cache()
+
+
+@pytest.mark.parametrize('name', list(forecasting.MODELS))
+@pytest.mark.parametrize('n', [36, 10])
+def test_forecast_shape_and_interval_order(name, n):
+    y = _monthly(n)
+    if name == 'seasonal_naive' and n <= forecasting.SEASONAL_PERIODS:
+        pytest.skip('seasonal naive cần hơn một mùa')
+
+    frame = forecasting.forecast_series(name, y, 7)
+    assert list(frame.columns) == ['Forecast', 'Lower', 'Upper']
+    assert len(frame) == 7
+    assert np.isfinite(frame.to_numpy()).all()
+    assert (frame['Lower'] <= frame['Forecast']).all()
+    assert (frame['Forecast'] <= frame['Upper']).all()
+    assert (frame['Lower'] >= 0).all()
+
+
+def test_short_series_falls_back():
+    # Chưa đủ 2 mùa: Holt-Winters và SARIMA bỏ thành phần mùa vụ
+    y = _monthly(10)
+    assert forecasting.fit_model('holt_winters', y).result.model.seasonal is None
+    assert forecasting.fit_model('sarima', y).result.model.seasonal_order == (0, 0, 0, 0)
+    assert forecasting.fit_model('holt_winters', _monthly(24)).result.model.seasonal == 'add'
+
+    with pytest.raises(ValueError):
+        forecasting.fit_model('seasonal_naive', y)
+    with pytest.raises(ValueError):
+        forecasting.fit_model('linear', y[:2])
+
+
+def test_fitted_models_cached_by_series_hash():
+    y = _monthly(30)
+    first = forecasting.fit_model('linear', y)
+    # Cùng nội dung (khác đối tượng, khác dtype) -> cùng khóa sha256
+    assert forecasting.fit_model('linear', list(y)) is first
+    assert forecasting.series_hash(y) == hashlib.sha256(y.astype(np.float64).tobytes()).hexdigest()[:16]
+
+    changed = y.copy()
+    changed[-1] += 1
+    assert forecasting.series_hash(changed) != forecasting.series_hash(y)
+    assert forecasting.fit_model('linear', changed) is not first
+    forecasting.fit_model('seasonal_naive', y)
+
+    assert forecasting.cache_stats() == {'models': 3, 'hits': 1, 'misses': 3}
+    # Đổi số kỳ dự báo không fit lại
+    forecasting.forecast_series('linear', y, 3)
+    forecasting.forecast_series('linear', y, 12)
+    assert forecasting.cache_stats()['hits'] == 3
@@ -0,0 +1,64 @@
+"""test_hierarchical_forecast.py - Dựng chuỗi theo cấp và reconcile dự báo"""
+import numpy as np
+import pandas as pd
+
+from hierarchical_forecast import LEVELS, TOTAL_LEVEL, build_series, reconcile
+
+TOTAL = (TOTAL_LEVEL, TOTAL_LEVEL)
+
+
+def _sales(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    # Tháng 2024-03 không có giao dịch: chuỗi phải có số 0 ở kỳ đó
+    months = rng.choice(['2024-01', '2024-02', '2024-04', '2024-05'], n)
+    return pd.DataFrame({
+        'Year_Month': months,
+        'Product_Name': rng.choice(['Mocha', 'Latte', 'Trà đào'], n),
+        'Order_Channel': rng.choice(['Online', 'Offline'], n),
+        'Staff_id': rng.choice(['NV01', 'NV02', 'NV03', 'NV04'], n),
+        'Revenue': rng.integers(20, 80, n) * 1000,
+    })
+
+
+def test_build_series_matches_groupby():
+    df = _sales()
+    periods, series = build_series(df)
+    assert periods == ['2024-01', '2024-02', '2024-03', '2024-04', '2024-05']
+
+    expected = df.groupby('Year_Month')['Revenue'].sum().reindex(periods, fill_value=0)
+    np.testing.assert_array_equal(series[TOTAL], expected.to_numpy(float))
+
+    for level, col in LEVELS.items():
+        grouped = df.groupby([col, 'Year_Month'])['Revenue'].sum()
+        members = sorted(df[col].unique())
+        assert sorted(member for lvl, member in series if lvl == level) == members
+        for member in members:
+            expected = grouped.loc[member].reindex(periods, fill_value=0)
+            np.testing.assert_array_equal(series[(level, member)], expected.to_numpy(float))
+
+
+def _frame(forecast):
+    forecast = np.asarray(forecast, dtype=float)
+    return pd.DataFrame({'Forecast': forecast, 'Lower': forecast * 0.8, 'Upper': forecast * 1.2})
+
+
+def test_reconcile_levels_sum_to_total():
+    forecasts = {
+        TOTAL: _frame([100, 200, 300]),
+        ('Sản phẩm', 'Mocha'): _frame([30, 50, 0]),
+        ('Sản phẩm', 'Latte'): _frame([10, 100, 0]),
+        ('Kênh', 'Online'): _frame([60, 120, 180]),
+        ('Kênh', 'Offline'): _frame([20, 40, 60]),
+    }
+    reconciled = reconcile(forecasts, levels={'Sản phẩm': 'Product_Name', 'Kênh': 'Order_Channel'})
+    total = reconciled[TOTAL]['Forecast'].to_numpy()
+
+    for level in ('Sản phẩm', 'Kênh'):
+        sums = sum(frame['Forecast'].to_numpy() for key, frame in reconciled.items() if key[0] == level)
+        np.testing.assert_allclose(sums, total)
+
+    # Kỳ cuối các sản phẩm cộng lại bằng 0: chia đều dự báo tổng
+    np.testing.assert_allclose(reconciled[('Sản phẩm', 'Mocha')].iloc[2].to_numpy(), [150, 150, 150])
+    # Kỳ có tổng dương: giữ tỷ lệ giữa các thành viên và giữa Lower/Upper
+    mocha = reconciled[('Sản phẩm', 'Mocha')].iloc[0]
+    np.testing.assert_allclose(mocha.to_numpy(), [75, 60, 90])
@@ -0,0 +1,27 @@
+"""test_interactive_charts.py - Bảng tổng hợp cho biểu đồ tương tác"""
+import pandas as pd
+
+from interactive_charts import build_aggregates
+
+
+def _sales():
+    return pd.DataFrame({
+        'Sale_id': ['S1', 'S2', 'S3'],
+        'Year_Month': ['2023-01', '2023-01', '2023-02'],
+        'Order_Channel': ['Online', 'Offline', 'Online'],
+        'Product_Name': ['Mocha', 'Latte', 'Mocha'],
+        'Size': ['S', 'M', 'L'],
+        'Staff_id': ['NV01', 'NV02', 'NV01'],
+        'Quantity': [1, 2, 3],
+        'Revenue': [10, 20, 30],
+    })
+
+
+def test_all_aggregates_with_full_columns():
+    assert set(build_aggregates(_sales())) == {'monthly', 'channel', 'product', 'staff'}
+
+
+def test_aggregates_skip_missing_columns():
+    assert set(build_aggregates(_sales().drop(columns=['Order_Channel']))) == {'staff'}
+    assert set(build_aggregates(_sales().drop(columns=['Sale_id']))) == {'monthly', 'product'}
+    assert build_aggregates(_sales().drop(columns=['Quantity'])) == {}
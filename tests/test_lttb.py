@@ -0,0 +1,38 @@
+"""test_lttb.py - Giảm mẫu LTTB cho biểu đồ doanh thu theo ngày"""
+import numpy as np
+import pytest
+
+from visualize_daily1 import lttb_downsample
+
+
+def _daily(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=float)
+    y = 1000 + 100 * np.sin(x / 30) + rng.normal(0, 10, n)
+    return x, y
+
+
+@pytest.mark.parametrize('n, max_points', [(1000, 100), (365, 50), (10, 3), (1001, 999)])
+def test_keeps_endpoints_length_and_order(n, max_points):
+    x, y = _daily(n)
+    keep = lttb_downsample(x, y, max_points)
+
+    assert len(keep) == max_points
+    assert keep[0] == 0 and keep[-1] == n - 1
+    # Chỉ số tăng dần nên trục x của các điểm giữ lại vẫn đơn điệu
+    assert np.all(np.diff(keep) > 0)
+    assert np.all(np.diff(x[keep]) > 0)
+
+
+@pytest.mark.parametrize('max_points', [200, 201, 500])
+def test_short_input_passes_through(max_points):
+    x, y = _daily(200)
+    np.testing.assert_array_equal(lttb_downsample(x, y, max_points), np.arange(200))
+
+
+def test_spike_survives():
+    x, y = _daily(2000, seed=1)
+    y[1234] = 50_000
+    y[777] = -50_000
+    keep = lttb_downsample(x, y, 80)
+    assert 1234 in keep and 777 in keep
@@ -0,0 +1,40 @@
+"""test_profiling.py - Ghi trace theo span và tóm tắt thời gian riêng"""
+import profiling
+from run_config import RunConfig, active
+
+
+def _event(name, ts, dur, tid=1):
+    return {'name': name, 'ph': 'X', 'ts': ts, 'dur': dur, 'pid': 1, 'tid': tid,
+            'args': {'rss_delta_mb': 0}}
+
+
+def test_summarize_trace_subtracts_direct_children_only():
+    events = [
+        _event('stage', 0, 100),
+        _event('load', 10, 30),
+        _event('parse', 15, 20),
+        _event('plot', 50, 40),
+        _event('stage', 0, 60, tid=2),
+    ]
+    summary = profiling.summarize_trace(events).set_index('span')
+    assert summary.loc['stage', 'calls'] == 2
+    assert summary.loc['stage', 'self_ms'] == (100 - 30 - 40 + 60) / 1000
+    assert summary.loc['load', 'self_ms'] == (30 - 20) / 1000
+    assert summary.loc['parse', 'self_ms'] == 20 / 1000
+
+
+def test_outermost_span_flushes_buffer(tmp_path, monkeypatch):
+    monkeypatch.setenv('HLC_PROFILE', '1')
+    monkeypatch.delenv('HLC_PROFILE_CPROFILE', raising=False)
+    profiling.reset()
+    with active(RunConfig(output_root=str(tmp_path))):
+        for _ in range(3):
+            with profiling.trace('outer'):
+                with profiling.trace('inner'):
+                    pass
+            assert profiling._events == []
+
+    events = profiling.load_trace(profiling.trace_path())
+    assert [e['name'] for e in events] == ['inner', 'outer'] * 3
+    assert profiling.trace_path().startswith(str(tmp_path))
+    profiling.reset()
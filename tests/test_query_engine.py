@@ -0,0 +1,75 @@
+"""test_query_engine.py - QueryEngine khớp với groupby pandas trên khoảng ngày ngẫu nhiên"""
+import numpy as np
+import pandas as pd
+
+from query_engine import MEASURES, QueryEngine
+
+CHANNELS = ['Online', 'Offline', 'Grab']
+PRODUCTS = ['Mocha', 'Latte', 'Trà đào', 'Bạc xỉu', 'Phin sữa']
+
+
+def _sales(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 90, n), unit='D'),
+        'Order_Channel': rng.choice(CHANNELS, n),
+        'Product_Name': rng.choice(PRODUCTS, n),
+        'Quantity': rng.integers(1, 5, n),
+        'Revenue': rng.integers(20, 80, n) * 1000,
+    })
+
+
+def _expected(df, date_from, date_to, channels, products):
+    mask = df['Date'].between(date_from, date_to)
+    if channels:
+        mask &= df['Order_Channel'].isin(channels)
+    if products:
+        mask &= df['Product_Name'].isin(products)
+    return df[mask].assign(Orders=1)
+
+
+def _ranges(rng, count=30):
+    # Gồm cả khoảng nằm trước ngày đầu, sau ngày cuối và bao trùm toàn bộ dữ liệu
+    ranges = [('2023-10-01', '2023-12-31'), ('2024-06-01', '2024-09-01'),
+              ('2023-12-01', '2024-01-01'), ('2024-03-30', '2025-01-01'),
+              ('2023-01-01', '2025-01-01')]
+    for _ in range(count):
+        a, b = sorted(rng.integers(-10, 100, 2))
+        start = pd.Timestamp('2024-01-01') + pd.Timedelta(days=int(a))
+        ranges.append((start, start + pd.Timedelta(days=int(b - a))))
+    return [(pd.Timestamp(a), pd.Timestamp(b)) for a, b in ranges]
+
+
+def test_totals_and_breakdown_match_groupby():
+    df = _sales()
+    engine = QueryEngine(df)
+    rng = np.random.default_rng(1)
+    filters = [(None, None), (['Online'], None), (None, ['Latte', 'Mocha']),
+               (['Grab', 'Offline'], ['Trà đào']), (['Không có'], None)]
+
+    for date_from, date_to in _ranges(rng):
+        for channels, products in filters:
+            expected = _expected(df, date_from, date_to, channels, products)
+
+            totals = engine.totals(date_from, date_to, channels, products)
+            np.testing.assert_allclose([totals[m] for m in MEASURES],
+                                       [expected[m].sum() for m in MEASURES])
+
+            for by in ('Order_Channel', 'Product_Name'):
+                table = engine.breakdown(by, date_from, date_to, channels, products).set_index(by)
+                grouped = expected.groupby(by)[MEASURES].sum()
+                # Nhóm không có giao dịch trong khoảng vẫn có dòng, giá trị 0
+                nonzero = table[table['Orders'] > 0]
+                pd.testing.assert_frame_equal(nonzero.sort_index(), grouped.sort_index(),
+                                              check_dtype=False, check_names=False,
+                                              check_index_type=False)
+
+
+def test_daily_series_matches_resample():
+    df = _sales(seed=2)
+    engine = QueryEngine(df)
+    series = engine.daily_series('2024-01-15', '2024-02-10', ['Online'], None)
+    expected = (_expected(df, pd.Timestamp('2024-01-15'), pd.Timestamp('2024-02-10'), ['Online'], None)
+                .set_index('Date')['Revenue'].resample('D').sum()
+                .reindex(series.index, fill_value=0))
+    np.testing.assert_allclose(series.to_numpy(), expected.to_numpy())
@@ -0,0 +1,34 @@
+"""test_raw_index.py - Chỉ mục offset dòng của file CSV gốc"""
+import pytest
+
+from raw_index import RawDataIndex
+
+
+def _index(tmp_path, content):
+    path = tmp_path / 'raw.csv'
+    path.write_bytes(content)
+    index = RawDataIndex(str(path), index_dir=str(tmp_path / 'index'))
+    return index, index.open()
+
+
+def test_rows_and_pages(tmp_path):
+    index, _ = _index(tmp_path, b'Sale_id;Revenue\nS1;10\nS2;20\nS3;30\n')
+    assert index.columns == ['Sale_id', 'Revenue']
+    assert index.row_count == 3
+    assert index.page_count(2) == 2
+    assert index.read_page(2, page_size=2)['Sale_id'].tolist() == ['S3']
+    assert index._load_meta()['rows'] == 3
+
+
+@pytest.mark.parametrize('content, columns', [
+    (b'', []),
+    (b'Sale_id;Revenue', ['Sale_id', 'Revenue']),
+    (b'Sale_id;Revenue\n', ['Sale_id', 'Revenue']),
+])
+def test_empty_and_header_only_files(tmp_path, content, columns):
+    index, _ = _index(tmp_path, content)
+    assert index._load_meta()['rows'] == 0
+    assert index.row_count == 0
+    assert index.columns == columns
+    assert index.page_count(100) == 1
+    assert index.read_page(1).empty
@@ -0,0 +1,54 @@
+"""test_refresh_worker.py - Nhập file thả vào và theo dõi thay đổi"""
+import os
+
+from pipeline import build_stages
+from refresh_worker import RefreshWorker
+from run_config import RunConfig
+
+
+class _Pipeline:
+    def __init__(self):
+        self.runs = 0
+
+    def run(self, force=False):
+        self.runs += 1
+        return []
+
+
+def _config(tmp_path):
+    raw = tmp_path / 'data_1.csv'
+    raw.write_bytes(b'Sale_id;Quantity\nS1;1\n')
+    return RunConfig(input_path=str(raw), output_root=str(tmp_path / 'output'),
+                     drop_dir=str(tmp_path / 'incoming'))
+
+
+def test_drop_dir_comes_from_config(tmp_path):
+    config = _config(tmp_path)
+    os.makedirs(config.drop_dir)
+    (tmp_path / 'incoming' / 'new.csv').write_bytes(b'Sale_id;Quantity\nS2;2\n')
+    (tmp_path / 'incoming' / 'other.csv').write_bytes(b'Id;Qty\nX;1\n')
+
+    pipeline = _Pipeline()
+    worker = RefreshWorker(config, pipeline=pipeline)
+    worker.run_once()
+
+    assert (tmp_path / 'data_1.csv').read_bytes() == b'Sale_id;Quantity\nS1;1\nS2;2\n'
+    assert os.listdir(tmp_path / 'incoming' / 'processed') == ['new.csv']
+    assert worker.dropped_files() == [str(tmp_path / 'incoming' / 'other.csv')]
+    assert pipeline.runs == 1
+
+
+def test_crud_edits_trigger_refresh_of_sales_db(tmp_path):
+    config = _config(tmp_path)
+    worker = RefreshWorker(config, pipeline=_Pipeline())
+    before = worker.watch_signature()
+
+    os.makedirs(config.output_root)
+    with open(config.sales_edits_path, 'w', encoding='utf-8') as f:
+        f.write('{"op": "delete", "Sale_id": "S1"}\n')
+    assert worker.watch_signature() != before
+
+    stages = {stage.name: stage for stage in build_stages(config)}
+    assert config.sales_edits_path in stages['clean'].inputs
+    assert stages['sales_db'].inputs == [config.cleaned_path]
+    assert stages['sales_db'].outputs == [config.sales_db_path]
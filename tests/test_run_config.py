@@ -0,0 +1,23 @@
+"""test_run_config.py - Đường dẫn kết quả lấy theo cấu hình lúc gọi, không lúc import"""
+import os
+
+import pandas as pd
+
+import backtesting
+import hierarchical_forecast
+from run_config import RunConfig, active
+
+
+def test_paths_follow_active_config(tmp_path):
+    config = RunConfig(output_root=str(tmp_path))
+    os.makedirs(os.path.dirname(config.leaderboard_path))
+    pd.DataFrame({'Series': ['monthly'], 'Model': ['linear'], 'Selected': [True]}).to_csv(
+        config.leaderboard_path, index=False)
+    pd.DataFrame({'Level': ['Tổng'], 'Year_Month': ['2024-01']}).to_csv(
+        config.forecast_path, index=False)
+
+    assert backtesting.selected_model() is None
+    assert hierarchical_forecast.load_forecasts() is None
+    with active(config):
+        assert backtesting.selected_model() == 'linear'
+        assert hierarchical_forecast.load_forecasts()['Year_Month'].tolist() == ['2024-01']
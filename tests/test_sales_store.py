@@ -0,0 +1,74 @@
+"""test_sales_store.py - Kho SQLite theo dữ liệu đã làm sạch và nhật ký sửa giao dịch"""
+import os
+
+import pandas as pd
+
+from run_config import RunConfig
+from sales_store import SalesStore, apply_edits
+
+
+def _cleaned(sale_ids):
+    dates = pd.date_range('2023-01-01', periods=len(sale_ids), freq='D')
+    return pd.DataFrame({
+        'Sale_id': sale_ids,
+        'Date': dates.strftime('%Y-%m-%d'),
+        'Product_Name': 'Mocha',
+        'Size': 'M',
+        'Quantity': 2,
+        'Order_Channel': 'Online',
+        'Actual_Selling_Price': 50000.0,
+        'Revenue': 100000.0,
+        'Staff_id': 'NV01',
+        'Year': dates.year,
+        'Month': dates.month,
+        'Quarter': dates.quarter,
+        'Day': dates.day,
+        'Year_Month': dates.strftime('%Y-%m'),
+        'Year_Quarter': [f'{d.year}-Q{d.quarter}' for d in dates],
+    })
+
+
+def _write(config, df):
+    os.makedirs(config.output_root, exist_ok=True)
+    df.to_csv(config.cleaned_path, index=False)
+
+
+def test_store_rebuilds_when_cleaned_file_changes(tmp_path):
+    config = RunConfig(output_root=str(tmp_path))
+    _write(config, _cleaned(['S0001', 'S0002']))
+    store = SalesStore(config=config).ensure()
+    assert store.monthly_trend()['Revenue'].tolist() == [200000.0]
+
+    # Sửa trên kho được giữ khi file đã làm sạch không đổi
+    store.delete('S0002')
+    assert SalesStore(config=config).ensure().get('S0002') is None
+
+    _write(config, _cleaned(['S0001', 'S0002', 'S0003']))
+    os.utime(config.cleaned_path, ns=(1, 1))
+    store = SalesStore(config=config).ensure()
+    assert store.get('S0003') is not None
+    assert store.monthly_trend()['Revenue'].tolist() == [300000.0]
+
+
+def test_edits_are_replayed_on_cleaned_data(tmp_path):
+    config = RunConfig(output_root=str(tmp_path))
+    _write(config, _cleaned(['S0001', 'S0002', 'S0003']))
+    store = SalesStore(config=config).ensure()
+
+    store.insert({'Sale_id': 'S0004', 'Date': '05/02/2023', 'Product_Name': 'Latte', 'Size': 's',
+                  'Quantity': 1, 'Order_Channel': 'offline', 'Actual_Selling_Price': 45000,
+                  'Staff_id': 'NV02'})
+    store.update('S0001', {'Quantity': 3})
+    store.delete('S0002')
+
+    df = apply_edits(pd.read_csv(config.cleaned_path, parse_dates=['Date']), config.sales_edits_path)
+    df = df.set_index('Sale_id')
+    assert sorted(df.index) == ['S0001', 'S0003', 'S0004']
+    assert df.loc['S0001', 'Revenue'] == 150000
+    assert df.loc['S0004', ['Order_Channel', 'Size', 'Year_Month']].tolist() == ['Offline', 'S', '2023-02']
+    assert df.loc['S0004', 'Date'] == pd.Timestamp('2023-02-05')
+
+
+def test_apply_edits_without_journal_is_noop(tmp_path):
+    df = _cleaned(['S0001'])
+    assert apply_edits(df, str(tmp_path / 'missing.jsonl')) is df
@@ -0,0 +1,47 @@
+"""test_telemetry.py - Ghi file metrics khi nhiều tiến trình cùng xoay vòng"""
+import json
+import os
+
+import pytest
+
+import telemetry
+from run_config import resolve
+
+
+@pytest.fixture(autouse=True)
+def _telemetry_on(monkeypatch):
+    monkeypatch.setenv('HLC_TELEMETRY', '1')
+
+
+def test_record_survives_concurrent_rotation(tmp_path, monkeypatch):
+    path = str(tmp_path / 'metrics.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('x' * 100)
+    monkeypatch.setattr(telemetry, 'MAX_BYTES', 10)
+
+    # Tiến trình khác đã đổi tên metrics.jsonl ngay trước os.replace của tiến trình này
+    def rotated_elsewhere(path):
+        os.remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(telemetry, '_rotate', rotated_elsewhere)
+    telemetry.record({'stage': 'test'}, path=path)
+
+    with open(path, encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == [{'stage': 'test'}]
+
+
+def test_record_never_raises_on_unwritable_path(tmp_path):
+    blocker = tmp_path / 'metrics'
+    blocker.write_text('file chiếm chỗ thư mục')
+    telemetry.record({'stage': 'test'}, path=str(blocker / 'metrics.jsonl'))
+
+
+def test_decorator_forwards_fields():
+    @telemetry.timed('test.step', source='test', kind='batch')
+    def step():
+        return 42
+
+    assert step() == 42
+    entries = telemetry.load_metrics(resolve().metrics_path)
+    assert entries[['stage', 'source', 'kind']].values.tolist() == [['test.step', 'test', 'batch']]
@@ -3,17 +3,24 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+from run_config import RunConfig, resolve
+import cleaned_store
+from chart_labels import label_bars, label_points
+from telemetry import timed
 
 
 class ChannelVisualizer:
-    def __init__(self, df):
+    def __init__(self, df, renderer=None, output_dir=None, config=None):
         self.df = df
-        self.output_dir = 'output/charts'
+        self.config = resolve(config)
+        self.output_dir = output_dir or self.config.chart_dir
         os.makedirs(self.output_dir, exist_ok=True)
+        self.renderer = renderer or self.config.make_renderer()
 
         # Thiết lập style
-        plt.style.use('seaborn-v0_8-darkgrid')
+        self.renderer.apply_style()
 
+    @timed
     def plot_channel_revenue(self, figsize=(12, 10)):
         """Biểu đồ doanh thu theo kênh"""
         if 'Order_Channel' not in self.df.columns or 'Revenue' not in self.df.columns:
@@ -31,7 +38,7 @@ class ChannelVisualizer:
         channel_data = channel_data.sort_values('Revenue', ascending=False)
 
         # Tạo biểu đồ
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=figsize)
+        fig, ((ax1, ax2), (ax3, ax4)) = self.renderer.subplots('channel_analysis', 2, 2, figsize=figsize)
 
         # 1. Pie chart - Phân phối doanh thu
         colors = sns.color_palette("Set2", len(channel_data))
@@ -60,10 +67,7 @@ class ChannelVisualizer:
         ax2.grid(True, alpha=0.3, axis='y')
 
         # Thêm giá trị trên cột
-        for bar, revenue in zip(bars, channel_data['Revenue'] / 1e6):
-            height = bar.get_height()
-            ax2.text(bar.get_x() + bar.get_width() / 2., height,
-                     f'{revenue:,.1f}', ha='center', va='bottom', fontsize=10)
+        label_bars(ax2, bars, fmt='{:,.1f}', fontsize=10, padding=0)
 
         # 3. Bar chart - Số lượng đơn hàng
         bars = ax3.bar(channel_data['Order_Channel'], channel_data['Order_Count'],
@@ -75,10 +79,7 @@ class ChannelVisualizer:
         ax3.grid(True, alpha=0.3, axis='y')
 
         # Thêm giá trị trên cột
-        for bar, count in zip(bars, channel_data['Order_Count']):
-            height = bar.get_height()
-            ax3.text(bar.get_x() + bar.get_width() / 2., height,
-                     f'{count:,}', ha='center', va='bottom', fontsize=10)
+        label_bars(ax3, bars, fmt='{:,.0f}', fontsize=10, padding=0)
 
         # 4. Scatter plot - Mối quan hệ Số đơn vs Doanh thu
         scatter = ax4.scatter(channel_data['Order_Count'], channel_data['Revenue'] / 1e6,
@@ -92,19 +93,15 @@ class ChannelVisualizer:
         ax4.grid(True, alpha=0.3)
 
         # Thêm label cho mỗi điểm
-        for i, row in channel_data.iterrows():
-            ax4.annotate(row['Order_Channel'],
-                         (row['Order_Count'], row['Revenue'] / 1e6),
-                         xytext=(5, 5), textcoords='offset points',
-                         fontsize=9)
+        label_points(ax4, channel_data['Order_Count'], channel_data['Revenue'] / 1e6,
+                     channel_data['Order_Channel'], offset=(5, 5), fontsize=9)
 
-        plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/channel_analysis.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        self.renderer.save(fig, f'{self.output_dir}/channel_analysis.png')
 
         print(f"Đã lưu biểu đồ phân tích kênh: {self.output_dir}/channel_analysis.png")
         return True
 
+    @timed
     def plot_channel_trend(self, figsize=(14, 8)):
         """Biểu đồ xu hướng kênh theo thời gian"""
         if not all(col in self.df.columns for col in ['Order_Channel', 'Year_Month', 'Revenue']):
@@ -127,7 +124,7 @@ class ChannelVisualizer:
                                           values='Quantity').fillna(0)
 
         # Tạo biểu đồ
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=figsize)
+        fig, (ax1, ax2) = self.renderer.subplots('channel_trend', 2, 1, figsize=figsize)
 
         # 1. Line chart - Doanh thu theo thời gian
         for channel in revenue_pivot.columns:
@@ -156,13 +153,12 @@ class ChannelVisualizer:
         ax2.grid(True, alpha=0.3)
         ax2.set_xticklabels(revenue_pivot.index, rotation=45)
 
-        plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/channel_trend.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        self.renderer.save(fig, f'{self.output_dir}/channel_trend.png')
 
         print(f" Đã lưu biểu đồ xu hướng kênh: {self.output_dir}/channel_trend.png")
         return True
 
+    @timed
     def plot_channel_by_product(self, top_n_products=5, figsize=(12, 8)):
         """Biểu đồ kênh phân phối theo sản phẩm"""
         if not all(col in self.df.columns for col in ['Order_Channel', 'Product_Name', 'Revenue']):
@@ -186,7 +182,7 @@ class ChannelVisualizer:
         )
 
         # Tạo biểu đồ
-        fig, ax = plt.subplots(figsize=figsize)
+        fig, ax = self.renderer.subplots('channel_by_product', figsize=figsize)
 
         x = range(len(product_channel_pivot))
         width = 0.35
@@ -201,10 +197,7 @@ class ChannelVisualizer:
                               width, label=channel)
 
                 # Thêm giá trị trên cột
-                for bar, value in zip(bars, product_channel_pivot[channel] / 1e6):
-                    if value > 0:
-                        ax.text(bar.get_x() + bar.get_width() / 2., bar.get_height(),
-                                f'{value:,.1f}', ha='center', va='bottom', fontsize=9)
+                label_bars(ax, bars, fmt='{:,.1f}', fontsize=9, padding=0, skip_zero=True)
 
         ax.set_xlabel('Sản phẩm', fontsize=12)
         ax.set_ylabel('Doanh thu (triệu VND)', fontsize=12)
@@ -215,9 +208,7 @@ class ChannelVisualizer:
         ax.legend()
         ax.grid(True, alpha=0.3, axis='y')
 
-        plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/channel_by_product.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        self.renderer.save(fig, f'{self.output_dir}/channel_by_product.png')
 
         print(f" Đã lưu biểu đồ kênh theo sản phẩm: {self.output_dir}/channel_by_product.png")
         return True
@@ -237,22 +228,22 @@ class ChannelVisualizer:
 
 
 # Hàm chính cho module này
-def main_visualize_channel(df_path='output/cleaned_data.csv'):
+def main_visualize_channel(df_path=None, config=None, date_from=None, date_to=None):
     """Hàm chính cho visualization kênh bán hàng"""
     print("=" * 60)
     print("TRỰC QUAN HÓA DỮ LIỆU THEO KÊNH BÁN HÀNG")
     print("=" * 60)
 
-    if not os.path.exists(df_path):
-        print(f" File {df_path} không tồn tại!")
-        return False
+    config = resolve(config)
 
-    # Đọc dữ liệu
-    df = pd.read_csv(df_path)
+    # Đọc dữ liệu: phân vùng theo khoảng ngày, bản Arrow (memory map) hoặc CSV
+    df = cleaned_store.load_for_run(config, df_path, date_from, date_to)
+    if df is None:
+        return False
     print(f"Đã tải {len(df)} bản ghi")
 
     # Khởi tạo visualizer
-    visualizer = ChannelVisualizer(df)
+    visualizer = ChannelVisualizer(df, config=config)
 
     # Tạo tất cả biểu đồ
     visualizer.create_all_charts()
@@ -261,4 +252,6 @@ def main_visualize_channel(df_path='output/cleaned_data.csv'):
 
 
 if __name__ == "__main__":
-    main_visualize_channel()
\ No newline at end of file
+    config = RunConfig.from_args()
+    date_from, date_to = cleaned_store.date_args(config=config)
+    main_visualize_channel(config=config, date_from=date_from, date_to=date_to)
\ No newline at end of file
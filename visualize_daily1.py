@@ -1,19 +1,85 @@
 """visualize_daily.py - Biểu đồ doanh thu theo ngày/tháng"""
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 from datetime import datetime
+from run_config import RunConfig, resolve
+import cleaned_store
+from chart_labels import label_bars
+from telemetry import timed
+
+
+def lttb_downsample(x, y, n_out):
+    """Chọn chỉ số các điểm cần vẽ theo thuật toán Largest-Triangle-Three-Buckets.
+
+    Giữ điểm đầu, điểm cuối và trong mỗi bucket chọn điểm tạo tam giác lớn nhất
+    với điểm đã chọn trước đó và trung bình bucket kế tiếp, nên các đỉnh/đáy
+    doanh thu không bị làm phẳng như khi lấy mẫu đều.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    # Biên các bucket cho n - 2 điểm ở giữa
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Trung bình của bucket kế tiếp (bucket cuối dùng điểm cuối)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Diện tích tam giác (bỏ hệ số 1/2) cho mọi điểm trong bucket
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) -
+                       (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
 
 
 class DailyVisualizer:
-    def __init__(self, df):
+    def __init__(self, df, renderer=None, output_dir=None, config=None):
         self.df = df
-        self.output_dir = 'output/charts'
+        self.config = resolve(config)
+        self.output_dir = output_dir or self.config.chart_dir
         os.makedirs(self.output_dir, exist_ok=True)
+        self.renderer = renderer or self.config.make_renderer()
 
-    def plot_daily_revenue(self, figsize=(14, 6)):
-        """Biểu đồ doanh thu theo ngày"""
+    def daily_series(self, fill_missing=True):
+        """Chuỗi doanh thu theo ngày (index là ngày); ngày không bán được = 0"""
+        if 'Date' not in self.df.columns or 'Revenue' not in self.df.columns:
+            print("Thiếu cột Date hoặc Revenue!")
+            return None
+
+        daily = self.df.groupby(pd.to_datetime(self.df['Date']))['Revenue'].sum().sort_index()
+        if fill_missing and len(daily):
+            daily = daily.asfreq('D', fill_value=0)
+        return daily
+
+    @timed
+    def plot_daily_revenue(self, figsize=(14, 6), max_points=None):
+        """Biểu đồ doanh thu theo ngày
+
+        max_points: số điểm tối đa được vẽ trên đường doanh thu. Mặc định bằng
+        độ rộng (pixel) của khung biểu đồ khi lưu, dữ liệu dài hơn được giảm
+        mẫu bằng LTTB. Top 10 ngày luôn tính trên dữ liệu đầy đủ.
+        """
         if 'Date' not in self.df.columns or 'Revenue' not in self.df.columns:
             print("Thiếu cột Date hoặc Revenue!")
             return False
@@ -23,40 +89,48 @@ class DailyVisualizer:
         daily_data = daily_data.sort_values('Date')
 
         # Tạo biểu đồ
-        plt.figure(figsize=figsize)
-
-        # Line chart
-        plt.subplot(1, 2, 1)
-        plt.plot(daily_data['Date'], daily_data['Revenue'] / 1e6,
-                 color='#2E86AB', linewidth=2, marker='o', markersize=4)
-        plt.xlabel('Ngày', fontsize=12)
-        plt.ylabel('Doanh thu (triệu VND)', fontsize=12)
-        plt.title('Doanh thu theo ngày', fontsize=14, fontweight='bold')
-        plt.grid(True, alpha=0.3)
-        plt.xticks(rotation=45)
-
-        # Bar chart (top 10 ngày cao nhất)
-        plt.subplot(1, 2, 2)
+        fig, (ax1, ax2) = self.renderer.subplots('daily_revenue', 1, 2, figsize=figsize)
+
+        # Giới hạn số điểm theo độ rộng pixel của khung line chart
+        if max_points is None:
+            max_points = int(ax1.get_position().width * fig.get_figwidth() * self.renderer.dpi)
+
+        x_values = pd.to_datetime(daily_data['Date']).to_numpy().astype('datetime64[ns]').astype(np.int64)
+        keep = lttb_downsample(x_values, daily_data['Revenue'].to_numpy(), max_points)
+        plot_data = daily_data.iloc[keep]
+        downsampled = len(plot_data) < len(daily_data)
+
+        # Line chart (chỉ vẽ marker khi không giảm mẫu)
+        ax1.plot(plot_data['Date'], plot_data['Revenue'] / 1e6,
+                 color='#2E86AB', linewidth=2 if not downsampled else 1,
+                 marker=None if downsampled else 'o', markersize=4)
+        ax1.set_xlabel('Ngày', fontsize=12)
+        ax1.set_ylabel('Doanh thu (triệu VND)', fontsize=12)
+        title = 'Doanh thu theo ngày'
+        if downsampled:
+            title += f' ({len(plot_data):,}/{len(daily_data):,} điểm)'
+        ax1.set_title(title, fontsize=14, fontweight='bold')
+        ax1.grid(True, alpha=0.3)
+        ax1.tick_params(axis='x', labelrotation=45)
+
+        # Bar chart (top 10 ngày cao nhất, từ dữ liệu đầy đủ)
         top_days = daily_data.nlargest(10, 'Revenue')
-        plt.barh(top_days['Date'].dt.strftime('%d/%m/%Y'),
-                 top_days['Revenue'] / 1e6,
-                 color='#A23B72')
-        plt.xlabel('Doanh thu (triệu VND)', fontsize=12)
-        plt.title('Top 10 ngày doanh thu cao nhất', fontsize=14, fontweight='bold')
-        plt.gca().invert_yaxis()
+        bars_top = ax2.barh(top_days['Date'].dt.strftime('%d/%m/%Y'),
+                            top_days['Revenue'] / 1e6,
+                            color='#A23B72')
+        ax2.set_xlabel('Doanh thu (triệu VND)', fontsize=12)
+        ax2.set_title('Top 10 ngày doanh thu cao nhất', fontsize=14, fontweight='bold')
+        ax2.invert_yaxis()
 
         # Thêm giá trị trên cột
-        for i, (date_str, revenue) in enumerate(zip(top_days['Date'].dt.strftime('%d/%m/%Y'),
-                                                    top_days['Revenue'] / 1e6)):
-            plt.text(revenue + 0.1, i, f'{revenue:.1f}', va='center', fontsize=10)
+        label_bars(ax2, bars_top, fmt='{:.1f}', fontsize=10)
 
-        plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/daily_revenue.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        self.renderer.save(fig, f'{self.output_dir}/daily_revenue.png')
 
         print(f"Đã lưu biểu đồ doanh thu theo ngày: {self.output_dir}/daily_revenue.png")
         return True
 
+    @timed
     def plot_monthly_trend(self, figsize=(12, 6)):
         """Biểu đồ xu hướng theo tháng"""
         if 'Year_Month' not in self.df.columns or 'Revenue' not in self.df.columns:
@@ -72,7 +146,7 @@ class DailyVisualizer:
         monthly_data = monthly_data.sort_values('Year_Month')
 
         # Tạo biểu đồ
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=figsize)
+        fig, (ax1, ax2) = self.renderer.subplots('monthly_trend', 2, 1, figsize=figsize)
 
         # Biểu đồ doanh thu
         bars1 = ax1.bar(range(len(monthly_data)), monthly_data['Revenue'] / 1e6,
@@ -85,10 +159,7 @@ class DailyVisualizer:
         ax1.grid(True, alpha=0.3, axis='y')
 
         # Thêm giá trị trên cột
-        for bar, revenue in zip(bars1, monthly_data['Revenue'] / 1e6):
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width() / 2., height,
-                     f'{revenue:.0f}', ha='center', va='bottom', fontsize=9)
+        label_bars(ax1, bars1, fmt='{:.0f}', fontsize=9, padding=0)
 
         # Biểu đồ số lượng
         bars2 = ax2.bar(range(len(monthly_data)), monthly_data['Quantity'],
@@ -100,13 +171,12 @@ class DailyVisualizer:
         ax2.set_xticklabels(monthly_data['Year_Month'], rotation=45)
         ax2.grid(True, alpha=0.3, axis='y')
 
-        plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/monthly_trend.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        self.renderer.save(fig, f'{self.output_dir}/monthly_trend.png')
 
         print(f"Đã lưu biểu đồ xu hướng tháng: {self.output_dir}/monthly_trend.png")
         return True
 
+    @timed
     def plot_quarterly_comparison(self, figsize=(10, 6)):
         """So sánh doanh thu theo quý"""
         if 'Year_Quarter' not in self.df.columns or 'Revenue' not in self.df.columns:
@@ -122,7 +192,7 @@ class DailyVisualizer:
         quarterly_data = quarterly_data.sort_values('Year_Quarter')
 
         # Tạo biểu đồ
-        fig, ax1 = plt.subplots(figsize=figsize)
+        fig, ax1 = self.renderer.subplots('quarterly_comparison', figsize=figsize)
 
         x = range(len(quarterly_data))
         width = 0.35
@@ -146,9 +216,7 @@ class DailyVisualizer:
         lines2, labels2 = ax2.get_legend_handles_labels()
         ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
 
-        plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/quarterly_comparison.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        self.renderer.save(fig, f'{self.output_dir}/quarterly_comparison.png')
 
         print(f"Đã lưu biểu đồ so sánh quý: {self.output_dir}/quarterly_comparison.png")
         return True
@@ -168,22 +236,22 @@ class DailyVisualizer:
 
 
 # Hàm chính cho module này
-def main_visualize_daily(df_path='output/cleaned_data.csv'):
+def main_visualize_daily(df_path=None, config=None, date_from=None, date_to=None):
     """Hàm chính cho visualization theo ngày"""
     print("=" * 60)
     print("TRỰC QUAN HÓA DỮ LIỆU THEO THỜI GIAN")
     print("=" * 60)
 
-    if not os.path.exists(df_path):
-        print(f" File {df_path} không tồn tại!")
-        return False
+    config = resolve(config)
 
-    # Đọc dữ liệu
-    df = pd.read_csv(df_path, parse_dates=['Date'])
+    # Đọc dữ liệu: phân vùng theo khoảng ngày, bản Arrow (memory map) hoặc CSV
+    df = cleaned_store.load_for_run(config, df_path, date_from, date_to, parse_dates=['Date'])
+    if df is None:
+        return False
     print(f"Đã tải {len(df)} bản ghi")
 
     # Khởi tạo visualizer
-    visualizer = DailyVisualizer(df)
+    visualizer = DailyVisualizer(df, config=config)
 
     # Tạo tất cả biểu đồ
     visualizer.create_all_charts()
@@ -192,4 +260,6 @@ def main_visualize_daily(df_path='output/cleaned_data.csv'):
 
 
 if __name__ == "__main__":
-    main_visualize_daily()
\ No newline at end of file
+    config = RunConfig.from_args()
+    date_from, date_to = cleaned_store.date_args(config=config)
+    main_visualize_daily(config=config, date_from=date_from, date_to=date_to)
\ No newline at end of file
@@ -4,18 +4,24 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 import os
+from run_config import RunConfig, resolve
+import cleaned_store
+from chart_labels import label_bars
+from telemetry import timed
 
 
 class ProductVisualizer:
-    def __init__(self, df):
+    def __init__(self, df, renderer=None, output_dir=None, config=None):
         self.df = df
-        self.output_dir = 'output/charts'
+        self.config = resolve(config)
+        self.output_dir = output_dir or self.config.chart_dir
         os.makedirs(self.output_dir, exist_ok=True)
+        self.renderer = renderer or self.config.make_renderer()
 
         # Thiết lập style
-        plt.style.use('seaborn-v0_8-darkgrid')
-        sns.set_palette("husl")
+        self.renderer.apply_style(palette="husl")
 
+    @timed
     def plot_product_quantity(self, top_n=10, figsize=(12, 8)):
         """Biểu đồ số lượng sản phẩm bán ra"""
         if 'Product_Name' not in self.df.columns or 'Quantity' not in self.df.columns:
@@ -30,7 +36,7 @@ class ProductVisualizer:
         top_products = product_qty.head(top_n)
 
         # Tạo biểu đồ
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=figsize)
+        fig, (ax1, ax2) = self.renderer.subplots('top_products_quantity', 1, 2, figsize=figsize)
 
         # Horizontal bar chart
         bars = ax1.barh(top_products['Product_Name'], top_products['Quantity'],
@@ -40,9 +46,7 @@ class ProductVisualizer:
         ax1.invert_yaxis()
 
         # Thêm giá trị trên cột
-        for i, (bar, qty) in enumerate(zip(bars, top_products['Quantity'])):
-            ax1.text(qty + 5, bar.get_y() + bar.get_height() / 2,
-                     f'{qty:,}', va='center', fontsize=10)
+        label_bars(ax1, bars, fmt='{:,.0f}', fontsize=10)
 
         # Pie chart cho phân phối
         ax2.pie(top_products['Quantity'], labels=top_products['Product_Name'],
@@ -50,13 +54,12 @@ class ProductVisualizer:
                 colors=sns.color_palette("Set3", top_n))
         ax2.set_title(f'Phân phối top {top_n} sản phẩm', fontsize=14, fontweight='bold')
 
-        plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/top_products_quantity.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        self.renderer.save(fig, f'{self.output_dir}/top_products_quantity.png')
 
         print(f"Đã lưu biểu đồ sản phẩm: {self.output_dir}/top_products_quantity.png")
         return True
 
+    @timed
     def plot_product_revenue(self, top_n=10, figsize=(14, 6)):
         """Biểu đồ doanh thu theo sản phẩm"""
         if 'Product_Name' not in self.df.columns or 'Revenue' not in self.df.columns:
@@ -71,7 +74,7 @@ class ProductVisualizer:
         top_products = product_rev.head(top_n)
 
         # Tạo biểu đồ
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=figsize)
+        fig, (ax1, ax2) = self.renderer.subplots('top_products_revenue', 1, 2, figsize=figsize)
 
         # Bar chart
         x = range(len(top_products))
@@ -85,10 +88,7 @@ class ProductVisualizer:
         ax1.grid(True, alpha=0.3, axis='y')
 
         # Thêm giá trị trên cột
-        for bar, revenue in zip(bars, top_products['Revenue'] / 1e6):
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width() / 2., height,
-                     f'{revenue:,.1f}', ha='center', va='bottom', fontsize=10)
+        label_bars(ax1, bars, fmt='{:,.1f}', fontsize=10, padding=0)
 
         # Scatter plot: Số lượng vs Doanh thu
         product_stats = self.df.groupby('Product_Name').agg({
@@ -108,16 +108,15 @@ class ProductVisualizer:
         ax2.grid(True, alpha=0.3)
 
         # Thêm colorbar
-        cbar = plt.colorbar(scatter, ax=ax2)
+        cbar = fig.colorbar(scatter, ax=ax2)
         cbar.set_label('Giá bán trung bình (VND)', fontsize=10)
 
-        plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/top_products_revenue.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        self.renderer.save(fig, f'{self.output_dir}/top_products_revenue.png')
 
         print(f"Đã lưu biểu đồ doanh thu sản phẩm: {self.output_dir}/top_products_revenue.png")
         return True
 
+    @timed
     def plot_size_distribution(self, figsize=(14, 8)):
         """Biểu đồ phân bổ kích cỡ sản phẩm"""
         if 'Product_Name' not in self.df.columns or 'Size' not in self.df.columns:
@@ -147,7 +146,7 @@ class ProductVisualizer:
         sizes = ['S', 'M', 'L']
 
         # Tạo biểu đồ
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=figsize)
+        fig, (ax1, ax2) = self.renderer.subplots('product_size_distribution', 2, 1, figsize=figsize)
 
         # Stacked bar chart
         bottom = np.zeros(len(products))
@@ -178,9 +177,7 @@ class ProductVisualizer:
 
         ax2.set_title('Tổng phân phối kích cỡ toàn hệ thống', fontsize=14, fontweight='bold')
 
-        plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/product_size_distribution.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        self.renderer.save(fig, f'{self.output_dir}/product_size_distribution.png')
 
         print(f"Đã lưu biểu đồ phân bổ kích cỡ: {self.output_dir}/product_size_distribution.png")
         return True
@@ -200,22 +197,22 @@ class ProductVisualizer:
 
 
 # Hàm chính cho module này
-def main_visualize_product(df_path='output/cleaned_data.csv'):
+def main_visualize_product(df_path=None, config=None, date_from=None, date_to=None):
     """Hàm chính cho visualization sản phẩm"""
     print("=" * 60)
     print("TRỰC QUAN HÓA DỮ LIỆU THEO SẢN PHẨM")
     print("=" * 60)
 
-    if not os.path.exists(df_path):
-        print(f"File {df_path} không tồn tại!")
-        return False
+    config = resolve(config)
 
-    # Đọc dữ liệu
-    df = pd.read_csv(df_path)
+    # Đọc dữ liệu: phân vùng theo khoảng ngày, bản Arrow (memory map) hoặc CSV
+    df = cleaned_store.load_for_run(config, df_path, date_from, date_to)
+    if df is None:
+        return False
     print(f"Đã tải {len(df)} bản ghi")
 
     # Khởi tạo visualizer
-    visualizer = ProductVisualizer(df)
+    visualizer = ProductVisualizer(df, config=config)
 
     # Tạo tất cả biểu đồ
     visualizer.create_all_charts(top_n=10)
@@ -224,4 +221,6 @@ def main_visualize_product(df_path='output/cleaned_data.csv'):
 
 
 if __name__ == "__main__":
-    main_visualize_product()
\ No newline at end of file
+    config = RunConfig.from_args()
+    date_from, date_to = cleaned_store.date_args(config=config)
+    main_visualize_product(config=config, date_from=date_from, date_to=date_to)
\ No newline at end of file
@@ -3,17 +3,24 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+from run_config import RunConfig, resolve
+import cleaned_store
+from chart_labels import label_bars, label_points, label_heatmap
+from telemetry import timed
 
 
 class StaffVisualizer:
-    def __init__(self, df):
+    def __init__(self, df, renderer=None, output_dir=None, config=None):
         self.df = df
-        self.output_dir = 'output/charts'
+        self.config = resolve(config)
+        self.output_dir = output_dir or self.config.chart_dir
         os.makedirs(self.output_dir, exist_ok=True)
+        self.renderer = renderer or self.config.make_renderer()
 
         # Thiết lập style
-        plt.style.use('seaborn-v0_8-darkgrid')
+        self.renderer.apply_style()
 
+    @timed
     def plot_top_staff(self, top_n=15, figsize=(14, 10)):
         """Biểu đồ top nhân viên xuất sắc"""
         if 'Staff_id' not in self.df.columns or 'Revenue' not in self.df.columns:
@@ -34,7 +41,7 @@ class StaffVisualizer:
         top_staff = staff_data.head(top_n)
 
         # Tạo biểu đồ
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=figsize)
+        fig, ((ax1, ax2), (ax3, ax4)) = self.renderer.subplots('top_staff_performance', 2, 2, figsize=figsize)
 
         # 1. Horizontal bar chart - Top nhân viên
         bars = ax1.barh(top_staff['Staff_id'], top_staff['Revenue'] / 1e6,
@@ -47,9 +54,7 @@ class StaffVisualizer:
         ax1.grid(True, alpha=0.3, axis='x')
 
         # Thêm giá trị trên cột
-        for bar, revenue in zip(bars, top_staff['Revenue'] / 1e6):
-            ax1.text(revenue + 0.1, bar.get_y() + bar.get_height() / 2,
-                     f'{revenue:,.1f}', va='center', fontsize=10)
+        label_bars(ax1, bars, fmt='{:,.1f}', fontsize=10)
 
         # 2. Scatter plot - Mối quan hệ Số đơn vs Doanh thu
         scatter = ax2.scatter(staff_data['Order_Count'], staff_data['Revenue'] / 1e6,
@@ -64,12 +69,9 @@ class StaffVisualizer:
 
         # Đánh dấu top 3
         top3 = staff_data.head(3)
-        for _, row in top3.iterrows():
-            ax2.annotate(row['Staff_id'],
-                         (row['Order_Count'], row['Revenue'] / 1e6),
-                         xytext=(10, 5), textcoords='offset points',
-                         fontsize=10, fontweight='bold',
-                         arrowprops=dict(arrowstyle='->', color='red'))
+        label_points(ax2, top3['Order_Count'], top3['Revenue'] / 1e6, top3['Staff_id'],
+                     offset=(10, 5), fontsize=10, fontweight='bold',
+                     arrowprops=dict(arrowstyle='->', color='red'))
 
         # 3. Bar chart - Số lượng đơn hàng
         bars = ax3.bar(top_staff['Staff_id'], top_staff['Order_Count'],
@@ -82,10 +84,7 @@ class StaffVisualizer:
         ax3.grid(True, alpha=0.3, axis='y')
 
         # Thêm giá trị trên cột
-        for bar, count in zip(bars, top_staff['Order_Count']):
-            height = bar.get_height()
-            ax3.text(bar.get_x() + bar.get_width() / 2., height,
-                     f'{count}', ha='center', va='bottom', fontsize=9)
+        label_bars(ax3, bars, fmt='{:.0f}', fontsize=9, padding=0)
 
         # 4. Histogram - Phân phối doanh thu
         ax4.hist(staff_data['Revenue'] / 1e6, bins=20,
@@ -101,13 +100,12 @@ class StaffVisualizer:
                     label=f'Trung bình: {mean_revenue:.1f} triệu')
         ax4.legend()
 
-        plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/top_staff_performance.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        self.renderer.save(fig, f'{self.output_dir}/top_staff_performance.png')
 
         print(f"Đã lưu biểu đồ top nhân viên: {self.output_dir}/top_staff_performance.png")
         return True
 
+    @timed
     def plot_staff_by_channel(self, top_n_staff=10, figsize=(12, 8)):
         """Biểu đồ phân tích nhân viên theo kênh"""
         if not all(col in self.df.columns for col in ['Staff_id', 'Order_Channel', 'Revenue']):
@@ -131,7 +129,7 @@ class StaffVisualizer:
         )
 
         # Tạo biểu đồ
-        fig, ax = plt.subplots(figsize=figsize)
+        fig, ax = self.renderer.subplots('staff_by_channel', figsize=figsize)
 
         # Stacked bar chart
         channels = staff_channel_pivot.columns
@@ -158,13 +156,12 @@ class StaffVisualizer:
         ax.legend(title='Kênh bán')
         ax.grid(True, alpha=0.3, axis='y')
 
-        plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/staff_by_channel.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        self.renderer.save(fig, f'{self.output_dir}/staff_by_channel.png')
 
         print(f"Đã lưu biểu đồ nhân viên theo kênh: {self.output_dir}/staff_by_channel.png")
         return True
 
+    @timed
     def plot_staff_trend(self, top_n_staff=5, figsize=(14, 8)):
         """Biểu đồ xu hướng nhân viên theo thời gian"""
         if not all(col in self.df.columns for col in ['Staff_id', 'Year_Month', 'Revenue']):
@@ -185,7 +182,7 @@ class StaffVisualizer:
                                        values='Revenue').fillna(0)
 
         # Tạo biểu đồ
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=figsize)
+        fig, (ax1, ax2) = self.renderer.subplots('staff_trend', 2, 1, figsize=figsize)
 
         # 1. Line chart - Xu hướng
         colors = sns.color_palette("husl", len(top_staff_ids))
@@ -217,19 +214,10 @@ class StaffVisualizer:
         ax2.set_yticklabels(heatmap_data.columns)
 
         # Thêm giá trị vào heatmap
-        for i in range(len(heatmap_data.columns)):
-            for j in range(len(heatmap_data.index)):
-                value = heatmap_data.iloc[j, i]
-                if value > 0:
-                    ax2.text(j, i, f'{value:.1f}',
-                             ha='center', va='center',
-                             color='black' if value < heatmap_data.values.max() / 2 else 'white',
-                             fontsize=8)
-
-        plt.colorbar(im, ax=ax2)
-        plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/staff_trend.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        label_heatmap(ax2, heatmap_data.T.values, fmt='{:.1f}', fontsize=8)
+
+        fig.colorbar(im, ax=ax2)
+        self.renderer.save(fig, f'{self.output_dir}/staff_trend.png')
 
         print(f"Đã lưu biểu đồ xu hướng nhân viên: {self.output_dir}/staff_trend.png")
         return True
@@ -249,22 +237,22 @@ class StaffVisualizer:
 
 
 # Hàm chính cho module này
-def main_visualize_staff(df_path='output/cleaned_data.csv'):
+def main_visualize_staff(df_path=None, config=None, date_from=None, date_to=None):
     """Hàm chính cho visualization nhân viên"""
     print("=" * 60)
     print("TRỰC QUAN HÓA DỮ LIỆU THEO NHÂN VIÊN")
     print("=" * 60)
 
-    if not os.path.exists(df_path):
-        print(f"File {df_path} không tồn tại!")
-        return False
+    config = resolve(config)
 
-    # Đọc dữ liệu
-    df = pd.read_csv(df_path)
+    # Đọc dữ liệu: phân vùng theo khoảng ngày, bản Arrow (memory map) hoặc CSV
+    df = cleaned_store.load_for_run(config, df_path, date_from, date_to)
+    if df is None:
+        return False
     print(f"📁 Đã tải {len(df)} bản ghi")
 
     # Khởi tạo visualizer
-    visualizer = StaffVisualizer(df)
+    visualizer = StaffVisualizer(df, config=config)
 
     # Tạo tất cả biểu đồ
     visualizer.create_all_charts(top_n=15)
@@ -273,4 +261,6 @@ def main_visualize_staff(df_path='output/cleaned_data.csv'):
 
 
 if __name__ == "__main__":
-    main_visualize_staff()
\ No newline at end of file
+    config = RunConfig.from_args()
+    date_from, date_to = cleaned_store.date_args(config=config)
+    main_visualize_staff(config=config, date_from=date_from, date_to=date_to)
\ No newline at end of file